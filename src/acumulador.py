@@ -0,0 +1,224 @@
+# este módulo tem o acumulador das estatísticas de um texto, atualizado numa só passagem
+# as médias e as variâncias são calculadas com o método de Welford (estável, sem guardar os valores),
+# e dois acumuladores podem ser juntados (juntar/merge) com o resultado exato de ter visto tudo de uma vez,
+# por isso as estatísticas de bocados, ficheiros ou processos diferentes combinam-se sem aproximações
+
+# imports locais
+from defaults import emotion_lexicons_en, pronoun_categories_en
+from categorias import obter_indice
+from registo import etapa  # medição de cada parte das estatísticas
+from legibilidade import flesch_de_contagens, silabas_de_contagens  # sílabas com memo, flesch a partir das contagens
+
+# bibliotecas gerais
+from collections import Counter  # para o vocabulário (type-token ratio)
+
+class MomentosWelford:
+    """
+    número de valores, média e soma dos quadrados dos desvios (m2) de uma série, atualizados um valor de cada vez
+
+    Attributes:
+        n (int): quantos valores
+        media (float): a média
+        m2 (float): a soma dos quadrados dos desvios à média (variância = m2 / n)
+    """
+    __slots__ = ("n", "media", "m2")
+
+    def __init__(self, n=0, media=0.0, m2=0.0):
+        self.n = n
+        self.media = media
+        self.m2 = m2
+
+    def adicionar(self, x):
+        self.n += 1
+        delta = x - self.media
+        self.media += delta / self.n
+        self.m2 += delta * (x - self.media)
+
+    def remover(self, x):
+        """tira um valor que tinha sido adicionado (o inverso do adicionar)"""
+        if self.n <= 1:
+            self.n, self.media, self.m2 = 0, 0.0, 0.0
+            return
+        delta = x - self.media
+        self.n -= 1
+        self.media -= delta / self.n
+        self.m2 = max(0.0, self.m2 - delta * (x - self.media))
+
+    def juntar(self, outro):
+        """junta os momentos de outra série (fórmula de Chan et al. para combinar variâncias)"""
+        if outro.n == 0:
+            return
+        if self.n == 0:
+            self.n, self.media, self.m2 = outro.n, outro.media, outro.m2
+            return
+        n = self.n + outro.n
+        delta = outro.media - self.media
+        self.media += delta * outro.n / n
+        self.m2 += outro.m2 + delta * delta * self.n * outro.n / n
+        self.n = n
+
+    @property
+    def variancia(self):
+        return self.m2 / self.n if self.n else 0.0
+
+    @property
+    def desvio_padrao(self):
+        return self.variancia ** 0.5
+
+class AcumuladorEstatisticas:
+    """
+    as estatísticas de um texto (ou de vários), juntadas frase a frase e documento a documento
+
+    Attributes:
+        valencia (MomentosWelford): média e variância da valência das frases pontuadas
+        arousal (MomentosWelford): média e variância do arousal das frases pontuadas
+        cont_positivas (int): frases com valência >= 0.05
+        cont_negativas (int): frases com valência <= -0.05
+        num_frases_tokenizadas (int): frases do tokenizador (inclui as que o VADER não conseguiu pontuar)
+        vocabulario (Counter): palavra -> ocorrências (para o total de palavras e o type-token ratio)
+        silabas (int): total de sílabas das palavras
+        emocoes (dict): categoria de emoção -> ocorrências
+        pronomes (dict): categoria de pronome -> ocorrências
+    """
+    def __init__(self):
+        self.valencia = MomentosWelford()
+        self.arousal = MomentosWelford()
+        self.cont_positivas = 0
+        self.cont_negativas = 0
+        self.num_frases_tokenizadas = 0
+        self.vocabulario = Counter()
+        self.silabas = 0
+        self.emocoes = dict.fromkeys(emotion_lexicons_en, 0)
+        self.pronomes = dict.fromkeys(pronoun_categories_en, 0)
+
+    @property
+    def num_frases(self):
+        return self.valencia.n
+
+    def adicionar_frase(self, valence, arousal):
+        """junta a pontuação de uma frase"""
+        self.valencia.adicionar(valence)
+        self.arousal.adicionar(arousal)
+        if valence >= 0.05:
+            self.cont_positivas += 1
+        elif valence <= -0.05:
+            self.cont_negativas += 1
+
+    def remover_frase(self, valence, arousal):
+        """tira a pontuação de uma frase que tinha sido juntada (usado na análise incremental)"""
+        self.valencia.remover(valence)
+        self.arousal.remover(arousal)
+        if valence >= 0.05:
+            self.cont_positivas -= 1
+        elif valence <= -0.05:
+            self.cont_negativas -= 1
+
+    def adicionar_frases(self, frases_info):
+        """
+        junta as pontuações de várias frases; com os resultados em colunas (FrasesAnalisadas)
+        as contas são vetorizadas e juntadas de uma vez
+
+        Args:
+            frases_info (list): FrasesAnalisadas ou lista de dicionários com 'valence' e 'arousal'
+        """
+        with etapa("statistics", frases=len(frases_info)):
+            self._adicionar_frases(frases_info)
+
+    def _adicionar_frases(self, frases_info):
+        colunas = getattr(frases_info, "colunas_numpy", None)
+        if colunas is None:
+            for info in frases_info:
+                self.adicionar_frase(info["valence"], info["arousal"])
+            return
+        valencias, arousals = colunas()
+        n = len(valencias)
+        if n == 0:
+            return
+        for momentos, valores in ((self.valencia, valencias), (self.arousal, arousals)):
+            media = float(valores.mean())
+            momentos.juntar(MomentosWelford(n, media, float(((valores - media) ** 2).sum())))
+        self.cont_positivas += int((valencias >= 0.05).sum())
+        self.cont_negativas += int((valencias <= -0.05).sum())
+
+    def adicionar_contagens(self, palavras, silabas, emocoes, pronomes, num_frases=1, sinal=1):
+        """
+        junta (sinal=1) ou tira (sinal=-1) as contagens de palavras, sílabas, emoções e pronomes de uma ou mais frases
+
+        Args:
+            palavras (Counter): palavra -> ocorrências
+            silabas (int): total de sílabas dessas palavras
+            emocoes (dict): categoria -> ocorrências
+            pronomes (dict): categoria -> ocorrências
+            num_frases (int, optional): quantas frases do tokenizador estas contagens representam
+            sinal (int, optional): 1 para juntar, -1 para tirar
+        """
+        self.num_frases_tokenizadas += sinal * num_frases
+        if sinal > 0:
+            self.vocabulario.update(palavras)
+        else:
+            self.vocabulario.subtract(palavras)
+            for palavra in palavras:
+                if self.vocabulario[palavra] <= 0:
+                    del self.vocabulario[palavra]  # para o type-token ratio só contar palavras que ainda existem
+        self.silabas += sinal * silabas
+        for destino, origem in ((self.emocoes, emocoes), (self.pronomes, pronomes)):
+            for categoria, contagem in origem.items():
+                destino[categoria] = destino.get(categoria, 0) + sinal * contagem
+
+    def adicionar_documento(self, documento):
+        """junta as contagens de palavras, sílabas, emoções e pronomes de um documento já tokenizado"""
+        tokens = documento.tokens
+        medidas = {"frases": documento.num_frases, "tokens": len(tokens)}
+        with etapa("descriptors", **medidas):
+            palavras = Counter(documento.palavras)
+        with etapa("flesch", **medidas):
+            silabas = silabas_de_contagens(palavras)
+        with etapa("emotions", **medidas):
+            emocoes = obter_indice(emotion_lexicons_en).contar(tokens)
+        with etapa("pronouns", **medidas):
+            pronomes = obter_indice(pronoun_categories_en).contar(tokens)
+        self.adicionar_contagens(palavras, silabas, emocoes, pronomes, num_frases=documento.num_frases)
+
+    def juntar(self, outro):
+        """
+        junta as estatísticas de outro acumulador (de outro bocado, ficheiro ou processo), com o mesmo resultado
+        que teria um só acumulador a ver tudo (também disponível como merge)
+
+        Returns:
+            AcumuladorEstatisticas: este acumulador, para se poder encadear
+        """
+        self.valencia.juntar(outro.valencia)
+        self.arousal.juntar(outro.arousal)
+        self.cont_positivas += outro.cont_positivas
+        self.cont_negativas += outro.cont_negativas
+        self.adicionar_contagens(outro.vocabulario, outro.silabas, outro.emocoes, outro.pronomes,
+                                 num_frases=outro.num_frases_tokenizadas)
+        return self
+
+    merge = juntar
+
+    def para_dict(self):
+        """o dicionário de estatísticas, com as mesmas chaves que o psytext.analisar_texto devolve"""
+        n = self.num_frases
+        cont_neutras = n - self.cont_positivas - self.cont_negativas
+        total_palavras = sum(self.vocabulario.values())
+        return {
+            "num_frases": n,
+            "media_valencia": self.valencia.media,
+            "media_arousal": self.arousal.media,
+            "dp_valencia": self.valencia.desvio_padrao,
+            "dp_arousal": self.arousal.desvio_padrao,
+            "perc_positivas": self.cont_positivas / n * 100 if n else 0.0,
+            "perc_negativas": self.cont_negativas / n * 100 if n else 0.0,
+            "perc_neutras": cont_neutras / n * 100 if n else 0.0,
+            "cont_positivas": self.cont_positivas,
+            "cont_negativas": self.cont_negativas,
+            "cont_neutras": cont_neutras,
+            "total_palavras": total_palavras,
+            "avg_palavras_frase": total_palavras / self.num_frases_tokenizadas if self.num_frases_tokenizadas else 0,
+            "ttr": len(self.vocabulario) / total_palavras if total_palavras else 0,
+            "num_frases_nltk": self.num_frases_tokenizadas,
+            "flesch_reading_ease": flesch_de_contagens(total_palavras, self.num_frases_tokenizadas, self.silabas),
+            "emotion_counts": dict(self.emocoes),
+            "pronoun_counts": dict(self.pronomes),
+        }
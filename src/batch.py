@@ -0,0 +1,315 @@
+# este módulo é a entrada de linha de comandos para analisar um corpus inteiro de ficheiros .txt
+# recebe pastas e/ou padrões glob, distribui os ficheiros por uma pool de processos e, no fim,
+# escreve um resumo consolidado (json e csv) com as estatísticas de cada ficheiro e do corpus todo
+#
+# cada worker importa o psytext (e portanto o VADER com o léxico personalizado) uma única vez
+# no inicializador da pool e depois processa muitos ficheiros seguidos
+
+# imports locais
+from defaults import paths as ph, exports as cfg_exportacao, logs as cfg_registo
+from acumulador import AcumuladorEstatisticas
+from perfil import CapturaPerfil
+from exportacao import FORMATOS, formatos_desconhecidos
+from registo import obter_logger, configurar_registo, instrumentacao, ativar_instrumentacao
+
+# bibliotecas gerais
+import os  # para caminhos e para saber o número de cores
+import sys  # para o código de saída
+import csv  # para o resumo em csv
+import json  # para o resumo em json
+import glob  # para expandir os padrões de ficheiros
+import time  # para medir o tempo de cada ficheiro e do lote
+import argparse  # para os argumentos da linha de comandos
+import multiprocessing  # para a pool de processos
+import contextlib  # para o nullcontext quando não se captura o perfil
+
+log = obter_logger(__name__)
+
+# o psytext é importado em cada worker (ver _inicializar_worker) e não aqui,
+# para o processo principal não ter de pagar o arranque do VADER
+psytext = None
+
+def recolher_ficheiros(entradas, extensao=".txt"):
+    """
+    expande as entradas (pastas, ficheiros ou padrões glob) numa lista ordenada de ficheiros sem repetições
+
+    Args:
+        entradas (list): lista de pastas, ficheiros ou padrões glob (ex: "corpus/**/*.txt")
+        extensao (str, optional): extensão dos ficheiros a procurar dentro das pastas
+
+    Returns:
+        list: caminhos absolutos dos ficheiros encontrados
+    """
+    encontrados = set()
+    for entrada in entradas:
+        if os.path.isdir(entrada):
+            # numa pasta procura recursivamente todos os ficheiros com a extensão pedida
+            padrao = os.path.join(entrada, "**", f"*{extensao}")
+            candidatos = glob.glob(padrao, recursive=True)
+        else:
+            candidatos = glob.glob(entrada, recursive=True)
+        for caminho in candidatos:
+            if os.path.isfile(caminho):
+                encontrados.add(os.path.abspath(caminho))
+    return sorted(encontrados)
+
+def nomes_base_unicos(ficheiros):
+    """
+    cria um nome base para os ficheiros de saída de cada ficheiro de entrada,
+    a partir do caminho relativo à pasta comum, para ficheiros com o mesmo nome em subpastas não se sobreporem
+
+    Args:
+        ficheiros (list): caminhos absolutos dos ficheiros de entrada
+
+    Returns:
+        dict: caminho do ficheiro -> nome base
+    """
+    if not ficheiros:
+        return {}
+    raiz = os.path.commonpath([os.path.dirname(f) for f in ficheiros])
+    nomes = {}
+    for caminho in ficheiros:
+        relativo = os.path.splitext(os.path.relpath(caminho, raiz))[0]
+        nomes[caminho] = relativo.replace(os.sep, "__")
+    return nomes
+
+_modo_fluxo = None  # None: automático pelo tamanho do ficheiro; True/False: forçado na linha de comandos
+_perfilar = False  # True: captura o perfil da análise de cada ficheiro (ver perfil.py)
+
+def _inicializar_worker(output_dir, usar_cache=True, modo_fluxo=None, formatos=None, nivel_registo=None, medir=False,
+                        perfilar=False):
+    """
+    corre uma vez em cada processo da pool: carrega o psytext (VADER + léxico personalizado)
+    e aponta a pasta de saída (e os formatos de exportação) para os pedidos na linha de comandos
+    também escolhe o nível das mensagens e, se for pedido, liga a medição das etapas
+    """
+    global psytext, _modo_fluxo, _perfilar
+    configurar_registo(nivel_registo)
+    _perfilar = perfilar
+    if medir:
+        ativar_instrumentacao()
+    ph["output_dir"] = output_dir
+    if formatos is not None:
+        cfg_exportacao["formats"] = list(formatos)
+    _modo_fluxo = modo_fluxo
+    import psytext as _psytext
+    psytext = _psytext
+    if not usar_cache:
+        psytext.desativar_cache_frases()
+    psytext.obter_analisador()  # o VADER é carregado aqui, uma vez por worker, e não no primeiro ficheiro
+
+def _analisar_ficheiro(tarefa):
+    """
+    analisa um ficheiro dentro de um worker
+
+    Args:
+        tarefa (tuple): (caminho do ficheiro, nome base para as saídas)
+
+    Returns:
+        dict: resultado com o ficheiro, o html gerado, as estatísticas, o tempo gasto, o erro (se houver),
+              o tempo e o erro de cada saída (html, affect grid, json) e o acumulador das estatísticas
+              (para o resumo do corpus ser calculado juntando os acumuladores, e não as médias)
+    """
+    caminho, base_filename = tarefa
+    inicio = time.perf_counter()
+    resultado = {"ficheiro": caminho, "base_filename": base_filename, "html": None, "estatisticas": None, "erro": None,
+                 "cache_hits": 0, "cache_misses": 0, "saidas": {}, "acumulador": None}
+    acumulador = AcumuladorEstatisticas()
+    cache = psytext.obter_cache_frases()
+    instrumentacao.limpar()  # as medições de cada ficheiro voltam ao processo principal no resultado
+    acertos_antes, falhas_antes = (cache.acertos, cache.falhas) if cache else (0, 0)
+    try:
+        import fluxo
+        # com --profile, cada ficheiro tem o seu perfil (cProfile + tracemalloc) ao lado das outras saídas
+        with CapturaPerfil(base_filename) if _perfilar else contextlib.nullcontext():
+            if _modo_fluxo or (_modo_fluxo is None and fluxo.deve_usar_fluxo(caminho)):
+                # ficheiros muito grandes são lidos aos bocados, com memória limitada
+                html_path, estatisticas = fluxo.analisar_ficheiro_em_fluxo(caminho, base_filename=base_filename,
+                                                                           acumulador=acumulador)
+            else:
+                with open(caminho, "r", encoding="utf-8") as f:
+                    texto = f.read()
+                html_path, estatisticas, _ = psytext.analisar_texto(texto, base_filename=base_filename,
+                                                                    tempos_saidas=resultado["saidas"], acumulador=acumulador)
+        resultado["html"] = html_path
+        resultado["estatisticas"] = estatisticas
+        if html_path is None:
+            resultado["erro"] = "no sentences found"
+        else:
+            resultado["acumulador"] = acumulador
+    except Exception as e:
+        resultado["erro"] = str(e)
+    if cache:
+        resultado["cache_hits"] = cache.acertos - acertos_antes
+        resultado["cache_misses"] = cache.falhas - falhas_antes
+    resultado["segundos"] = time.perf_counter() - inicio
+    if instrumentacao.ativa:
+        resultado["metricas"] = instrumentacao.para_dict()
+    return resultado
+
+def resumir_corpus(resultados):
+    """
+    junta as estatísticas dos ficheiros analisados com sucesso em estatísticas do corpus inteiro
+    os acumuladores de cada ficheiro são juntados, por isso as médias, os desvios padrão, o type-token ratio
+    e o flesch são os mesmos que dariam se o corpus fosse analisado como um só texto
+
+    Args:
+        resultados (list): lista de resultados devolvidos por _analisar_ficheiro
+
+    Returns:
+        dict: estatísticas agregadas do corpus
+    """
+    validos = [r for r in resultados if r["estatisticas"]]
+    acumulador = AcumuladorEstatisticas()
+    for r in validos:
+        if r.get("acumulador") is not None:
+            acumulador.juntar(r["acumulador"])
+    resumo = {"num_ficheiros": len(resultados), "num_ficheiros_ok": len(validos),
+              "num_ficheiros_erro": len(resultados) - len(validos),
+              "cache_hits": sum(r.get("cache_hits", 0) for r in resultados),
+              "cache_misses": sum(r.get("cache_misses", 0) for r in resultados)}
+    resumo.update(acumulador.para_dict())
+    return resumo
+
+def _achatar(estatisticas):
+    """achata os dicionários dentro do dicionário de estatísticas (igual à exportação csv da interface)"""
+    plano = {}
+    for chave, valor in (estatisticas or {}).items():
+        if isinstance(valor, dict):
+            for sub_chave, sub_valor in valor.items():
+                plano[f"{chave.replace('_counts', '')}_{sub_chave}"] = sub_valor
+        else:
+            plano[chave] = valor
+    return plano
+
+def escrever_resumo(resultados, resumo, output_dir, nome="corpus_summary"):
+    """
+    escreve o resumo consolidado: um json com o corpus e cada ficheiro, e um csv com uma linha por ficheiro
+
+    Returns:
+        tuple: (caminho do json, caminho do csv)
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    json_path = os.path.join(output_dir, f"{nome}.json")
+    csv_path = os.path.join(output_dir, f"{nome}.csv")
+
+    with open(json_path, "w", encoding="utf-8") as f:
+        # os acumuladores só servem para o resumo do corpus e não vão para o json
+        ficheiros = [{chave: valor for chave, valor in r.items() if chave != "acumulador"} for r in resultados]
+        json.dump({"corpus": resumo, "ficheiros": ficheiros}, f, indent=4, ensure_ascii=False)
+
+    linhas = []
+    for r in resultados:
+        linha = {"ficheiro": r["ficheiro"], "html": r["html"], "erro": r["erro"], "segundos": round(r["segundos"], 4),
+                 "cache_hits": r.get("cache_hits", 0), "cache_misses": r.get("cache_misses", 0)}
+        linha.update(_achatar(r["estatisticas"]))
+        linhas.append(linha)
+    # junta as colunas de todas as linhas, pela ordem em que aparecem
+    colunas = list(dict.fromkeys(coluna for linha in linhas for coluna in linha))
+    with open(csv_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=colunas)
+        writer.writeheader()
+        writer.writerows(linhas)
+    return json_path, csv_path
+
+def analisar_corpus(ficheiros, output_dir, workers=None, chunksize=1, usar_cache=True, modo_fluxo=None, formatos=None,
+                    nivel_registo=None, medir=False, perfilar=False):
+    """
+    analisa uma lista de ficheiros numa pool de processos
+
+    Args:
+        ficheiros (list): caminhos dos ficheiros a analisar
+        output_dir (str): pasta onde os ficheiros de saída são guardados
+        workers (int, optional): número de processos; por defeito é o número de cores
+        chunksize (int, optional): quantos ficheiros cada worker recebe de cada vez
+        usar_cache (bool, optional): se as pontuações das frases usam a cache persistente
+        modo_fluxo (bool, optional): True/False força a análise em fluxo; None decide pelo tamanho de cada ficheiro
+        formatos (list, optional): formatos de exportação das frases; por defeito os de defaults.exports
+        nivel_registo (str, optional): o nível das mensagens nos workers; por defeito defaults.logs["level"]
+        medir (bool, optional): mede as etapas da análise em cada worker; as medições de todos os ficheiros
+                                são juntadas às deste processo (registo.instrumentacao)
+        perfilar (bool, optional): escreve o perfil (cProfile + tracemalloc) da análise de cada ficheiro em output_dir
+
+    Returns:
+        list: resultados de cada ficheiro, pela ordem dos ficheiros de entrada
+    """
+    workers = workers or os.cpu_count() or 1
+    nomes = nomes_base_unicos(ficheiros)
+    tarefas = [(caminho, nomes[caminho]) for caminho in ficheiros]
+    resultados = []
+    # "spawn" em todos os sistemas: cada worker começa num processo limpo, que só carrega o psytext no inicializador,
+    # em vez de herdar (fork) o estado do processo principal, como já acontece no Windows e no macOS
+    contexto = multiprocessing.get_context("spawn")
+    initargs = (output_dir, usar_cache, modo_fluxo, formatos, nivel_registo, medir, perfilar)
+    with contexto.Pool(processes=workers, initializer=_inicializar_worker, initargs=initargs) as pool:
+        for i, resultado in enumerate(pool.imap_unordered(_analisar_ficheiro, tarefas, chunksize=chunksize), start=1):
+            estado = "ok" if resultado["erro"] is None else f"error: {resultado['erro']}"
+            log.info(f"[{i}/{len(tarefas)}] {resultado['ficheiro']} ({resultado['segundos']:.2f}s) {estado}")
+            if resultado.get("metricas"):
+                instrumentacao.juntar(resultado["metricas"])
+            resultados.append(resultado)
+    ordem = {caminho: i for i, caminho in enumerate(ficheiros)}
+    resultados.sort(key=lambda r: ordem[r["ficheiro"]])
+    return resultados
+
+def _ler_formatos(valor):
+    """lê a lista de formatos do --formats e recusa os nomes que não existem (ex: "parquett")"""
+    formatos = [formato.strip() for formato in valor.split(",") if formato.strip()]
+    desconhecidos = formatos_desconhecidos(formatos)
+    if desconhecidos:
+        raise argparse.ArgumentTypeError(f"unknown format(s): {', '.join(desconhecidos)} (choose from {', '.join(FORMATOS)})")
+    return formatos
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Analyze a corpus of .txt files with PsyText using a process pool.")
+    parser.add_argument("inputs", nargs="+", help="directories, files or glob patterns (e.g. 'corpus/**/*.txt')")
+    parser.add_argument("-w", "--workers", type=int, default=os.cpu_count(), help="number of worker processes (default: number of cores)")
+    parser.add_argument("-o", "--output-dir", default=ph["output_dir"], help="directory for the per-file outputs and the summary")
+    parser.add_argument("--chunksize", type=int, default=1, help="files handed to a worker at a time")
+    parser.add_argument("--summary-name", default="corpus_summary", help="base name of the summary files")
+    parser.add_argument("--no-cache", action="store_true", help="score every sentence again instead of using the persistent sentence cache")
+    parser.add_argument("--stream", dest="stream", action="store_true", default=None,
+                        help="always read files in chunks with bounded memory (default: only files above the size threshold)")
+    parser.add_argument("--no-stream", dest="stream", action="store_false", help="always read whole files into memory")
+    parser.add_argument("--formats", type=_ler_formatos, default=None,
+                        help="comma-separated per-sentence export formats: json, jsonl, columns, parquet "
+                             "(default: %s)" % ",".join(cfg_exportacao["formats"]))
+    parser.add_argument("--log-level", default=None,
+                        help="message level: DEBUG, INFO, WARNING or ERROR (default: %s)" % cfg_registo["level"])
+    parser.add_argument("--metrics", default=None,
+                        help="measure every analysis stage and write the totals to this file "
+                             "(Prometheus text if it ends in .prom, JSON otherwise)")
+    parser.add_argument("--profile", action="store_true",
+                        help="write cProfile and tracemalloc reports of each file's analysis next to its outputs")
+    args = parser.parse_args(argv)
+    configurar_registo(args.log_level)
+    if args.metrics:
+        ativar_instrumentacao()
+
+    ficheiros = recolher_ficheiros(args.inputs)
+    if not ficheiros:
+        log.error("No input files found.")
+        return 1
+
+    log.info(f"Analyzing {len(ficheiros)} files with {args.workers} workers...")
+    inicio = time.perf_counter()
+    resultados = analisar_corpus(ficheiros, args.output_dir, workers=args.workers, chunksize=args.chunksize,
+                                 usar_cache=not args.no_cache, modo_fluxo=args.stream, formatos=args.formats,
+                                 nivel_registo=args.log_level, medir=bool(args.metrics), perfilar=args.profile)
+    decorrido = time.perf_counter() - inicio
+
+    resumo = resumir_corpus(resultados)
+    resumo["segundos"] = decorrido
+    json_path, csv_path = escrever_resumo(resultados, resumo, args.output_dir, nome=args.summary_name)
+    log.info(f"Analyzed {resumo['num_ficheiros_ok']}/{resumo['num_ficheiros']} files "
+             f"({resumo['num_frases']} sentences) in {decorrido:.2f}s")
+    if not args.no_cache:
+        log.info(f"Sentence cache: {resumo['cache_hits']} hits, {resumo['cache_misses']} misses")
+    log.info(f"Summary written to: {json_path} and {csv_path}")
+    if args.metrics:
+        log.info(f"Stage metrics written to: {instrumentacao.exportar(args.metrics)}")
+    return 0 if resumo["num_ficheiros_erro"] == 0 else 2
+
+# condição principal
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,278 @@
+# este script mede o tempo de cada etapa da análise com textos sintéticos em inglês de vários tamanhos (de 1 KB a 100 MB)
+# os textos são gerados de forma determinística (a mesma semente dá sempre o mesmo texto), por isso duas execuções
+# em versões diferentes do código medem exatamente o mesmo trabalho
+# os resultados ficam num json em defaults.paths["benchmark_dir"] e podem ser comparados com uma execução anterior
+#
+# uso: python benchmark.py [--sizes 1K,10K,1M] [--compare benchmarks/anterior.json]
+#      (sai com código 1 se alguma etapa ficar mais lenta do que o limite definido em defaults.benchmark)
+
+# imports locais
+from defaults import paths as ph, benchmark as cfg_benchmark, emotion_lexicons_en, pronoun_categories_en
+
+# bibliotecas gerais
+import os  # para as pastas
+import io  # para esconder o que as funções escrevem enquanto são medidas
+import sys  # para o executável do python e o código de saída
+import json  # para guardar e comparar os resultados
+import time  # para medir cada etapa
+import random  # para gerar os textos sintéticos
+import argparse  # para os argumentos da linha de comandos
+import platform  # para registar a máquina onde foi medido
+import tempfile  # para as saídas (html, png, json) das etapas medidas
+import statistics  # para a mediana
+import contextlib  # para redirecionar o stdout
+import subprocess  # para medir o arranque num processo novo
+
+_VERSAO_RESULTADOS = 1  # muda se a estrutura do json dos resultados mudar
+
+# palavras dos textos sintéticos: as dos léxicos de emoções e pronomes aparecem com frequência,
+# e as outras dão frases neutras, positivas e negativas para o VADER
+_PALAVRAS_NEUTRAS = ["the", "a", "house", "time", "day", "work", "people", "city", "road", "water", "window", "table",
+                     "morning", "letter", "train", "story", "friend", "family", "office", "music", "meeting", "book",
+                     "walked", "said", "went", "looked", "made", "thought", "came", "took", "told", "found", "saw",
+                     "and", "but", "because", "then", "when", "after", "before", "with", "from", "about", "into"]
+_PALAVRAS_SENTIMENTO = ["good", "great", "love", "wonderful", "nice", "best", "bad", "terrible", "hate", "awful",
+                        "worst", "broken", "lost", "failed", "success", "better", "hope", "afraid", "lie", "cheat"]
+_MODIFICADORES = ["very", "really", "not", "never", "extremely", "barely", "so"]
+_TITULOS = ["Mr.", "Mrs.", "Dr.", "Prof."]
+_NOMES = ["Smith", "Jones", "Brown", "Taylor", "Silva"]
+_PONTUACAO = [".", ".", ".", ".", "!", "?", "..."]
+
+_UNIDADES = {"K": 1024, "M": 1024 ** 2, "G": 1024 ** 3}
+
+def tamanho_em_bytes(texto):
+    """converte um tamanho como '10K', '1M' ou '2048' em bytes"""
+    texto = texto.strip().upper().rstrip("B")
+    if texto and texto[-1] in _UNIDADES:
+        return int(float(texto[:-1]) * _UNIDADES[texto[-1]])
+    return int(texto)
+
+def gerar_texto_sintetico(num_bytes, semente=None):
+    """
+    gera um texto em inglês com pelo menos `num_bytes` bytes (só ascii), sempre igual para a mesma semente
+    tem frases de tamanhos variados, abreviaturas (Mr., Dr.), negações, intensificadores e parágrafos
+
+    Args:
+        num_bytes (int): o tamanho mínimo do texto
+        semente (int, optional): a semente do gerador; por defeito defaults.benchmark["seed"]
+
+    Returns:
+        str: o texto
+    """
+    aleatorio = random.Random(cfg_benchmark["seed"] if semente is None else semente)
+    emocoes = [palavra for palavras in emotion_lexicons_en.values() for palavra in palavras]
+    pronomes = [palavra for palavras in pronoun_categories_en.values() for palavra in palavras]
+    grupos = [(_PALAVRAS_NEUTRAS, 10), (pronomes, 3), (_PALAVRAS_SENTIMENTO, 2), (emocoes, 1), (_MODIFICADORES, 1)]
+    palavras = [palavra for lista, peso in grupos for palavra in lista * peso]
+    escolher = aleatorio.choice
+    partes = []
+    total = 0
+    while total < num_bytes:
+        frases = []
+        for _ in range(aleatorio.randint(3, 10)):  # frases de um parágrafo
+            corpo = [escolher(palavras) for _ in range(aleatorio.randint(4, 20))]
+            if aleatorio.random() < 0.1:
+                corpo.insert(aleatorio.randrange(len(corpo)), f"{escolher(_TITULOS)} {escolher(_NOMES)}")
+            frase = " ".join(corpo)
+            frases.append(frase[0].upper() + frase[1:] + escolher(_PONTUACAO))
+        paragrafo = " ".join(frases)
+        partes.append(paragrafo)
+        total += len(paragrafo) + 2
+    return "\n\n".join(partes)
+
+_CODIGO_ARRANQUE = """
+import json, time
+inicio = time.perf_counter()
+import psytext
+importado = time.perf_counter()
+psytext.obter_analisador()
+print(json.dumps({"import": importado - inicio, "analyzer": time.perf_counter() - importado}))
+"""
+
+def medir_arranque():
+    """
+    mede, num processo python novo, quanto demora a importar o psytext e a carregar o VADER
+
+    Returns:
+        dict: segundos de cada parte ("import" e "analyzer")
+    """
+    pasta = os.path.dirname(os.path.abspath(__file__))
+    saida = subprocess.run([sys.executable, "-c", _CODIGO_ARRANQUE], cwd=pasta, capture_output=True, text=True, check=True)
+    return json.loads(saida.stdout.strip().splitlines()[-1])  # a medição é a última linha
+
+def _medir(funcao, execucoes):
+    """corre a função várias vezes (sem o que ela escreve no ecrã) e devolve a mediana dos tempos e o último resultado"""
+    tempos = []
+    resultado = None
+    for _ in range(execucoes):
+        with contextlib.redirect_stdout(io.StringIO()):
+            inicio = time.perf_counter()
+            resultado = funcao()
+            tempos.append(time.perf_counter() - inicio)
+    return statistics.median(tempos), resultado
+
+def medir_etapas(texto, execucoes=1, pasta_saida=None):
+    """
+    mede cada etapa do psytext.analisar_texto em separado, com a cache de frases desligada
+    (para medir sempre a pontuação pelo VADER, e não a leitura da cache)
+
+    Args:
+        texto (str): o texto a analisar
+        execucoes (int, optional): quantas vezes medir cada etapa (fica a mediana)
+        pasta_saida (str, optional): onde escrever o html, os gráficos e o json; por defeito uma pasta temporária
+
+    Returns:
+        dict: número de frases e, para cada etapa, os segundos e as frases por segundo
+    """
+    import psytext
+    from acumulador import AcumuladorEstatisticas
+    psytext.desativar_cache_frases()
+    with contextlib.redirect_stdout(io.StringIO()):
+        psytext.obter_analisador()
+
+    with tempfile.TemporaryDirectory() as pasta_temporaria:
+        pasta = pasta_saida or pasta_temporaria
+        caminho = lambda sufixo: os.path.join(pasta, f"benchmark{sufixo}")
+        etapas = {}
+        segundos, documento = _medir(lambda: psytext.construir_documento(texto), execucoes)
+        etapas["tokenize"] = segundos
+        segundos, frases_info = _medir(lambda: psytext._analisar_frases(documento), execucoes)
+        etapas["score_sentences"] = segundos
+        etapas["descriptors"], _ = _medir(lambda: psytext.calcular_descritores_textuais(documento), execucoes)
+        etapas["flesch"], _ = _medir(lambda: psytext.calcular_legibilidade_flesch(documento), execucoes)
+        etapas["emotions"], _ = _medir(lambda: psytext.count_emotion_words(documento, emotion_lexicons_en), execucoes)
+        etapas["pronouns"], _ = _medir(lambda: psytext.count_pronouns(documento, pronoun_categories_en), execucoes)
+
+        def estatisticas():
+            acumulador = AcumuladorEstatisticas()
+            acumulador.adicionar_frases(frases_info)
+            acumulador.adicionar_documento(documento)
+            return acumulador.para_dict()
+        etapas["statistics"], stats = _medir(estatisticas, execucoes)
+        etapas["html"], _ = _medir(lambda: psytext.gerar_html_frases_coloridas(
+            frases_info, caminho(ph["html_suffix"]), estatisticas_gerais=stats, levantar_erros=True), execucoes)
+        etapas["affect_grid"], _ = _medir(lambda: psytext.gerar_affect_grid(
+            frases_info, caminho(ph["affect_grid_suffix"]), levantar_erros=True), execucoes)
+        etapas["trajectory"], _ = _medir(lambda: psytext.generate_sentiment_trajectory_graph(
+            frases_info, caminho("_sentiment_trajectory.png")), execucoes)
+        etapas["json"], _ = _medir(lambda: psytext.exportar_json(
+            frases_info, caminho(ph["json_suffix"]), levantar_erros=True), execucoes)
+        # a análise completa, de ponta a ponta, num só processo (inclui escrever as saídas ao mesmo tempo)
+        output_dir = ph["output_dir"]
+        ph["output_dir"] = pasta
+        try:
+            etapas["analisar_texto"], _ = _medir(lambda: psytext.analisar_texto(texto, "benchmark_full", processos=1),
+                                                 execucoes)
+        finally:
+            ph["output_dir"] = output_dir
+
+    num_frases = len(frases_info)
+    return {"bytes": len(texto.encode("utf-8")), "num_frases": num_frases,
+            "etapas": {nome: {"segundos": segundos, "frases_por_segundo": num_frases / segundos if segundos > 0 else None}
+                       for nome, segundos in etapas.items()}}
+
+def _versao_git():
+    """o commit atual do repositório, se houver git"""
+    try:
+        saida = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                               cwd=os.path.dirname(os.path.abspath(__file__)), check=True)
+        return saida.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def correr_benchmark(tamanhos=None, execucoes=None):
+    """
+    gera um texto sintético para cada tamanho e mede o arranque e as etapas da análise
+
+    Args:
+        tamanhos (list, optional): tamanhos como "1K" ou "10M"; por defeito defaults.benchmark["sizes"]
+        execucoes (int, optional): quantas vezes medir cada etapa; por defeito defaults.benchmark["runs"]
+
+    Returns:
+        dict: os resultados (ver _VERSAO_RESULTADOS), prontos para guardar em json
+    """
+    tamanhos = tamanhos or cfg_benchmark["sizes"]
+    execucoes = execucoes or cfg_benchmark["runs"]
+    resultados = {"versao": _VERSAO_RESULTADOS, "quando": time.strftime("%Y-%m-%dT%H:%M:%S"), "commit": _versao_git(),
+                  "python": platform.python_version(), "plataforma": platform.platform(), "cpus": os.cpu_count()}
+    print("Measuring startup...")
+    resultados["arranque"] = medir_arranque()
+    print("  import {import:.3f}s, analyzer {analyzer:.3f}s".format(**resultados["arranque"]))
+    resultados["tamanhos"] = {}
+    for tamanho in tamanhos:
+        num_bytes = tamanho_em_bytes(tamanho)
+        texto = gerar_texto_sintetico(num_bytes)
+        vezes = 1 if num_bytes > cfg_benchmark["single_run_above"] else execucoes
+        print(f"Benchmarking {tamanho} ({len(texto)} characters, {vezes} run(s))...")
+        medicao = medir_etapas(texto, vezes)
+        resultados["tamanhos"][tamanho] = medicao
+        for nome, etapa in medicao["etapas"].items():
+            ritmo = f"{etapa['frases_por_segundo']:.0f} sentences/s" if etapa["frases_por_segundo"] else "-"
+            print(f"  {nome:<16} {etapa['segundos']:9.4f}s  {ritmo}")
+    return resultados
+
+def comparar(resultados, referencia, limite=None, minimo=None):
+    """
+    compara duas execuções e encontra as etapas que ficaram mais lentas
+
+    Args:
+        resultados (dict): a execução nova
+        referencia (dict): a execução anterior
+        limite (float, optional): quanto mais lento conta como regressão (0.2 = 20%); por defeito defaults.benchmark
+        minimo (float, optional): etapas com menos segundos do que isto nas duas execuções são ignoradas
+
+    Returns:
+        list: (tamanho, etapa, segundos antes, segundos agora) de cada regressão
+    """
+    limite = cfg_benchmark["regression_threshold"] if limite is None else limite
+    minimo = cfg_benchmark["min_seconds"] if minimo is None else minimo
+    regressoes = []
+    for tamanho, medicao in resultados["tamanhos"].items():
+        antes = referencia.get("tamanhos", {}).get(tamanho)
+        if not antes:
+            continue
+        for nome, etapa in medicao["etapas"].items():
+            anterior = antes["etapas"].get(nome)
+            if anterior and max(anterior["segundos"], etapa["segundos"]) >= minimo \
+                    and etapa["segundos"] > anterior["segundos"] * (1 + limite):
+                regressoes.append((tamanho, nome, anterior["segundos"], etapa["segundos"]))
+    for nome, segundos in resultados["arranque"].items():
+        anterior = (referencia.get("arranque") or {}).get(nome)
+        if anterior and max(anterior, segundos) >= minimo and segundos > anterior * (1 + limite):
+            regressoes.append(("startup", nome, anterior, segundos))
+    return regressoes
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark each stage of the PsyText analysis on synthetic English texts.")
+    parser.add_argument("--sizes", type=lambda valor: [t.strip() for t in valor.split(",") if t.strip()], default=None,
+                        help="comma-separated text sizes, e.g. 1K,100K,10M (default: %s)" % ",".join(cfg_benchmark["sizes"]))
+    parser.add_argument("--runs", type=int, default=None, help="runs per stage; the median is kept (default: %d)" % cfg_benchmark["runs"])
+    parser.add_argument("--output", default=None, help="results file (default: a timestamped file in %s/)" % ph["benchmark_dir"])
+    parser.add_argument("--compare", default=None, help="previous results file to compare against; regressions make the exit code 1")
+    parser.add_argument("--threshold", type=float, default=None,
+                        help="slowdown counted as a regression, e.g. 0.2 for 20%% (default: %s)" % cfg_benchmark["regression_threshold"])
+    args = parser.parse_args(argv)
+
+    resultados = correr_benchmark(args.sizes, args.runs)
+    caminho = args.output or os.path.join(ph["benchmark_dir"], f"benchmark_{time.strftime('%Y%m%d_%H%M%S')}.json")
+    pasta = os.path.dirname(caminho)
+    if pasta:
+        os.makedirs(pasta, exist_ok=True)
+    with open(caminho, "w", encoding="utf-8") as f:
+        json.dump(resultados, f, indent=4)
+    print(f"Results written to: {caminho}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            referencia = json.load(f)
+        regressoes = comparar(resultados, referencia, args.threshold)
+        for tamanho, nome, antes, agora in regressoes:
+            print(f"REGRESSION {tamanho} {nome}: {antes:.4f}s -> {agora:.4f}s (+{(agora / antes - 1) * 100:.0f}%)")
+        if regressoes:
+            return 1
+        print(f"No regressions against {args.compare}.")
+    return 0
+
+# condição principal
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,123 @@
+# este módulo tem a cache persistente (sqlite) das pontuações de cada frase
+# a chave é um hash da frase normalizada junto com a versão do léxico, por isso texto repetido
+# (boilerplate, citações, prompts repetidos) só é pontuado pelo VADER uma vez, mesmo entre execuções diferentes
+# a cache tem um tamanho máximo e, quando passa dele, apaga as entradas usadas há mais tempo (LRU)
+
+# bibliotecas gerais
+import os  # para criar a pasta e saber o processo atual
+import time  # para a ordem de acesso (LRU)
+import sqlite3  # base de dados num só ficheiro, segura com vários processos ao mesmo tempo
+import hashlib  # para a chave de cada frase
+import threading  # para a mesma ligação poder ser usada por threads diferentes
+
+_TAMANHO_LOTE = 500  # quantas chaves se pedem de cada vez numa query (o sqlite tem limite de parâmetros)
+
+class CacheFrases:
+    """
+    cache em disco de frase -> (valence, arousal, cor)
+
+    Attributes:
+        caminho (str): o ficheiro sqlite
+        versao (str): a versão do léxico, que entra na chave (mudar o léxico invalida a cache sozinha)
+        max_entradas (int): número máximo de frases guardadas
+        acertos (int): quantas frases foram encontradas na cache (neste processo)
+        falhas (int): quantas frases tiveram de ser pontuadas (neste processo)
+    """
+    def __init__(self, caminho, versao, max_entradas=200000):
+        self.caminho = caminho
+        self.versao = versao
+        self.max_entradas = max_entradas
+        self.acertos = 0
+        self.falhas = 0
+        self._lock = threading.Lock()
+        self._ligacao = None
+        self._pid = None
+        self._num_entradas = 0  # estimativa, para não ter de contar a tabela a cada escrita
+
+    def _obter_ligacao(self):
+        """abre a ligação na primeira utilização (e outra vez se o processo for um fork, que não pode partilhá-la)"""
+        if self._ligacao is None or self._pid != os.getpid():
+            pasta = os.path.dirname(self.caminho)
+            if pasta:
+                os.makedirs(pasta, exist_ok=True)
+            ligacao = sqlite3.connect(self.caminho, timeout=30, check_same_thread=False)
+            ligacao.execute("PRAGMA journal_mode=WAL")  # leitores não bloqueiam o escritor (vários workers)
+            ligacao.execute("PRAGMA synchronous=NORMAL")
+            ligacao.execute("CREATE TABLE IF NOT EXISTS frases (chave BLOB PRIMARY KEY, valence REAL, arousal REAL, cor TEXT, acesso INTEGER)")
+            ligacao.execute("CREATE INDEX IF NOT EXISTS frases_acesso ON frases (acesso)")
+            ligacao.commit()
+            self._num_entradas = ligacao.execute("SELECT COUNT(*) FROM frases").fetchone()[0]
+            self._ligacao = ligacao
+            self._pid = os.getpid()
+        return self._ligacao
+
+    def chave(self, frase):
+        """hash da frase normalizada (espaços seguidos viram um só) e da versão do léxico"""
+        # as maiúsculas não são normalizadas porque o VADER dá mais peso a palavras em maiúsculas
+        normalizada = " ".join(frase.split())
+        return hashlib.blake2b(f"{self.versao}\0{normalizada}".encode("utf-8"), digest_size=16).digest()
+
+    def obter_muitos(self, chaves):
+        """
+        procura várias frases de uma vez e marca as encontradas como usadas agora
+
+        Args:
+            chaves (list): chaves devolvidas por chave()
+
+        Returns:
+            dict: chave -> (valence, arousal, cor), só com as frases que estavam na cache
+        """
+        unicas = list(dict.fromkeys(chaves))
+        encontradas = {}
+        with self._lock:
+            ligacao = self._obter_ligacao()
+            for i in range(0, len(unicas), _TAMANHO_LOTE):
+                lote = unicas[i:i + _TAMANHO_LOTE]
+                marcadores = ",".join("?" * len(lote))
+                for chave, valence, arousal, cor in ligacao.execute(
+                        f"SELECT chave, valence, arousal, cor FROM frases WHERE chave IN ({marcadores})", lote):
+                    encontradas[chave] = (valence, arousal, cor)
+            if encontradas:
+                agora = time.time_ns()
+                ligacao.executemany("UPDATE frases SET acesso = ? WHERE chave = ?", [(agora, chave) for chave in encontradas])
+                ligacao.commit()
+        acertos = sum(1 for chave in chaves if chave in encontradas)
+        self.acertos += acertos
+        self.falhas += len(chaves) - acertos
+        return encontradas
+
+    def guardar_muitos(self, itens):
+        """
+        guarda as pontuações novas e, se a cache passar do tamanho máximo, apaga as usadas há mais tempo
+
+        Args:
+            itens (dict): chave -> (valence, arousal, cor)
+        """
+        if not itens:
+            return
+        agora = time.time_ns()
+        with self._lock:
+            ligacao = self._obter_ligacao()
+            cursor = ligacao.executemany("INSERT OR IGNORE INTO frases (chave, valence, arousal, cor, acesso) VALUES (?, ?, ?, ?, ?)",
+                                         [(chave, v, a, c, agora) for chave, (v, a, c) in itens.items()])
+            self._num_entradas += max(cursor.rowcount, 0)
+            if self._num_entradas > self.max_entradas:
+                # outros processos também escrevem, por isso a contagem é refeita antes de apagar
+                self._num_entradas = ligacao.execute("SELECT COUNT(*) FROM frases").fetchone()[0]
+                excesso = self._num_entradas - self.max_entradas
+                if excesso > 0:
+                    ligacao.execute("DELETE FROM frases WHERE chave IN (SELECT chave FROM frases ORDER BY acesso LIMIT ?)", (excesso,))
+                    self._num_entradas -= excesso
+            ligacao.commit()
+
+    def estatisticas(self):
+        """contadores de acertos e falhas deste processo e o número (aproximado) de entradas guardadas"""
+        total = self.acertos + self.falhas
+        return {"hits": self.acertos, "misses": self.falhas,
+                "hit_rate": self.acertos / total if total else 0.0, "entries": self._num_entradas}
+
+    def fechar(self):
+        with self._lock:
+            if self._ligacao is not None and self._pid == os.getpid():
+                self._ligacao.close()
+            self._ligacao = None
@@ -0,0 +1,57 @@
+# este módulo tem o índice palavra -> categorias usado para contar pronomes e palavras de emoção
+# o índice é construído uma vez a partir dos léxicos (ver defaults.py) e a contagem é uma só passagem pelos tokens,
+# por isso o custo não depende do número de categorias nem do tamanho dos léxicos
+
+from collections import Counter  # conta as ocorrências de cada token numa passagem (em C)
+
+class IndiceCategorias:
+    """
+    índice pré-compilado de um léxico por categorias
+
+    Attributes:
+        categorias (tuple): os nomes das categorias, pela ordem do léxico
+        indice (dict): palavra em minúsculas -> lista de categorias onde a palavra aparece
+    """
+    def __init__(self, lexicos):
+        """
+        Args:
+            lexicos (dict): nome da categoria -> lista de palavras dessa categoria
+        """
+        self.categorias = tuple(lexicos)
+        self.indice = {}
+        for categoria, palavras in lexicos.items():
+            for palavra in palavras:
+                # se a palavra estiver repetida no léxico conta repetida, como na contagem antiga com words.count
+                self.indice.setdefault(palavra.lower(), []).append(categoria)
+
+    def contar(self, tokens):
+        """
+        conta as palavras de cada categoria numa só passagem pelos tokens
+
+        Args:
+            tokens (iterable): tokens já em minúsculas
+
+        Returns:
+            dict: nome da categoria -> número de ocorrências
+        """
+        contagens = dict.fromkeys(self.categorias, 0)
+        indice = self.indice
+        for palavra, ocorrencias in Counter(tokens).items():
+            for categoria in indice.get(palavra, ()):
+                contagens[categoria] += ocorrencias
+        return contagens
+
+# índices já construídos, pela identidade do dicionário do léxico
+# guarda-se também o próprio léxico para o id não ser reutilizado por outro objeto
+_indices = {}
+
+def obter_indice(lexicos):
+    """
+    devolve o índice do léxico, construindo-o só na primeira vez que é pedido
+    (os léxicos de defaults.py não são alterados depois de carregados, por isso o índice nunca fica desatualizado)
+    """
+    entrada = _indices.get(id(lexicos))
+    if entrada is None or entrada[0] is not lexicos:
+        entrada = (lexicos, IndiceCategorias(lexicos))
+        _indices[id(lexicos)] = entrada
+    return entrada[1]
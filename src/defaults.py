@@ -1,3 +1,5 @@
+import os  # para a pasta da cache, que não depende da pasta de onde o programa é corrido
+
 default_title = "PsyText"
 
 paths = {
@@ -6,7 +8,134 @@ paths = {
     "output_dir": "output",
     "html_suffix": "_emotions.html",
     "affect_grid_suffix": "_affect_grid.png",
-    "json_suffix": "_analysis.json"
+    "json_suffix": "_analysis.json",
+    # pasta para ficheiros que se podem apagar e voltam a ser criados (ex: o snapshot do léxico, a cache de frases)
+    # fica ao lado do código (src/cache), e não na pasta de onde o programa foi corrido
+    "cache_dir": os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache"),
+    "lexicon_snapshot": "vader_lexicon.marshal",
+    "sentence_cache": "sentence_cache.sqlite3",
+    "template_cache": "templates",  # subpasta de cache_dir com os templates jinja2 já compilados
+    "jsonl_suffix": "_analysis.jsonl",
+    "columns_suffix": "_analysis_columns",  # pasta com as colunas .npy (ver exportacao.py)
+    "parquet_suffix": "_analysis.parquet",
+    "benchmark_dir": "benchmarks",  # resultados do benchmark.py (um json por execução)
+    "profile_suffix": "_profile.txt",  # relatório das funções mais pesadas (ver perfil.py)
+    "profile_stats_suffix": "_profile.prof",  # os dados do cProfile, para abrir noutras ferramentas (ex: snakeviz)
+    "memory_profile_suffix": "_memory.txt"  # relatório dos sítios do código que mais memória alocaram
+}
+
+# análise em fluxo (ver fluxo.py): ficheiros maiores do que isto são lidos aos bocados em vez de inteiros
+streaming = {
+    "threshold_bytes": 50 * 1024 * 1024,
+    "chunk_chars": 1 << 20,  # caracteres lidos de cada vez
+    # uma "frase" sem pontuação (ex: logs, transcrições em bruto) não pode crescer até ao ficheiro todo: passado isto
+    # é cortada na última mudança de linha (ou, se não houver nenhuma, aqui mesmo)
+    "max_sentence_chars": 100_000
+}
+
+# captura de perfil de uma análise (ver perfil.py): quantas linhas vão para cada relatório
+profiling = {
+    "top_functions": 40,
+    "top_allocations": 25,
+    "tracemalloc_frames": 1,  # com mais níveis, cada sítio de alocação mostra também quem o chamou (mais lento)
+    # a memória é vista de tantos em tantos ms e, sempre que passa do último máximo em mais de peak_growth (25%),
+    # é tirada uma fotografia: a última é a mais perto do pico e mostra de onde veio
+    "memory_sample_ms": 20,
+    "peak_growth": 0.25
+}
+
+# um só texto muito grande partido em fragmentos (nas fronteiras das frases) pontuados numa pool de processos
+# (ver fragmentos.py); só compensa a partir de um certo tamanho, por causa do arranque dos processos
+sharding = {
+    "enabled": True,
+    "min_chars": 2_000_000,  # textos mais pequenos são analisados num só processo
+    "workers": None,  # None: o número de cores
+    "shards_per_worker": 4,  # mais fragmentos do que processos, para a carga ficar equilibrada
+    "margin_chars": 2000,  # caracteres vistos à volta de cada corte para encontrar a fronteira de frase mais perto
+    "cancel_poll_s": 0.2  # de quanto em quanto tempo se vê se a análise foi cancelada enquanto se espera por um fragmento
+}
+
+# serviço http local (ver servico.py): um processo que fica a correr com o VADER já carregado em cada worker
+# os pedidos que chegam quase ao mesmo tempo são juntados num lote e enviados de uma vez para um worker
+service = {
+    "host": "127.0.0.1",  # só aceita ligações desta máquina (não há autenticação)
+    "port": 8765,
+    "workers": None,  # None: o número de cores
+    "batch_max": 32,  # pedidos num lote, no máximo
+    "batch_wait_ms": 2,  # quanto tempo o primeiro pedido de um lote espera por outros
+    "max_body_bytes": 10 * 1024 * 1024  # pedidos maiores são recusados (413)
+}
+
+# legibilidade (ver legibilidade.py): as sílabas de cada palavra são contadas uma vez e guardadas num memo do processo
+# (o vocabulário é zipfiano: com algumas dezenas de milhares de palavras quase todas as contagens já estão no memo)
+readability = {
+    "syllable_cache_size": 65536,  # palavras guardadas no memo (as usadas há mais tempo saem primeiro)
+    "window_sentences": 10  # frases em cada janela da trajetória de legibilidade
+}
+
+# cache persistente das pontuações de cada frase (ver cache_frases.py)
+sentence_cache = {
+    "enabled": True,
+    "max_entries": 200000  # quando passa daqui, as frases usadas há mais tempo são apagadas
+}
+
+# relatório html: a partir de quantas frases as frases vão para páginas carregadas à medida que são vistas
+html_report = {
+    "paginate_above": 5000,
+    "sentences_per_page": 500
+}
+
+# gráficos: a partir de quantas frases o affect grid passa de pontos a um mapa de densidade (histograma 2D)
+charts = {
+    "affect_grid_density_above": 5000,
+    "affect_grid_bins": 60,  # divisões em cada eixo do mapa de densidade
+    # trajetória: acima deste número de frases a linha é suavizada (média móvel) e reduzida com o LTTB
+    "trajectory_max_points": None,  # None = a largura do gráfico em píxeis
+    "trajectory_window": None,  # frases em cada média móvel; None = automático (frases / pontos)
+    "save_from_gui": True  # guardar também o png (em segundo plano) quando um gráfico é mostrado na interface
+}
+
+# formatos em que as frases analisadas são exportadas:
+# "json" (lista com indentação), "jsonl" (uma frase por linha), "columns" (pasta de .npy) e "parquet" (precisa do pyarrow)
+exports = {
+    "formats": ["json"]
+}
+
+# janela de texto manual (análise incremental)
+manual_analysis = {
+    "debounce_ms": 600  # quanto tempo depois da última tecla a análise "ao escrever" corre
+}
+
+# mensagens (ver registo.py): o nível mínimo mostrado e o formato de cada linha
+# no nível "DEBUG" aparecem também os passos intermédios de cada etapa
+logs = {
+    "level": "INFO",
+    "format": "%(message)s"
+}
+
+# medição das etapas da análise (ver registo.py): desligada não custa nada; ligada, guarda o tempo,
+# as frases e os tokens de cada etapa, que podem ser exportados em json ou no formato de texto do Prometheus
+instrumentation = {
+    "enabled": False
+}
+
+# orçamento de arranque verificado pelo tempo_importacao.py
+# importar estes módulos não pode demorar mais do que isto, nem carregar as bibliotecas pesadas
+# (essas só devem ser importadas na primeira análise)
+import_budget = {
+    "modules": {"psytext": 0.25, "batch": 0.25, "servico": 0.25, "interface": 0.5},  # segundos
+    "heavy_modules": ["nltk", "matplotlib", "numpy", "pandas", "jinja2", "textstat", "PIL"],
+    "runs": 5  # a mediana de várias execuções é menos sensível a ruído
+}
+
+# benchmark das etapas da análise (ver benchmark.py), com textos sintéticos de vários tamanhos
+benchmark = {
+    "sizes": ["1K", "10K", "100K", "1M", "10M", "100M"],  # bytes de cada texto sintético
+    "runs": 3,  # cada etapa é medida várias vezes e fica a mediana
+    "single_run_above": 10 * 1024 * 1024,  # textos maiores do que isto são medidos só uma vez
+    "seed": 1234,  # a mesma semente dá sempre os mesmos textos
+    "regression_threshold": 0.20,  # uma etapa 20% mais lenta do que na execução de referência é uma regressão
+    "min_seconds": 0.005  # etapas mais rápidas do que isto não contam para as regressões (é só ruído)
 }
 
 # texto do botão "Analyze Emotions" tambem reusado no texto ajuda
@@ -27,6 +156,7 @@ english = {
     "please_file": "Please select a file.",
     "please_text": "Please insert some text first.",
     "please_file2": "You must generate a HTML file first in order to obtain data.",
+    "streamed_no_charts": "This file was analysed in streaming mode because it is very large, so per-sentence charts are not available.",
     "dialog_text_files": "Text files",
     "dialog_all_files": "All files",
     "choose_input": "Choose input file...", # Button text
@@ -43,10 +173,23 @@ english = {
     "clear_interface": "Clear",
     "status_ready": "Ready",
     "status_analysing": "Analysing text...",
+    "status_progress": "Analysing sentences: {} / {}",
+    "status_progress_unknown": "Analysing sentences: {} done...",
+    "status_cancelling": "Cancelling...",
+    "status_cancelled": "Analysis cancelled.",
+    "busy_warning": "Another analysis is still running. Wait for it to finish or cancel it first.",
+    "cancel": "Cancel",
+    "report_previous": "Previous",
+    "report_next": "Next",
+    "report_page": "Page",
+    "report_loading": "Loading...",
+    "live_analysis": "Analyse as you type (statistics only)",
+    "status_live_done": "Live analysis: {} sentences ({} re-scored)",
     "status_generating_html": "Generating HTML...",
     "status_html_done": "HTML generated: ",
     "status_generating_grid": "Generating Affect Grid...",
     "status_grid_done": "Affect Grid saved: ",
+    "status_grid_shown": "Affect Grid ready.",
     "status_cleared": "Interface cleared.",
     "status_loading_model": "Loading sentiment model... Please wait.",
     "model_loading_failed_message": "Failed to load sentiment model.",
@@ -72,6 +215,8 @@ english = {
     "menu_help": "Help",
     "menu_help_content": "How to Use / Info",
     "menu_about": "About PsyText",
+    "menu_profile": "Profile Next Analyses (cProfile + Memory)",
+    "profile_saved": "Profile saved:",
     "about_title": "About PsyText",
     "about_content": "PsyText - Text Psychological Analyzer\n\nVersion: 1.0\nDeveloped by: [O TEU NOME AQUI]\n\nThis application performs sentiment analysis and provides basic textual metrics.",
     "help_title": "PsyText - Help / Info",
@@ -94,14 +239,14 @@ english = {
     )
 }
 
-# # Lexicons para contagem de emoções por palavra (inglês) # Comentado para desativar a contagem de emoções
-# emotion_lexicons_en = { # Comentado para desativar a contagem de emoções
-#     "joy": ["happy", "joy", "glad", "elated", "pleased", "delighted", "ecstatic", "cheerful"], # Comentado para desativar a contagem de emoções
-#     "sadness": ["sad", "unhappy", "sorrow", "grief", "miserable", "depressed", "gloomy", "dejected"], # Comentado para desativar a contagem de emoções
-#     "anger": ["angry", "mad", "furious", "rage", "irritated", "annoyed", "enraged", "resentful"], # Comentado para desativar a contagem de emoções
-#     "fear": ["fear", "scared", "afraid", "terrified", "anxious", "nervous", "worried", "dread"], # Comentado para desativar a contagem de emoções
-#     "surprise": ["surprise", "surprised", "amazed", "astonished", "startled"] # Comentado para desativar a contagem de emoções
-# } # Comentado para desativar a contagem de emoções
+# Lexicons para contagem de emoções por palavra (inglês)
+emotion_lexicons_en = {
+    "joy": ["happy", "joy", "glad", "elated", "pleased", "delighted", "ecstatic", "cheerful"],
+    "sadness": ["sad", "unhappy", "sorrow", "grief", "miserable", "depressed", "gloomy", "dejected"],
+    "anger": ["angry", "mad", "furious", "rage", "irritated", "annoyed", "enraged", "resentful"],
+    "fear": ["fear", "scared", "afraid", "terrified", "anxious", "nervous", "worried", "dread"],
+    "surprise": ["surprise", "surprised", "amazed", "astonished", "startled"]
+}
 
 # categorias de pronomes (em ingles)
 pronoun_categories_en = {
@@ -0,0 +1,105 @@
+# este módulo tem o "documento" já partido em frases e palavras,
+# para o texto ser tokenizado uma única vez e depois reaproveitado por todas as métricas
+# (sentimento, descritores textuais, pronomes e legibilidade)
+
+# imports locais
+from registo import etapa  # medição da tokenização
+
+import functools  # para guardar os tokenizadores em cache
+
+# os tokenizadores do nltk só são importados e construídos na primeira vez que são precisos,
+# para importar este módulo não obrigar a importar o nltk
+
+@functools.lru_cache(maxsize=None)
+def _tokenizador_frases(language="english"):
+    """devolve o tokenizador punkt do idioma (o mesmo que o nltk.sent_tokenize usa), carregado só uma vez por processo"""
+    from nltk.tokenize.punkt import PunktTokenizer
+    return PunktTokenizer(language)
+
+@functools.lru_cache(maxsize=None)
+def _tokenizador_palavras():
+    """devolve o tokenizador de palavras (o mesmo que o nltk.word_tokenize usa)"""
+    from nltk.tokenize.destructive import NLTKWordTokenizer
+    return NLTKWordTokenizer()
+
+class Documento:
+    """
+    texto partido em frases e palavras numa só passagem
+
+    Attributes:
+        texto (str): o texto original
+        frases (list): as frases do texto, pela ordem original
+        spans (list): pares (início, fim) de cada frase no texto original
+        tokens_por_frase (list): para cada frase, a lista de tokens em minúsculas (inclui a pontuação)
+    """
+    def __init__(self, texto, frases, spans, tokens_por_frase):
+        self.texto = texto
+        self.frases = frases
+        self.spans = spans
+        self.tokens_por_frase = tokens_por_frase
+        self._palavras = None
+
+    @property
+    def num_frases(self):
+        return len(self.frases)
+
+    @property
+    def tokens(self):
+        """todos os tokens do texto em minúsculas (equivalente a word_tokenize(texto.lower()))"""
+        return [token for tokens in self.tokens_por_frase for token in tokens]
+
+    @property
+    def palavras(self):
+        """os tokens sem pontuação (só os alfanuméricos), calculados uma vez e guardados"""
+        if self._palavras is None:
+            self._palavras = [token for tokens in self.tokens_por_frase for token in tokens if token.isalnum()]
+        return self._palavras
+
+def construir_documento(texto, language="english"):
+    """
+    parte o texto em frases (com as posições no texto original) e cada frase em tokens
+
+    Args:
+        texto (str): o texto a analisar
+        language (str, optional): o modelo punkt a usar
+
+    Returns:
+        Documento: o documento já tokenizado
+    """
+    with etapa("tokenize") as medicao:
+        spans = list(_tokenizador_frases(language).span_tokenize(texto))
+        frases = [texto[inicio:fim] for inicio, fim in spans]
+        tokenizar = _tokenizador_palavras().tokenize
+        tokens_por_frase = [[token.lower() for token in tokenizar(frase)] for frase in frases]
+        if medicao:
+            medicao.contar(frases=len(frases), tokens=sum(map(len, tokens_por_frase)))
+    return Documento(texto, frases, spans, tokens_por_frase)
+
+def documento_de_frases(frases, spans=None):
+    """
+    constrói um Documento a partir de frases já separadas (por exemplo, as frases que vão chegando na análise em fluxo)
+
+    Args:
+        frases (list): as frases
+        spans (list, optional): as posições de cada frase no texto original, se forem conhecidas
+
+    Returns:
+        Documento: o documento, sem o texto completo (texto fica None)
+    """
+    frases = list(frases)
+    with etapa("tokenize") as medicao:
+        tokenizar = _tokenizador_palavras().tokenize
+        tokens_por_frase = [[token.lower() for token in tokenizar(frase)] for frase in frases]
+        if medicao:
+            medicao.contar(frases=len(frases), tokens=sum(map(len, tokens_por_frase)))
+    return Documento(None, frases, spans, tokens_por_frase)
+
+def iterar_spans_frases(texto, language="english"):
+    """devolve um iterador (lazy) das posições (início, fim) das frases do texto"""
+    return _tokenizador_frases(language).span_tokenize(texto)
+
+def como_documento(texto_ou_documento):
+    """aceita um texto ou um Documento já construído e devolve sempre um Documento"""
+    if isinstance(texto_ou_documento, Documento):
+        return texto_ou_documento
+    return construir_documento(texto_ou_documento)
@@ -0,0 +1,319 @@
+# este módulo tem os formatos compactos de exportação das frases analisadas, para além do json com indentação:
+# - json lines (.jsonl): uma frase por linha, escrito à medida que as frases chegam
+# - colunas (.npy): uma pasta com a valência e o arousal em arrays de floats, a cor em códigos pequenos
+#   e as frases num só ficheiro de texto com as posições de cada uma; tudo se carrega com memory-map
+# - parquet: as mesmas colunas num ficheiro parquet, só se o pyarrow estiver instalado
+# os formatos usados numa análise estão em defaults.exports["formats"]
+
+# imports locais
+from defaults import paths as ph, exports as cfg_exportacao
+from registo import obter_logger, medir_etapa
+
+# bibliotecas gerais
+import os  # para os caminhos
+import json  # para o json lines e os metadados das colunas
+import struct  # para o cabeçalho dos ficheiros .npy escritos aos bocados
+
+log = obter_logger(__name__)
+
+_FORMATO_COLUNAS = 1  # muda se a estrutura da pasta de colunas mudar
+FORMATOS = ("json", "jsonl", "columns", "parquet")  # os formatos que se podem pedir em defaults.exports["formats"]
+
+def formatos_desconhecidos(formatos):
+    """os nomes pedidos que não são formatos de exportação (ex: um erro de escrita como "parquett")"""
+    return [formato for formato in formatos if formato not in FORMATOS]
+
+def verificar_formatos(formatos):
+    """
+    recusa os formatos que não existem, antes de se escrever o que quer que seja
+
+    Raises:
+        ValueError: se algum formato não existir (ex: um erro de escrita em defaults.exports["formats"])
+    """
+    desconhecidos = formatos_desconhecidos(formatos)
+    if desconhecidos:
+        raise ValueError(f"unknown export format(s): {', '.join(desconhecidos)} (choose from {', '.join(FORMATOS)})")
+
+def caminhos_exportacao(output_dir, base_filename):
+    """os caminhos de cada formato de exportação para um nome base"""
+    base = os.path.join(output_dir, base_filename)
+    return {
+        "json": f"{base}{ph.get('json_suffix', '_analysis.json')}",
+        "jsonl": f"{base}{ph['jsonl_suffix']}",
+        "columns": f"{base}{ph['columns_suffix']}",
+        "parquet": f"{base}{ph['parquet_suffix']}",
+    }
+
+def _garantir_pasta(caminho):
+    pasta = os.path.dirname(caminho)
+    if pasta:
+        os.makedirs(pasta, exist_ok=True)
+
+class EscritorJsonl:
+    """escreve uma frase por linha (json lines), à medida que chegam; nunca tem a lista toda em memória"""
+    def __init__(self, caminho):
+        _garantir_pasta(caminho)
+        self.caminho = caminho
+        self._f = open(caminho, "w", encoding="utf-8")
+
+    def escrever(self, info):
+        self._f.write(json.dumps(info, ensure_ascii=False, separators=(",", ":")))
+        self._f.write("\n")
+
+    def fechar(self):
+        self._f.close()
+
+def _cabecalho_npy(descr, n, tamanho=128):
+    """
+    cabeçalho de um .npy 1.0 de uma dimensão com `tamanho` bytes certos,
+    para poder ser escrito primeiro (com n desconhecido) e reescrito no fim no mesmo espaço
+    """
+    dicionario = f"{{'descr': '{descr}', 'fortran_order': False, 'shape': ({n},), }}"
+    espaco = tamanho - 10 - 1  # 6 da assinatura, 2 da versão, 2 do tamanho e o '\n' no fim
+    return b"\x93NUMPY\x01\x00" + struct.pack("<H", tamanho - 10) + dicionario.ljust(espaco).encode("latin1") + b"\n"
+
+class _ColunaNpy:
+    """uma coluna .npy escrita aos bocados: os valores vão sendo acrescentados e o tamanho só é escrito no fim"""
+    def __init__(self, caminho, formato_struct, descr):
+        self._f = open(caminho, "wb")
+        self._formato = formato_struct
+        self._descr = descr
+        self.n = 0
+        self._f.write(_cabecalho_npy(descr, 0))
+
+    def acrescentar(self, valores):
+        self._f.write(struct.pack(f"<{len(valores)}{self._formato}", *valores))
+        self.n += len(valores)
+
+    def fechar(self):
+        self._f.seek(0)
+        self._f.write(_cabecalho_npy(self._descr, self.n))
+        self._f.close()
+
+class EscritorColunas:
+    """
+    escreve a exportação em colunas numa pasta, à medida que as frases chegam:
+    valence.npy e arousal.npy (float64), color.npy (uint8, índice na lista de cores),
+    offsets.npy (int64, n+1 posições em bytes) e sentences.txt (as frases em utf-8, seguidas),
+    e meta.json com o número de frases e a lista de cores
+    """
+    _LOTE = 4096  # frases guardadas antes de cada escrita
+
+    def __init__(self, pasta):
+        os.makedirs(pasta, exist_ok=True)
+        self.pasta = pasta
+        self.caminho = pasta
+        self._valence = _ColunaNpy(os.path.join(pasta, "valence.npy"), "d", "<f8")
+        self._arousal = _ColunaNpy(os.path.join(pasta, "arousal.npy"), "d", "<f8")
+        self._cor = _ColunaNpy(os.path.join(pasta, "color.npy"), "B", "|u1")
+        self._offsets = _ColunaNpy(os.path.join(pasta, "offsets.npy"), "q", "<i8")
+        self._frases = open(os.path.join(pasta, "sentences.txt"), "wb")
+        self._offsets.acrescentar([0])
+        self._posicao = 0
+        self.cores = []
+        self._indices_cores = {}
+        self._lote = []
+
+    def escrever(self, info):
+        self._lote.append(info)
+        if len(self._lote) >= self._LOTE:
+            self._escrever_lote()
+
+    def _escrever_lote(self):
+        lote, self._lote = self._lote, []
+        if not lote:
+            return
+        codigos = []
+        for info in lote:
+            codigo = self._indices_cores.get(info["cor"])
+            if codigo is None:
+                codigo = self._indices_cores[info["cor"]] = len(self.cores)
+                self.cores.append(info["cor"])
+            codigos.append(codigo)
+        offsets = []
+        for info in lote:
+            dados = info["frase"].encode("utf-8")
+            self._frases.write(dados)
+            self._posicao += len(dados)
+            offsets.append(self._posicao)
+        self._valence.acrescentar([info["valence"] for info in lote])
+        self._arousal.acrescentar([info["arousal"] for info in lote])
+        self._cor.acrescentar(codigos)
+        self._offsets.acrescentar(offsets)
+
+    def fechar(self):
+        self._escrever_lote()
+        for coluna in (self._valence, self._arousal, self._cor, self._offsets):
+            coluna.fechar()
+        self._frases.close()
+        with open(os.path.join(self.pasta, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump({"formato": _FORMATO_COLUNAS, "num_frases": self._valence.n, "cores": self.cores}, f)
+
+def parquet_disponivel():
+    """diz se o pyarrow está instalado (sem ele não há exportação parquet)"""
+    import importlib.util
+    return importlib.util.find_spec("pyarrow") is not None
+
+class EscritorParquet:
+    """
+    escreve as frases num ficheiro parquet (colunas sentence, valence, arousal e color), um grupo de linhas de cada vez
+    precisa do pyarrow; a coluna da cor repete-se muito e fica guardada como dicionário pelo próprio parquet
+    """
+    _LOTE = 65536  # frases em cada grupo de linhas
+
+    def __init__(self, caminho):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        _garantir_pasta(caminho)
+        self._pa = pa
+        self._esquema = pa.schema([("sentence", pa.string()), ("valence", pa.float64()),
+                                   ("arousal", pa.float64()), ("color", pa.string())])
+        self.caminho = caminho
+        self._escritor = pq.ParquetWriter(caminho, self._esquema)
+        self._lote = []
+
+    def escrever(self, info):
+        self._lote.append(info)
+        if len(self._lote) >= self._LOTE:
+            self._escrever_lote()
+
+    def _escrever_lote(self):
+        lote, self._lote = self._lote, []
+        if lote:
+            self._escritor.write_table(self._pa.table({
+                "sentence": [info["frase"] for info in lote],
+                "valence": [info["valence"] for info in lote],
+                "arousal": [info["arousal"] for info in lote],
+                "color": [info["cor"] for info in lote],
+            }, schema=self._esquema))
+
+    def fechar(self):
+        self._escrever_lote()
+        self._escritor.close()
+
+def abrir_escritores(output_dir, base_filename, formatos=None):
+    """
+    abre um escritor para cada formato compacto pedido (cada um tem escrever(info) e fechar())
+
+    Args:
+        output_dir (str): a pasta de saída
+        base_filename (str): o nome base dos ficheiros
+        formatos (list, optional): alguns de "jsonl", "columns" e "parquet" (o "json" é ignorado aqui, porque
+                                   é escrito pelo psytext.exportar_json); por defeito defaults.exports["formats"]
+
+    Returns:
+        dict: formato -> escritor
+
+    Raises:
+        ValueError: se algum formato não existir (ex: um erro de escrita em defaults.exports["formats"])
+    """
+    if formatos is None:
+        formatos = cfg_exportacao["formats"]
+    verificar_formatos(formatos)
+    caminhos = caminhos_exportacao(output_dir, base_filename)
+    escritores = {}
+    if "jsonl" in formatos:
+        escritores["jsonl"] = EscritorJsonl(caminhos["jsonl"])
+    if "columns" in formatos:
+        escritores["columns"] = EscritorColunas(caminhos["columns"])
+    if "parquet" in formatos:
+        if parquet_disponivel():
+            escritores["parquet"] = EscritorParquet(caminhos["parquet"])
+        else:
+            log.warning("Parquet export skipped: pyarrow is not installed.")
+    return escritores
+
+@medir_etapa("exports", lambda frases_info, *args, **kwargs: (len(frases_info), 0))
+def exportar_frases(frases_info, output_dir, base_filename, formatos=None):
+    """
+    escreve as frases nos formatos compactos pedidos (o "json" com indentação continua no psytext.exportar_json)
+
+    Args:
+        frases_info (iterable): os dicionários de cada frase
+        output_dir (str): a pasta de saída
+        base_filename (str): o nome base dos ficheiros
+        formatos (list, optional): alguns de "jsonl", "columns" e "parquet"; por defeito defaults.exports["formats"]
+
+    Returns:
+        dict: formato -> caminho escrito
+    """
+    escritores = abrir_escritores(output_dir, base_filename, formatos)
+    try:
+        for info in frases_info:
+            for escritor in escritores.values():
+                escritor.escrever(info)
+    finally:
+        for escritor in escritores.values():
+            escritor.fechar()
+    return {formato: escritor.caminho for formato, escritor in escritores.items()}
+
+class FrasesEmColunas:
+    """
+    as frases de uma exportação em colunas, com as colunas em memory-map (só é lido do disco o que é usado)
+
+    Attributes:
+        valence (numpy.ndarray): valência de cada frase
+        arousal (numpy.ndarray): arousal de cada frase
+        codigos_cor (numpy.ndarray): índice da cor de cada frase em `cores`
+        cores (list): os nomes das cores
+    """
+    def __init__(self, pasta, mmap=True):
+        import numpy as np
+        with open(os.path.join(pasta, "meta.json"), encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("formato") != _FORMATO_COLUNAS:
+            raise ValueError(f"Unsupported columns export format: {meta.get('formato')}")
+        modo = "r" if mmap else None
+        self.valence = np.load(os.path.join(pasta, "valence.npy"), mmap_mode=modo)
+        self.arousal = np.load(os.path.join(pasta, "arousal.npy"), mmap_mode=modo)
+        self.codigos_cor = np.load(os.path.join(pasta, "color.npy"), mmap_mode=modo)
+        self._offsets = np.load(os.path.join(pasta, "offsets.npy"), mmap_mode=modo)
+        caminho_frases = os.path.join(pasta, "sentences.txt")
+        if os.path.getsize(caminho_frases) == 0:
+            self._frases = b""  # o memmap não aceita ficheiros vazios
+        elif mmap:
+            self._frases = np.memmap(caminho_frases, dtype=np.uint8, mode="r")
+        else:
+            with open(caminho_frases, "rb") as f:
+                self._frases = f.read()
+        self.cores = meta["cores"]
+
+    def __len__(self):
+        return len(self.valence)
+
+    def frase(self, i):
+        """o texto da frase i (só esta frase é lida do ficheiro)"""
+        return bytes(self._frases[self._offsets[i]:self._offsets[i + 1]]).decode("utf-8")
+
+    @property
+    def cor(self):
+        """o nome da cor de cada frase"""
+        return [self.cores[codigo] for codigo in self.codigos_cor]
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        return {"frase": self.frase(i), "valence": float(self.valence[i]),
+                "arousal": float(self.arousal[i]), "cor": self.cores[self.codigos_cor[i]]}
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+def carregar_colunas(pasta, mmap=True):
+    """carrega uma exportação em colunas (ver EscritorColunas), por defeito com memory-map"""
+    return FrasesEmColunas(pasta, mmap)
+
+def carregar_jsonl(caminho):
+    """lê um ficheiro json lines, uma frase de cada vez (é um gerador)"""
+    with open(caminho, encoding="utf-8") as f:
+        for linha in f:
+            if linha.strip():
+                yield json.loads(linha)
+
+def carregar_parquet(caminho):
+    """lê uma exportação parquet com memory-map; devolve uma tabela do pyarrow (precisa do pyarrow)"""
+    import pyarrow.parquet as pq
+    return pq.read_table(caminho, memory_map=True)
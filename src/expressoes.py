@@ -0,0 +1,173 @@
+# este módulo faz com que as entradas de várias palavras do léxico do VADER (ex: "dead end", "fed up") contem
+# o VADER só procura no léxico palavra a palavra, por isso essas entradas nunca eram usadas
+# as expressões são compiladas uma vez num autómato de Aho-Corasick sobre palavras, que encontra todas as ocorrências
+# numa só passagem pelas palavras de cada frase: o custo não depende de quantas expressões o léxico tem
+
+# bibliotecas gerais
+from collections import deque  # para as ligações de falha do autómato (em largura)
+
+VERSAO = 1  # muda se a forma de pontuar as expressões mudar (invalida as pontuações guardadas na cache de frases)
+
+def normalizar(expressao):
+    """a forma de uma expressão usada no índice: palavras em minúsculas separadas por um só espaço"""
+    return " ".join(expressao.lower().split())
+
+def e_expressao(chave):
+    """
+    diz se uma entrada do léxico é uma expressão de várias palavras (ex: "fed up"), e não um emoticon
+    com espaços (ex: "( '}{' )"): todas as partes têm de ter pelo menos uma letra
+    """
+    partes = chave.split()
+    return len(partes) > 1 and all(any(c.isalpha() for c in parte) for parte in partes)
+
+class IndiceExpressoes:
+    """
+    autómato de Aho-Corasick de expressões de várias palavras (o "alfabeto" são as palavras, não as letras)
+
+    Attributes:
+        expressoes (tuple): as expressões do índice, já normalizadas
+    """
+    def __init__(self, expressoes):
+        """
+        Args:
+            expressoes (iterable): as expressões; as de uma só palavra são ignoradas
+        """
+        self._transicoes = [{}]  # estado -> {palavra: estado seguinte}; o estado 0 é a raiz
+        self._falhas = [0]  # estado -> o estado do maior sufixo que também é prefixo de uma expressão
+        self._saidas = [()]  # estado -> (número de palavras, expressão) das expressões que acabam neste estado
+        normalizadas = []
+        for expressao in expressoes:
+            palavras = normalizar(expressao).split()
+            if len(palavras) < 2:
+                continue
+            estado = 0
+            for palavra in palavras:
+                seguinte = self._transicoes[estado].get(palavra)
+                if seguinte is None:
+                    seguinte = len(self._transicoes)
+                    self._transicoes[estado][palavra] = seguinte
+                    self._transicoes.append({})
+                    self._falhas.append(0)
+                    self._saidas.append(())
+                estado = seguinte
+            if not self._saidas[estado]:
+                normalizadas.append(" ".join(palavras))
+                self._saidas[estado] = ((len(palavras), " ".join(palavras)),)
+        self.expressoes = tuple(normalizadas)
+        self._ligar_falhas()
+
+    def _ligar_falhas(self):
+        """calcula as ligações de falha em largura e junta a cada estado as saídas do estado de falha"""
+        fila = deque(self._transicoes[0].values())
+        while fila:
+            estado = fila.popleft()
+            for palavra, seguinte in self._transicoes[estado].items():
+                fila.append(seguinte)
+                falha = self._falhas[estado]
+                while falha and palavra not in self._transicoes[falha]:
+                    falha = self._falhas[falha]
+                falha = self._transicoes[falha].get(palavra, 0)
+                self._falhas[seguinte] = falha
+                self._saidas[seguinte] = self._saidas[seguinte] + self._saidas[falha]
+
+    def __len__(self):
+        return len(self.expressoes)
+
+    def procurar(self, palavras):
+        """
+        todas as ocorrências das expressões, numa só passagem (podem sobrepor-se)
+
+        Args:
+            palavras (list): as palavras da frase, já em minúsculas
+
+        Returns:
+            list: (início, fim, expressão) de cada ocorrência, com fim exclusivo, por ordem do fim
+        """
+        transicoes, falhas, saidas = self._transicoes, self._falhas, self._saidas
+        ocorrencias = []
+        estado = 0
+        for fim, palavra in enumerate(palavras, start=1):
+            while estado and palavra not in transicoes[estado]:
+                estado = falhas[estado]
+            estado = transicoes[estado].get(palavra, 0)
+            for comprimento, expressao in saidas[estado]:
+                ocorrencias.append((fim - comprimento, fim, expressao))
+        return ocorrencias
+
+    def encontrar(self, palavras):
+        """
+        as ocorrências que não se sobrepõem: da esquerda para a direita, e a mais comprida quando começam no mesmo sítio
+
+        Returns:
+            list: (início, fim, expressão) de cada ocorrência escolhida, pela ordem da frase
+        """
+        ocorrencias = self.procurar(palavras)
+        if len(ocorrencias) < 2:
+            return ocorrencias
+        escolhidas = []
+        livre = 0  # a primeira palavra ainda não usada por uma expressão escolhida
+        for inicio, fim, expressao in sorted(ocorrencias, key=lambda o: (o[0], o[0] - o[1])):
+            if inicio >= livre:
+                escolhidas.append((inicio, fim, expressao))
+                livre = fim
+        return escolhidas
+
+class AnalisadorComExpressoes:
+    """
+    o SentimentIntensityAnalyzer do VADER com as expressões de várias palavras do seu léxico
+    cada expressão encontrada é pontuada como se fosse uma só palavra do léxico, na posição da primeira palavra
+    (com as mesmas regras de maiúsculas, intensificadores e negações das palavras antes dela), e as outras palavras
+    da expressão ficam a 0; as frases sem expressões têm exatamente a mesma pontuação que no VADER
+    os outros atributos (lexicon, constants, ...) são os do analisador original
+    """
+    def __init__(self, sia):
+        """
+        Args:
+            sia (SentimentIntensityAnalyzer): o analisador já com o léxico final
+        """
+        self.sia = sia
+        multiplas = [chave for chave in sia.lexicon if e_expressao(chave)]
+        for chave in multiplas:
+            # a expressão é procurada no léxico pela sua forma normalizada (ver sentiment_valence)
+            sia.lexicon.setdefault(normalizar(chave), sia.lexicon[chave])
+        self.expressoes = IndiceExpressoes(multiplas)
+
+    def __getattr__(self, nome):
+        return getattr(self.sia, nome)
+
+    def polarity_scores(self, text):
+        """o mesmo dicionário (neg, neu, pos, compound) do VADER"""
+        from nltk.sentiment.vader import SentiText
+        sia = self.sia
+        constantes = sia.constants
+        sentitext = SentiText(text, constantes.PUNC_LIST, constantes.REGEX_REMOVE_PUNCTUATION)
+        palavras = sentitext.words_and_emoticons
+        minusculas = [palavra.lower() for palavra in palavras]
+        inicios = {inicio: fim for inicio, fim, _ in self.expressoes.encontrar(minusculas)} if self.expressoes else {}
+
+        # o resto é o ciclo do VADER (nltk.sentiment.vader.SentimentIntensityAnalyzer.polarity_scores),
+        # incluindo o índice da primeira ocorrência de cada palavra que ele usa para as palavras repetidas
+        # (usa métodos internos do VADER: a versão do nltk está fixada no requirements.txt e
+        # tests/test_expressoes.py compara este ciclo com o do nltk)
+        primeira = {}
+        for j, palavra in enumerate(palavras):
+            primeira.setdefault(palavra, j)
+        sentiments = []
+        j = 0
+        while j < len(palavras):
+            fim = inicios.get(j)
+            if fim is not None:
+                sentiments = sia.sentiment_valence(0, sentitext, " ".join(palavras[j:fim]), j, sentiments)
+                sentiments.extend([0] * (fim - j - 1))
+                j = fim
+                continue
+            item = palavras[j]
+            i = primeira[item]
+            if (i < len(palavras) - 1 and minusculas[j] == "kind" and palavras[i + 1].lower() == "of") \
+                    or minusculas[j] in constantes.BOOSTER_DICT:
+                sentiments.append(0)
+            else:
+                sentiments = sia.sentiment_valence(0, sentitext, item, i, sentiments)
+            j += 1
+        sentiments = sia._but_check(palavras, sentiments)
+        return sia.score_valence(sentiments, text)
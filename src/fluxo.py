@@ -0,0 +1,203 @@
+# este módulo tem a análise "em fluxo" para ficheiros muito grandes (logs, transcrições de centenas de MB)
+# o ficheiro é lido aos bocados, as frases partidas a meio de um bocado passam para o seguinte,
+# e cada frase é pontuada e enviada logo para as páginas do html, o json e as estatísticas, sem guardar a lista toda em memória
+# a memória usada depende do tamanho dos bocados e do vocabulário, e não do tamanho do documento
+
+# imports locais
+from defaults import paths as ph, english as st, streaming as cfg_fluxo, exports as cfg_exportacao
+from documento import documento_de_frases, iterar_spans_frases
+from acumulador import AcumuladorEstatisticas
+from relatorio import EscritorRelatorioPaginado
+from exportacao import abrir_escritores
+from registo import obter_logger
+import psytext
+
+# bibliotecas gerais
+import os  # para os caminhos de saída
+import json  # para escrever cada frase no json
+import shutil  # para apagar as saídas de uma análise que não chegou ao fim
+
+log = obter_logger(__name__)
+
+TAMANHO_BLOCO = cfg_fluxo["chunk_chars"]  # caracteres de texto lidos de cada vez
+TAMANHO_LOTE = 256  # frases pontuadas de cada vez (a cache de frases trabalha melhor em lotes)
+
+def ler_blocos(caminho, tamanho_bloco=TAMANHO_BLOCO):
+    """lê o ficheiro em bocados de texto (o ficheiro nunca é lido todo de uma vez)"""
+    with open(caminho, "r", encoding="utf-8") as f:
+        while True:
+            bloco = f.read(tamanho_bloco)
+            if not bloco:
+                break
+            yield bloco
+
+def iterar_frases(blocos, max_caracteres=None):
+    """
+    parte um fluxo de bocados de texto em frases
+    a última frase de cada bocado pode estar incompleta, por isso fica guardada e é juntada ao bocado seguinte;
+    num texto sem pontuação essa sobra é cortada quando passa de `max_caracteres`, para a memória e o tempo
+    de cada bocado não crescerem com o tamanho do ficheiro
+
+    Args:
+        blocos (iterable): os bocados de texto, pela ordem
+        max_caracteres (int, optional): tamanho máximo da sobra; por defeito defaults.streaming["max_sentence_chars"]
+
+    Yields:
+        str: cada frase (ou bocado de uma frase demasiado comprida), pela ordem do texto
+    """
+    max_caracteres = max_caracteres or cfg_fluxo["max_sentence_chars"]
+    resto = ""
+    for bloco in blocos:
+        texto = resto + bloco
+        spans = list(iterar_spans_frases(texto))
+        if not spans:
+            resto = texto
+        else:
+            # todas menos a última estão completas: a fronteira delas foi decidida já a ver o início da frase seguinte
+            for inicio, fim in spans[:-1]:
+                yield texto[inicio:fim]
+            resto = texto[spans[-1][0]:]
+        while len(resto) > max_caracteres:
+            # corta na última mudança de linha dentro do limite ou, se não houver, no próprio limite
+            corte = resto.rfind("\n", 0, max_caracteres) + 1 or max_caracteres
+            yield resto[:corte]
+            resto = resto[corte:]
+    if resto.strip():
+        for inicio, fim in iterar_spans_frases(resto):
+            yield resto[inicio:fim]
+
+def _lotes(iteravel, tamanho):
+    """junta os elementos em listas de, no máximo, `tamanho` elementos"""
+    lote = []
+    for elemento in iteravel:
+        lote.append(elemento)
+        if len(lote) >= tamanho:
+            yield lote
+            lote = []
+    if lote:
+        yield lote
+
+class EscritorJsonEmFluxo:
+    """escreve a lista de frases em json à medida que chegam, com o mesmo formato que o json.dump(indent=4)"""
+    def __init__(self, caminho):
+        pasta = os.path.dirname(caminho)
+        if pasta:
+            os.makedirs(pasta, exist_ok=True)
+        self.caminho = caminho
+        self._f = open(caminho, "w", encoding="utf-8")
+        self._primeira = True
+
+    def escrever(self, info):
+        separador = "[\n" if self._primeira else ",\n"
+        self._primeira = False
+        item = json.dumps(info, indent=4, ensure_ascii=False)
+        self._f.write(separador + "\n".join("    " + linha for linha in item.split("\n")))
+
+    def fechar(self):
+        self._f.write("[]" if self._primeira else "\n]")
+        self._f.close()
+
+def _apagar_saida(caminho):
+    """apaga um ficheiro ou uma pasta de saída (ex: a pasta das colunas .npy), se existir"""
+    if os.path.isdir(caminho):
+        shutil.rmtree(caminho, ignore_errors=True)
+    elif os.path.exists(caminho):
+        os.remove(caminho)
+
+def pontuar_em_fluxo(frases, tamanho_lote=TAMANHO_LOTE, estatisticas=None, progresso=None, cancelar=None):
+    """
+    pontua as frases à medida que chegam, em lotes pequenos
+
+    Args:
+        frases (iterable): as frases (por exemplo, de iterar_frases)
+        tamanho_lote (int, optional): quantas frases são tokenizadas e pontuadas de cada vez
+        estatisticas (AcumuladorEstatisticas, optional): onde juntar as estatísticas
+        progresso (callable, optional): chamado com (frases_feitas, None) depois de cada lote (o total não se sabe)
+        cancelar (threading.Event, optional): se for ativado, pára com psytext.AnaliseCancelada
+
+    Yields:
+        dict: a informação de cada frase (frase, valence, arousal, cor), pela ordem do texto
+    """
+    feitas = 0
+    for lote in _lotes(frases, tamanho_lote):
+        psytext._verificar_cancelamento(cancelar)
+        documento = documento_de_frases(lote)
+        if estatisticas is not None:
+            estatisticas.adicionar_documento(documento)
+        for info in psytext._analisar_frases(documento):
+            if estatisticas is not None:
+                estatisticas.adicionar_frase(info["valence"], info["arousal"])
+            yield info
+        feitas += len(lote)
+        if progresso:
+            progresso(feitas, None)
+
+def deve_usar_fluxo(caminho):
+    """diz se o ficheiro é grande o suficiente para ser analisado em fluxo (ver defaults.streaming)"""
+    try:
+        return os.path.getsize(caminho) > cfg_fluxo["threshold_bytes"]
+    except OSError:
+        return False
+
+def analisar_ficheiro_em_fluxo(caminho, base_filename=None, tamanho_bloco=TAMANHO_BLOCO, progresso=None, cancelar=None,
+                               acumulador=None):
+    """
+    faz a análise completa de um ficheiro em fluxo: html e json são escritos à medida que as frases são pontuadas
+    o html é sempre o relatório paginado (ver relatorio.py): as frases vão para as páginas à medida que chegam
+
+    Args:
+        caminho (str): o ficheiro de texto a analisar
+        base_filename (str, optional): nome base dos ficheiros de saída; por defeito é o nome do ficheiro sem extensão
+        tamanho_bloco (int, optional): quantos caracteres são lidos do ficheiro de cada vez
+        progresso (callable, optional): chamado com (frases_feitas, None) à medida que a análise avança
+        cancelar (threading.Event, optional): se for ativado, a análise pára com psytext.AnaliseCancelada
+        acumulador (AcumuladorEstatisticas, optional): se for dado, as estatísticas do ficheiro são também juntadas a ele
+
+    Returns:
+        tuple: (caminho_html, estatisticas), ou (None, None) se o ficheiro não tiver frases
+               (se a análise for cancelada ou falhar, as saídas já escritas são apagadas)
+    """
+    base_filename = base_filename or os.path.splitext(os.path.basename(caminho))[0]
+    log.debug(f"Starting streaming analysis of {caminho}...")
+    psytext.obter_analisador()
+    output_dir = ph["output_dir"]
+    os.makedirs(output_dir, exist_ok=True)
+    html_out_path = os.path.join(output_dir, f"{base_filename}{ph['html_suffix']}")
+    json_out_path = os.path.join(output_dir, f"{base_filename}{ph.get('json_suffix', '_analysis.json')}")
+
+    estatisticas = AcumuladorEstatisticas()
+    # o json e os outros formatos de exportação (ver exportacao.py) também são escritos frase a frase
+    escritores = abrir_escritores(output_dir, base_filename)
+    if "json" in cfg_exportacao["formats"]:
+        escritores["json"] = EscritorJsonEmFluxo(json_out_path)
+    # o relatório é sempre paginado: as frases vão para as páginas à medida que são pontuadas
+    # e o html (com as estatísticas no início) só é escrito no fim
+    escritor_html = EscritorRelatorioPaginado(html_out_path)
+    concluida = False
+    try:
+        for info in pontuar_em_fluxo(iterar_frases(ler_blocos(caminho, tamanho_bloco)), estatisticas=estatisticas,
+                                     progresso=progresso, cancelar=cancelar):
+            for escritor in escritores.values():
+                escritor.escrever(info)
+            escritor_html.adicionar(info)
+        concluida = True
+    finally:
+        for escritor in escritores.values():
+            escritor.fechar()
+        if not concluida:
+            # cancelada ou com erro: um json fechado a meio pareceria completo e as páginas ficariam sem html,
+            # por isso nenhuma saída desta análise fica no disco
+            escritor_html.descartar()
+            for escritor in escritores.values():
+                _apagar_saida(escritor.caminho)
+            log.warning(f"Streaming analysis of {base_filename} did not finish: its partial outputs were removed.")
+    estatisticas_gerais = estatisticas.para_dict()
+    escritor_html.fechar(estatisticas_gerais)
+    if acumulador is not None:
+        acumulador.juntar(estatisticas)
+
+    if estatisticas.num_frases == 0:
+        log.warning(f"Streaming analysis produced no data for {base_filename}.")
+        return None, None
+    log.info(f"Streaming analysis completed for {base_filename}: {estatisticas.num_frases} sentences.")
+    return html_out_path, estatisticas_gerais
@@ -0,0 +1,128 @@
+# este módulo parte um só texto muito grande (ex: a transcrição de um livro) em fragmentos e pontua-os numa pool de processos
+# os cortes são feitos em fronteiras de frases: à volta de cada corte é vista uma pequena janela do texto
+# e o corte vai para o início de frase mais perto, por isso cada frase fica inteira num só fragmento
+# os resultados das frases são juntados pela ordem do texto e as estatísticas de cada fragmento
+# são juntadas com o AcumuladorEstatisticas, por isso o dicionário final é o mesmo do psytext.analisar_texto
+
+# imports locais
+from defaults import sharding as cfg_fragmentos
+from documento import iterar_spans_frases
+from acumulador import AcumuladorEstatisticas
+from resultados import FrasesAnalisadas
+from registo import obter_logger
+import psytext
+
+# bibliotecas gerais
+import os  # para o número de cores
+import multiprocessing  # para a pool de processos
+
+log = obter_logger(__name__)
+
+def numero_processos(processos=None):
+    """quantos processos usar: os pedidos, os de defaults.sharding["workers"] ou o número de cores"""
+    return max(1, processos or cfg_fragmentos["workers"] or os.cpu_count() or 1)
+
+def deve_fragmentar(texto, processos=None):
+    """
+    diz se o texto é grande o suficiente para ser partido em fragmentos (ver defaults.sharding)
+    nunca dentro de um worker de outra pool (ex: no batch), porque esses processos não podem ter filhos
+    """
+    return (cfg_fragmentos["enabled"] and numero_processos(processos) > 1
+            and len(texto) >= cfg_fragmentos["min_chars"] and not multiprocessing.current_process().daemon)
+
+def dividir_em_fragmentos(texto, num_fragmentos, margem=None):
+    """
+    parte o texto em até `num_fragmentos` bocados de tamanho parecido, com os cortes em inícios de frases
+
+    Args:
+        texto (str): o texto
+        num_fragmentos (int): em quantos bocados partir
+        margem (int, optional): caracteres vistos de cada lado de cada corte; por defeito defaults.sharding["margin_chars"]
+
+    Returns:
+        list: (início, fim) de cada fragmento no texto, pela ordem; juntos cobrem o texto todo
+    """
+    margem = margem or cfg_fragmentos["margin_chars"]
+    limites = [0]
+    for k in range(1, num_fragmentos):
+        alvo = len(texto) * k // num_fragmentos
+        inicio_janela = max(limites[-1], alvo - margem)
+        fim_janela = min(len(texto), alvo + margem)
+        spans = list(iterar_spans_frases(texto[inicio_janela:fim_janela]))
+        # a primeira e a última frase da janela podem estar cortadas; as fronteiras entre as do meio
+        # foram decididas a ver o fim de uma frase e o início da seguinte, tal como no texto inteiro
+        candidatos = [inicio_janela + inicio for inicio, _ in spans[1:-1] if inicio_janela + inicio > limites[-1]]
+        if candidatos:  # sem fronteiras na janela (ex: uma frase enorme) não há corte aqui
+            limites.append(min(candidatos, key=lambda corte: abs(corte - alvo)))
+    limites.append(len(texto))
+    return list(zip(limites[:-1], limites[1:]))
+
+def _inicializar_worker(usar_cache=True):
+    """corre uma vez em cada processo da pool: carrega o VADER (e a cache de frases, se estiver ligada)"""
+    if not usar_cache:
+        psytext.desativar_cache_frases()
+    psytext.obter_analisador()
+
+def _analisar_fragmento(fragmento):
+    """
+    analisa um fragmento dentro de um worker
+
+    Returns:
+        tuple: (FrasesAnalisadas, AcumuladorEstatisticas) do fragmento
+    """
+    documento = psytext.construir_documento(fragmento)
+    frases_info = psytext._analisar_frases(documento)
+    acumulador = AcumuladorEstatisticas()
+    acumulador.adicionar_frases(frases_info)
+    acumulador.adicionar_documento(documento)
+    return frases_info, acumulador
+
+def _proxima_parte(partes, cancelar):
+    """
+    espera pelo resultado do fragmento seguinte, vendo de vez em quando se a análise foi cancelada
+    (os workers não veem o threading.Event, por isso o cancelamento é visto aqui, enquanto se espera)
+    """
+    while True:
+        try:
+            return partes.next(timeout=cfg_fragmentos["cancel_poll_s"])
+        except multiprocessing.TimeoutError:
+            psytext._verificar_cancelamento(cancelar)
+
+def analisar_em_fragmentos(texto, processos=None, progresso=None, cancelar=None):
+    """
+    pontua as frases de um texto grande numa pool de processos, um fragmento de cada vez em cada processo
+
+    Args:
+        texto (str): o texto
+        processos (int, optional): quantos processos; por defeito numero_processos()
+        progresso (callable, optional): chamado com (frases_feitas, None) depois de cada fragmento
+        cancelar (threading.Event, optional): se for ativado, pára com psytext.AnaliseCancelada e a pool é terminada,
+                                              também a meio de um fragmento (é visto enquanto se espera por cada um)
+
+    Returns:
+        tuple: (FrasesAnalisadas, AcumuladorEstatisticas) do texto inteiro, com as frases pela ordem do texto
+    """
+    processos = numero_processos(processos)
+    # fragmentos demasiado pequenos não compensam o custo de os enviar para outro processo
+    num_fragmentos = max(1, min(processos * cfg_fragmentos["shards_per_worker"],
+                                len(texto) // (10 * cfg_fragmentos["margin_chars"])))
+    fragmentos = dividir_em_fragmentos(texto, num_fragmentos)
+    log.info(f"Splitting the text into {len(fragmentos)} shards across {processos} processes...")
+
+    frases_info = FrasesAnalisadas(texto)
+    acumulador = AcumuladorEstatisticas()
+    # "spawn" e não "fork": a análise pode ser chamada de uma thread (ex: na interface) e um fork de um processo
+    # com várias threads pode herdar locks presos
+    contexto = multiprocessing.get_context("spawn")
+    usar_cache = psytext.obter_cache_frases() is not None
+    with contexto.Pool(processes=min(processos, len(fragmentos)), initializer=_inicializar_worker,
+                       initargs=(usar_cache,)) as pool:
+        partes = pool.imap(_analisar_fragmento, (texto[inicio:fim] for inicio, fim in fragmentos))
+        for inicio, _ in fragmentos:
+            psytext._verificar_cancelamento(cancelar)
+            frases_fragmento, acumulador_fragmento = _proxima_parte(partes, cancelar)
+            frases_info.estender(frases_fragmento, deslocamento=inicio)
+            acumulador.juntar(acumulador_fragmento)
+            if progresso:
+                progresso(len(frases_info), None)
+    return frases_info, acumulador
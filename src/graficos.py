@@ -0,0 +1,166 @@
+# este módulo constrói as figuras dos gráficos (affect grid e trajetória do sentimento)
+# as figuras são feitas a partir de arrays numpy, sem passar por um DataFrame, e com a Figure do matplotlib
+# diretamente (sem o pyplot e o seu estado global), para poderem ser construídas fora da thread principal
+# o numpy e o matplotlib só são importados quando um gráfico é pedido
+
+# imports locais
+from defaults import charts as cfg_graficos
+from resultados import FrasesAnalisadas
+
+def arrays_frases(frases_info, chave):
+    """devolve os valores de uma chave numérica (ex: 'valence') de todas as frases num array numpy"""
+    import numpy as np
+    if isinstance(frases_info, FrasesAnalisadas):
+        # os resultados em colunas já têm os valores num array: não há cópia nenhuma
+        return frases_info.colunas_numpy()[0 if chave == "valence" else 1]
+    return np.fromiter((info[chave] for info in frases_info), dtype=float, count=len(frases_info))
+
+def figura_affect_grid(frases_info, modo=None):
+    """
+    constrói a figura do affect grid (valence no x, arousal no y)
+    com poucas frases cada frase é um ponto com a cor do seu sentimento; com muitas, os pontos são agrupados
+    num histograma 2D (mapa de densidade), que se desenha no mesmo tempo seja qual for o número de frases
+
+    Args:
+        frases_info (list): lista de dicionários com 'valence', 'arousal' e 'cor'
+        modo (str, optional): "scatter" ou "density"; por defeito escolhe pelo número de frases
+                              (ver defaults.charts["affect_grid_density_above"])
+
+    Returns:
+        matplotlib.figure.Figure: a figura
+    """
+    from matplotlib.figure import Figure  # Para gerar gráficos (affect grid)
+    valencias = arrays_frases(frases_info, "valence")
+    arousals = arrays_frases(frases_info, "arousal")
+    if modo is None:
+        modo = "density" if len(frases_info) > cfg_graficos["affect_grid_density_above"] else "scatter"
+
+    fig = Figure(figsize=(8, 8))  # Cria uma figura
+    ax = fig.subplots()  # e um conjunto de subplots
+    if modo == "density":
+        import numpy as np
+        from matplotlib.colors import LogNorm, Normalize
+        divisoes = cfg_graficos["affect_grid_bins"]
+        # a valência vai de -1 a 1 e o arousal de 0 a 1
+        contagens, limites_x, limites_y = np.histogram2d(valencias, arousals, bins=divisoes, range=[[-1, 1], [0, 1]])
+        contagens = np.ma.masked_equal(contagens, 0)  # células vazias ficam em branco
+        minimo, maximo = (contagens.min(), contagens.max()) if contagens.count() else (0, 0)
+        if maximo > minimo:
+            norma = LogNorm(vmin=minimo, vmax=maximo)
+        else:
+            # sem frases, ou com todas as células ocupadas com a mesma contagem, a escala logarítmica não tem amplitude
+            norma = Normalize(vmin=0, vmax=max(1, maximo))
+        malha = ax.pcolormesh(limites_x, limites_y, contagens.T, cmap="viridis", norm=norma)
+        fig.colorbar(malha, ax=ax, label="Sentences per cell")
+    else:
+        # scatter plot: valence no x, arousal no y, e a cor baseada no sentimento
+        cores = frases_info.cores if isinstance(frases_info, FrasesAnalisadas) else [info["cor"] for info in frases_info]
+        ax.scatter(valencias, arousals, c=cores, alpha=0.6)
+    ax.axhline(0, color='black', lw=0.5)  # linha horizontal no eixo y=0
+    ax.axvline(0, color='black', lw=0.5)  # linha vertical no eixo x=0
+
+    ax.set_title("Affect Grid (Valence vs Arousal)")
+    ax.set_xlabel("Valence (Negative <-> Positive)")
+    ax.set_ylabel("Arousal (Passive <-> Active)")
+    ax.grid(True)  # adiciona uma grelha ao gráfico
+    return fig
+
+def media_movel(valores, janela):
+    """
+    média móvel (centrada) com uma janela de `janela` frases, calculada com somas acumuladas
+
+    Returns:
+        tuple: (posições, médias), com as posições no centro de cada janela (índices a começar em 1)
+    """
+    import numpy as np
+    janela = max(1, min(int(janela), len(valores)))
+    acumulado = np.cumsum(np.concatenate(([0.0], valores)))
+    medias = (acumulado[janela:] - acumulado[:-janela]) / janela
+    posicoes = np.arange(len(medias)) + (janela + 1) / 2
+    return posicoes, medias
+
+def lttb(x, y, num_pontos):
+    """
+    reduz uma série a `num_pontos` pontos com o Largest-Triangle-Three-Buckets, que mantém a forma da linha
+    (picos e vales) em vez de fazer só médias: em cada grupo fica o ponto que faz o triângulo de maior área
+    com o ponto escolhido no grupo anterior e a média do grupo seguinte
+
+    Args:
+        x, y (numpy.ndarray): a série original
+        num_pontos (int): quantos pontos devolver (o primeiro e o último são sempre mantidos)
+
+    Returns:
+        tuple: (x, y) reduzidos
+    """
+    import numpy as np
+    n = len(x)
+    if num_pontos >= n or num_pontos < 3:
+        return x, y
+    escolhidos = np.empty(num_pontos, dtype=np.intp)
+    escolhidos[0], escolhidos[-1] = 0, n - 1
+    # num_pontos - 2 grupos entre o primeiro e o último ponto
+    limites = np.linspace(1, n - 1, num_pontos - 1).astype(np.intp)
+    anterior = 0
+    for i in range(num_pontos - 2):
+        inicio, fim = limites[i], limites[i + 1]
+        inicio_seguinte = limites[i + 1]
+        fim_seguinte = limites[i + 2] if i + 2 < len(limites) else n
+        media_x = x[inicio_seguinte:fim_seguinte].mean()
+        media_y = y[inicio_seguinte:fim_seguinte].mean()
+        areas = np.abs((x[anterior] - media_x) * (y[inicio:fim] - y[anterior])
+                       - (x[anterior] - x[inicio:fim]) * (media_y - y[anterior]))
+        anterior = inicio + int(areas.argmax())
+        escolhidos[i + 1] = anterior
+    return x[escolhidos], y[escolhidos]
+
+def figura_trajetoria(frases_info, janela=None, max_pontos=None):
+    """
+    constrói o gráfico de linhas da trajetória do sentimento (a valência) ao longo das frases
+    em textos compridos a valência é primeiro suavizada com uma média móvel e depois reduzida com o LTTB
+    até mais ou menos a largura do gráfico em píxeis, por isso o tempo de desenho não cresce com o texto
+
+    Args:
+        frases_info (list): lista de dicionários, cada um com uma chave 'valence'
+        janela (int, optional): frases em cada média móvel; por defeito defaults.charts["trajectory_window"],
+                                ou automática (frases / pontos) se não estiver definida
+        max_pontos (int, optional): máximo de pontos desenhados; por defeito defaults.charts["trajectory_max_points"],
+                                    ou a largura da figura em píxeis
+
+    Returns:
+        matplotlib.figure.Figure: a figura
+    """
+    from matplotlib.figure import Figure
+    import numpy as np
+    valences = arrays_frases(frases_info, "valence")
+    n = len(valences)
+
+    fig = Figure(figsize=(10, 5))
+    ax = fig.subplots()
+    max_pontos = max_pontos or cfg_graficos["trajectory_max_points"] or int(fig.get_figwidth() * fig.dpi)
+    if n <= max_pontos:
+        # poucas frases: um ponto por frase, como sempre
+        ax.plot(np.arange(1, n + 1), valences, marker='o', linestyle='-', color='b')
+        ax.set_title("Sentiment Trajectory Over Sentences")
+    else:
+        janela = janela or cfg_graficos["trajectory_window"] or max(1, n // max_pontos)
+        posicoes, medias = media_movel(valences, janela)
+        posicoes, medias = lttb(posicoes, medias, max_pontos)
+        ax.plot(posicoes, medias, linestyle='-', color='b', lw=1)
+        ax.set_title(f"Sentiment Trajectory Over Sentences (rolling mean of {janela})")
+    ax.axhline(0, color='grey', lw=0.8, linestyle='--') # linha de referência no zero
+    ax.set_xlabel("Sentence Index")
+    ax.set_ylabel("Valence Score")
+    ax.grid(True)
+    return fig
+
+def figura_para_png(fig, dpi=None):
+    """
+    renderiza a figura para um png em memória (sem passar pelo disco), por exemplo para embutir noutro sítio
+
+    Returns:
+        bytes: o conteúdo do png
+    """
+    import io
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format="png", dpi=dpi)
+    return buffer.getvalue()
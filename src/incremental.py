@@ -0,0 +1,136 @@
+# este módulo tem a análise incremental usada na janela de texto manual
+# em vez de voltar a analisar o texto todo a cada clique, as frases novas são comparadas (difflib) com as da análise anterior
+# e só as frases que mudaram são tokenizadas e pontuadas; as estatísticas são atualizadas somando e subtraindo
+# a parte de cada frase, por isso editar uma palavra num texto comprido custa só a frase editada
+
+# imports locais
+from defaults import paths as ph, emotion_lexicons_en, pronoun_categories_en
+from documento import documento_de_frases, iterar_spans_frases
+from categorias import obter_indice
+from acumulador import AcumuladorEstatisticas
+from legibilidade import silabas_de_contagens
+import psytext
+
+# bibliotecas gerais
+import os  # para os caminhos de saída
+import difflib  # para comparar a lista de frases nova com a anterior
+from collections import Counter  # para o vocabulário de cada frase
+
+class _Frase:
+    """a contribuição de uma frase para a análise (guardada para poder ser subtraída se a frase desaparecer)"""
+    __slots__ = ("texto", "info", "palavras", "silabas", "emocoes", "pronomes")
+
+    def __init__(self, texto, info, tokens):
+        self.texto = texto
+        self.info = info  # None se a frase estiver vazia ou o VADER não a conseguir pontuar
+        self.palavras = Counter(token for token in tokens if token.isalnum())
+        self.silabas = silabas_de_contagens(self.palavras)
+        self.emocoes = obter_indice(emotion_lexicons_en).contar(tokens)
+        self.pronomes = obter_indice(pronoun_categories_en).contar(tokens)
+
+class EstatisticasIncrementais(AcumuladorEstatisticas):
+    """o acumulador de estatísticas, em que cada frase também pode ser retirada"""
+
+    def aplicar(self, frase, sinal):
+        """
+        soma (sinal=1) ou subtrai (sinal=-1) a contribuição de uma frase
+
+        Args:
+            frase (_Frase): a frase já pontuada e tokenizada
+            sinal (int): 1 para juntar, -1 para retirar
+        """
+        info = frase.info
+        if info is not None:
+            if sinal > 0:
+                self.adicionar_frase(info["valence"], info["arousal"])
+            else:
+                self.remover_frase(info["valence"], info["arousal"])
+        self.adicionar_contagens(frase.palavras, frase.silabas, frase.emocoes, frase.pronomes, sinal=sinal)
+
+class AnaliseIncremental:
+    """
+    guarda a última análise de um texto e atualiza-a só com as frases que mudaram
+
+    Attributes:
+        frases (list): as frases (_Frase) da última análise, pela ordem do texto
+        estatisticas (EstatisticasIncrementais): as estatísticas acumuladas dessas frases
+        frases_pontuadas (int): quantas frases foram pontuadas na última atualização
+    """
+    def __init__(self, language="english"):
+        self.language = language
+        self.frases = []
+        self.estatisticas = EstatisticasIncrementais()
+        self.frases_pontuadas = 0
+
+    def atualizar(self, texto, progresso=None, cancelar=None):
+        """
+        atualiza a análise para o texto novo, pontuando só as frases que não estavam na análise anterior
+        as frases novas são todas calculadas antes de mexer no estado, por isso uma análise cancelada
+        deixa a análise anterior intacta
+
+        Args:
+            texto (str): o texto completo, já editado
+            progresso (callable, optional): chamado com (frases_feitas, total) enquanto as frases novas são pontuadas
+            cancelar (threading.Event, optional): se for ativado, pára com psytext.AnaliseCancelada
+
+        Returns:
+            tuple: (frases_info, estatisticas), no mesmo formato que o psytext.analisar_texto usa
+        """
+        psytext.obter_analisador()
+        textos_novos = [texto[inicio:fim] for inicio, fim in iterar_spans_frases(texto, self.language)]
+        textos_antigos = [frase.texto for frase in self.frases]
+        operacoes = difflib.SequenceMatcher(None, textos_antigos, textos_novos, autojunk=False).get_opcodes()
+
+        # 1. tokeniza e pontua de uma vez todas as frases inseridas ou alteradas
+        alteradas = [i for tag, _, _, j1, j2 in operacoes if tag in ("replace", "insert") for i in range(j1, j2)]
+        documento = documento_de_frases([textos_novos[i] for i in alteradas])
+        limpas = [frase.strip() for frase in documento.frases]
+        pontuaveis = [frase for frase in limpas if frase]
+        pontuadas = iter(psytext._pontuar_frases(pontuaveis, progresso, cancelar))
+        novas = {}
+        for i, limpa, tokens in zip(alteradas, limpas, documento.tokens_por_frase):
+            pontuacao = next(pontuadas) if limpa else None
+            info = None
+            if pontuacao is not None:
+                valence, arousal, cor = pontuacao
+                info = {"frase": limpa, "valence": valence, "arousal": arousal, "cor": cor}
+            novas[i] = _Frase(textos_novos[i], info, tokens)
+
+        # 2. aplica as diferenças: tira as frases que saíram, junta as que entraram e reaproveita as iguais
+        frases = []
+        for tag, i1, i2, j1, j2 in operacoes:
+            if tag == "equal":
+                frases.extend(self.frases[i1:i2])
+                continue
+            for frase in self.frases[i1:i2]:
+                self.estatisticas.aplicar(frase, -1)
+            for j in range(j1, j2):
+                self.estatisticas.aplicar(novas[j], 1)
+                frases.append(novas[j])
+        self.frases = frases
+        self.frases_pontuadas = len(pontuaveis)
+        return self.frases_info, self.estatisticas.para_dict()
+
+    @property
+    def frases_info(self):
+        """a lista de frases pontuadas (frase, valence, arousal, cor), como a do psytext.analisar_texto"""
+        return [frase.info for frase in self.frases if frase.info is not None]
+
+    def gravar(self, base_filename="manual_input"):
+        """
+        escreve o html e o json da análise atual (o affect grid só é gerado quando é pedido na interface)
+
+        Returns:
+            tuple: (caminho_html, estatisticas, frases_info), ou (None, None, None) se não houver frases
+        """
+        frases_info = self.frases_info
+        if not frases_info:
+            return None, None, None
+        estatisticas = self.estatisticas.para_dict()
+        output_dir = ph["output_dir"]
+        os.makedirs(output_dir, exist_ok=True)
+        html_out_path = os.path.join(output_dir, f"{base_filename}{ph['html_suffix']}")
+        json_out_path = os.path.join(output_dir, f"{base_filename}{ph.get('json_suffix', '_analysis.json')}")
+        psytext.gerar_html_frases_coloridas(frases_info, output_path=html_out_path, estatisticas_gerais=estatisticas)
+        psytext.exportar_json(frases_info, output_path=json_out_path)
+        return html_out_path, estatisticas, frases_info
@@ -1,14 +1,19 @@
 # bibliotecas locais
-from defaults import default_title as dtitle, english as st, paths as ph
+from defaults import default_title as dtitle, english as st, paths as ph, manual_analysis as cfg_manual, charts as cfg_graficos
 import psytext
+import fluxo
+import incremental
+import graficos
+from registo import obter_logger, configurar_registo
 
 # Bibliotecas gerais
-import os, webbrowser, tkinter as tk, csv
-from tkinter import filedialog, messagebox
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import matplotlib.pyplot as plt
-from PIL import Image, ImageTk # PIL/pillow melhor manuseamento de imagens
-import pandas as pd
+import os, webbrowser, tkinter as tk, csv, threading
+from tkinter import filedialog, messagebox, ttk
+from concurrent.futures import ThreadPoolExecutor
+# o matplotlib só é importado quando se mostra um gráfico, e o psytext carrega o modelo em segundo plano,
+# para a janela aparecer logo
+
+log = obter_logger(__name__)
 
 class App:
     """
@@ -23,7 +28,7 @@ class App:
         Args:
             root (tk.Tk): o widget raiz do tkinter para a aplicação
         """
-        print("Initializing App GUI...")
+        log.debug("Initializing App GUI...")
         self.root = root
         self.root.title(dtitle) # definir título da janela a partir de defaults
         self.initial_width = 700
@@ -32,10 +37,20 @@ class App:
 
         self.frases_info = None
         self.file_path = None
+        self.analise_em_fluxo = False # True se o último ficheiro era tão grande que foi analisado em fluxo (sem frases_info)
+        self.perfil_var = tk.BooleanVar(value=False) # ligado no menu de ajuda: as análises guardam o seu perfil (ver perfil.py)
+        self._caminhos_perfil = None # os ficheiros do perfil da última análise, se foi capturado
         self.canvas_grid = None # isto era para um gráfico embutido, mas agora os gráficos estão em janelas toplevel
         self.current_stats_data = None # para guardar as estatísticas da análise mais recente
 
-        print("Setting up GUI layout...")
+        # as análises e os gráficos correm numa thread de trabalho para a janela não bloquear
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="psytext-worker")
+        self._executor_gravacao = ThreadPoolExecutor(max_workers=1, thread_name_prefix="psytext-save") # pngs dos gráficos
+        self._tarefa_atual = None # o Future da tarefa em curso (só uma de cada vez)
+        self._cancelar = None # threading.Event da tarefa em curso
+        self._progresso = None # (frases_feitas, total) escrito pela thread de trabalho
+
+        log.debug("Setting up GUI layout...")
         self.root.resizable(True, True) # x e y
         self.root.minsize(550, 500) # tamanho mínimo
 
@@ -125,9 +140,9 @@ class App:
         self.label_flesch.pack(anchor="w")
         
         # contagem de emoções (labels dinâmicos)
-        # self.emotion_labels_frame = tk.LabelFrame(self.scrollable_inner_stats_frame, text=st.get('stats_emotion_counts_title', 'Emotion Word Counts:'), padx=5, pady=5) # Comentado para desativar a contagem de emoções
-        # self.emotion_labels_frame.pack(anchor="w", fill="x", pady=(5,0)) # Comentado para desativar a contagem de emoções
-        # self.emotion_labels = {} # para guardar os labels de emoção # Comentado para desativar a contagem de emoções
+        self.emotion_labels_frame = tk.LabelFrame(self.scrollable_inner_stats_frame, text=st.get('stats_emotion_counts_title', 'Emotion Word Counts:'), padx=5, pady=5)
+        self.emotion_labels_frame.pack(anchor="w", fill="x", pady=(5,0))
+        self.emotion_labels = {} # para guardar os labels de emoção
 
         # contagem de pronomes (labels dinâmicos)
         self.pronoun_labels_frame = tk.LabelFrame(self.scrollable_inner_stats_frame, text=st.get('stats_pronoun_counts_title', 'Pronoun Counts:'), padx=5, pady=5)
@@ -145,6 +160,12 @@ class App:
         btn_clear = tk.Button(action_feedback_frame, text=st['clear_interface'], command=self.limpar_interface)
         btn_clear.pack(side=tk.LEFT, padx=(0,10))
 
+        self.btn_cancelar = tk.Button(action_feedback_frame, text=st['cancel'], command=self.cancelar_analise, state=tk.DISABLED)
+        self.btn_cancelar.pack(side=tk.RIGHT, padx=(10,0))
+
+        self.barra_progresso = ttk.Progressbar(action_feedback_frame, orient=tk.HORIZONTAL, length=150, mode="determinate")
+        self.barra_progresso.pack(side=tk.RIGHT, padx=(10,0))
+
         self.status_label = tk.Label(action_feedback_frame, text=st['status_ready'], bd=1, relief=tk.SUNKEN, anchor=tk.W)
         self.status_label.pack(side=tk.LEFT, fill=tk.X, expand=True)
 
@@ -155,6 +176,7 @@ class App:
         menubar = tk.Menu(self.root)
         helpmenu = tk.Menu(menubar, tearoff=0)
         helpmenu.add_command(label=st['menu_help_content'], command=self.mostrar_ajuda_info)
+        helpmenu.add_checkbutton(label=st['menu_profile'], variable=self.perfil_var)
         helpmenu.add_separator()
         helpmenu.add_command(label=st['menu_about'], command=self.mostrar_sobre)
         menubar.add_cascade(label=st['menu_help'], menu=helpmenu)
@@ -185,13 +207,38 @@ class App:
         stats_canvas.bind_all("<Button-5>", _on_mousewheel)   # linux scroll para baixo
 
         self.limpar_dados_analise() # inicializa os labels das estatísticas
-        print("App GUI initialized.")
+
+        # carrega o VADER em segundo plano enquanto o user escolhe o ficheiro
+        self.status_label.config(text=st['status_loading_model'])
+        self._thread_aquecimento = psytext.aquecer_em_segundo_plano()
+        self.root.after(100, self._verificar_aquecimento)
+        log.debug("App GUI initialized.")
+
+    def _verificar_aquecimento(self):
+        """
+        vê de vez em quando se o modelo já acabou de carregar, para atualizar o estado
+        (o tkinter não deve ser mexido a partir da thread do aquecimento, por isso é a thread principal que vai vendo)
+        """
+        if self._thread_aquecimento.is_alive():
+            self.root.after(100, self._verificar_aquecimento)
+            return
+        if psytext.analisador_pronto():
+            self.status_label.config(text=st['status_ready'])
+        else:
+            self.status_label.config(text=st['model_loading_failed_message'])
+
+    def _modelo_pronto(self):
+        """avisa o user se o modelo ainda está a carregar; devolve True se já se pode analisar"""
+        if self._thread_aquecimento.is_alive():
+            messagebox.showwarning(st['warning'], st['model_not_loaded_warning'])
+            return False
+        return True
 
     def center_window(self, width, height):
         """
         centra a janela principal no ecrã
         """
-        # print(f"Centering window with width={width}, height={height}") # demasiado "verbose" por isso fica comentado
+        # log.debug(f"Centering window with width={width}, height={height}") # demasiado "verbose" por isso fica comentado
         # garante que as dimensões da janela estão atualizadas
         self.root.update_idletasks()
         # calcula a posição x e y para centrar a janela
@@ -204,14 +251,14 @@ class App:
         """
         abre uma caixa de diálogo para o user escolher um ficheiro de texto e atualiza o label com o caminho do ficheiro selecionado e redefine `frases_info`
         """
-        print("Choosing input file...")
+        log.debug("Choosing input file...")
         caminho = filedialog.askopenfilename(
             filetypes=[(st['dialog_text_files'], "*.txt"), (st['dialog_all_files'], "*.*")]
         )
         if caminho:
             self.file_path = caminho
             self.label_arquivo.config(text=f"{st['file_to_open']}: {caminho}")
-            print(f"File selected: {caminho}")
+            log.info(f"File selected: {caminho}")
             self.status_label.config(text=f"{st['sel_file']} {os.path.basename(caminho)}")
             self.limpar_dados_analise() # limpa as análises e gráficos antigos
 
@@ -219,82 +266,183 @@ class App:
     def gerar_html(self):
         """
         gera o ficheiro html com as frases coloridas com base no ficheiro selecionado e pede confirmação para abrir no browser
+        a leitura do ficheiro e a análise correm em segundo plano, para a janela não bloquear
         """
-        print("Generate HTML button clicked.")
+        log.debug("Generate HTML button clicked.")
         if not self.file_path:
             messagebox.showwarning(st['warning'], st['please_file'])
-            print("Warning: No file selected for HTML generation.")
+            log.warning("No file selected for HTML generation.")
+            return
+        if not self._modelo_pronto():
             return
-        
-        self.status_label.config(text=st['status_analysing'])
-        self.root.update_idletasks() # para forçar a atualização do label
 
-        try:
-            with open(self.file_path, "r", encoding="utf-8") as f:
-                print(f"Reading content from: {self.file_path}")
+        os.makedirs(ph["output_dir"], exist_ok=True) # o output existe? vamos garantir que sim
+        file_path = self.file_path
+        filename = os.path.basename(file_path)
+        em_fluxo = fluxo.deve_usar_fluxo(file_path)
+
+        def tarefa(progresso, cancelar):
+            """corre na thread de trabalho: não pode mexer no tkinter"""
+            if em_fluxo:
+                # ficheiros muito grandes são lidos aos bocados; não há lista de frases para os gráficos
+                log.debug("Calling fluxo.analisar_ficheiro_em_fluxo for HTML generation...")
+                output_html_path, stats_data = fluxo.analisar_ficheiro_em_fluxo(file_path, base_filename=filename,
+                                                                                 progresso=progresso, cancelar=cancelar)
+                return output_html_path, stats_data, None
+            with open(file_path, "r", encoding="utf-8") as f:
+                log.debug(f"Reading content from: {file_path}")
                 texto = f.read()
-
-            self.status_label.config(text=st['status_generating_html'])
-            print("Calling psytext.analisar_texto for HTML generation...")
-            self.root.update_idletasks()
-
-            os.makedirs(ph["output_dir"], exist_ok=True) # o output existe? vamos garantir que sim
-            filename = os.path.basename(self.file_path)
-
+            log.debug("Calling psytext.analisar_texto for HTML generation...")
             # chama o 'psytext' para gerar o html e buscar as infos das frases
-            output_html_path, stats_data, detailed_frases_info = psytext.analisar_texto(texto, base_filename=filename)
+            return psytext.analisar_texto(texto, base_filename=filename, progresso=progresso, cancelar=cancelar)
 
-            if output_html_path and stats_data:
-                self.current_stats_data = stats_data # para a exportação csv
-                self.atualizar_labels_estatisticas(stats_data)
-                self.frases_info = detailed_frases_info # atribui a lista detalhada para o grid
-                self.status_label.config(text=f"{st['status_html_done']} {os.path.basename(output_html_path)}")
-                print(f"HTML and stats generated. HTML at: {output_html_path}")
-                if messagebox.askyesno(st['success'], f"{st['html_file']} {st['saved_to']}:\n{output_html_path}\n\n{st['open_browser_q']}"):
-                    print(f"User chose to open HTML in browser: {output_html_path}")
-                    webbrowser.open(f"file://{os.path.abspath(output_html_path)}")
-            else:
-                self.status_label.config(text=st['error'])
-                print("Error: HTML/stats generation failed or returned no data.")
-                messagebox.showerror(st['error'], f"{st['error']} {st['gen']} {st['html_file']}")
+        def ao_terminar(resultado):
+            self.analise_em_fluxo = em_fluxo
+            self._mostrar_resultado_analise(resultado)
 
-        except Exception as e:
-            print(f"Exception during HTML generation: {str(e)}")
-            messagebox.showerror(st['error'], f"{st['error']} {st['gen']} {st['html_file']}:\n{str(e)}")
+        self.status_label.config(text=st['status_analysing'])
+        self._em_segundo_plano(self._com_perfil(tarefa, filename), ao_terminar, self._erro_analise)
 
-    def _iniciar_analise(self, texto, base_filename, janela_manual=None):
+    def _iniciar_analise(self, texto, base_filename, janela_manual=None, analise=None):
         """
         método central para começar a análise do texto, seja de um ficheiro ou de entrada manual
+        a análise corre em segundo plano, e o resultado é mostrado quando acabar
+
+        Args:
+            analise (incremental.AnaliseIncremental, optional): se for dada, só as frases que mudaram desde
+                                                                a última análise são pontuadas outra vez
         """
+        if not self._modelo_pronto():
+            return
+        os.makedirs(ph["output_dir"], exist_ok=True)
+
+        def tarefa(progresso, cancelar):
+            if analise is not None:
+                analise.atualizar(texto, progresso=progresso, cancelar=cancelar)
+                log.info(f"Incremental analysis: {analise.frases_pontuadas} sentence(s) re-scored.")
+                return analise.gravar(base_filename)
+            return psytext.analisar_texto(texto, base_filename=base_filename, progresso=progresso, cancelar=cancelar)
+
+        def ao_terminar(resultado):
+            self.analise_em_fluxo = False
+            self._mostrar_resultado_analise(resultado, janela_manual)
+
         self.status_label.config(text=st['status_analysing'])
-        self.root.update_idletasks()
-        try:
-            os.makedirs(ph["output_dir"], exist_ok=True)
-            
-            self.status_label.config(text=st['status_generating_html'])
-            self.root.update_idletasks()
+        self._em_segundo_plano(self._com_perfil(tarefa, base_filename), ao_terminar, self._erro_analise)
 
-            output_html_path, stats_data, detailed_frases_info = psytext.analisar_texto(texto, base_filename=base_filename)
+    def _com_perfil(self, tarefa, base_filename):
+        """
+        se o perfil estiver ligado no menu de ajuda, a tarefa corre dentro de uma captura de perfil
+        (cProfile + tracemalloc) e os relatórios ficam na pasta de saída, ao lado do html e do json
+        """
+        self._caminhos_perfil = None
+        if not self.perfil_var.get():
+            return tarefa
+        from perfil import CapturaPerfil
+
+        def tarefa_com_perfil(progresso, cancelar):
+            """corre na thread de trabalho, por isso o cProfile vê a análise toda"""
+            captura = CapturaPerfil(base_filename)
+            try:
+                with captura:
+                    return tarefa(progresso, cancelar)
+            finally:
+                self._caminhos_perfil = captura.caminhos or None
+        return tarefa_com_perfil
+
+    def _mostrar_resultado_analise(self, resultado, janela_manual=None):
+        """atualiza a interface com o resultado de uma análise (corre na thread principal)"""
+        output_html_path, stats_data, detailed_frases_info = resultado
+        if output_html_path and stats_data:
+            self.current_stats_data = stats_data # para a exportação csv
+            self.atualizar_labels_estatisticas(stats_data)
+            self.frases_info = detailed_frases_info # atribui a lista detalhada para o grid
+            texto_estado = f"{st['status_html_done']} {os.path.basename(output_html_path)}"
+            if self._caminhos_perfil:
+                texto_estado += f" | {st['profile_saved']} {os.path.basename(self._caminhos_perfil['report'])}"
+            self.status_label.config(text=texto_estado)
+            log.info(f"Analysis complete. HTML at: {output_html_path}")
+            if messagebox.askyesno(st['success'], f"{st['html_file']} {st['saved_to']}:\n{output_html_path}\n\n{st['open_browser_q']}"):
+                log.debug(f"User chose to open HTML in browser: {output_html_path}")
+                webbrowser.open(f"file://{os.path.abspath(output_html_path)}")
+            if janela_manual:
+                janela_manual.destroy()
+        else:
+            self.status_label.config(text=st['error'])
+            log.error("Analysis failed or returned no data.")
+            messagebox.showerror(st['error'], f"{st['error']} {st['gen']} {st['html_file']}")
 
-            if output_html_path and stats_data:
-                self.current_stats_data = stats_data
-                self.atualizar_labels_estatisticas(stats_data)
-                self.frases_info = detailed_frases_info
-                self.status_label.config(text=f"{st['status_html_done']} {os.path.basename(output_html_path)}")
-                print(f"Analysis complete. HTML at: {output_html_path}")
-                if messagebox.askyesno(st['success'], f"{st['html_file']} {st['saved_to']}:\n{output_html_path}\n\n{st['open_browser_q']}"):
-                    webbrowser.open(f"file://{os.path.abspath(output_html_path)}")
-                if janela_manual:
-                    janela_manual.destroy()
-            else:
-                self.status_label.config(text=st['error'])
-                print("Error: Analysis failed or returned no data.")
-                messagebox.showerror(st['error'], f"{st['error']} {st['gen']} {st['html_file']}")
+    def _erro_analise(self, e):
+        log.error(f"Exception during text analysis: {str(e)}")
+        self.status_label.config(text=st['error'])
+        messagebox.showerror(st['error'], f"{st['error']} {st['gen']} {st['html_file']}:\n{str(e)}")
+
+    def _em_segundo_plano(self, tarefa, ao_terminar, ao_falhar):
+        """
+        corre `tarefa(progresso, cancelar)` na thread de trabalho e vai acompanhando-a a partir da thread principal
+        o tkinter não pode ser mexido fora da thread principal, por isso a tarefa só guarda o progresso
+        e é o _acompanhar_tarefa (chamado com root.after) que atualiza a barra e, no fim, chama ao_terminar/ao_falhar
+
+        Args:
+            tarefa (callable): recebe (progresso, cancelar) e devolve o resultado
+            ao_terminar (callable): recebe o resultado, na thread principal
+            ao_falhar (callable): recebe a exceção, na thread principal
+        """
+        if self._tarefa_atual is not None:
+            messagebox.showwarning(st['warning'], st['busy_warning'])
+            return
+        self._cancelar = threading.Event()
+        self._progresso = None
+
+        def progresso(feitas, total):
+            self._progresso = (feitas, total) # uma atribuição simples é segura entre threads
+
+        self._tarefa_atual = self._executor.submit(tarefa, progresso, self._cancelar)
+        self.btn_cancelar.config(state=tk.NORMAL)
+        self.barra_progresso.config(mode="indeterminate", value=0)
+        self.barra_progresso.start(15)
+        self.root.after(100, self._acompanhar_tarefa, ao_terminar, ao_falhar)
+
+    def _acompanhar_tarefa(self, ao_terminar, ao_falhar):
+        """atualiza o progresso enquanto a tarefa corre e trata do resultado quando acaba"""
+        futuro = self._tarefa_atual
+        if futuro is None:
+            return
+        if not futuro.done():
+            if self._progresso is not None:
+                feitas, total = self._progresso
+                if total:
+                    if str(self.barra_progresso.cget("mode")) != "determinate":
+                        self.barra_progresso.stop()
+                        self.barra_progresso.config(mode="determinate", maximum=total)
+                    self.barra_progresso.config(value=feitas)
+                    self.status_label.config(text=st['status_progress'].format(feitas, total))
+                else:
+                    self.status_label.config(text=st['status_progress_unknown'].format(feitas))
+            self.root.after(100, self._acompanhar_tarefa, ao_terminar, ao_falhar)
+            return
+
+        self._tarefa_atual = None
+        self.barra_progresso.stop()
+        self.barra_progresso.config(mode="determinate", value=0)
+        self.btn_cancelar.config(state=tk.DISABLED)
+        try:
+            resultado = futuro.result()
+        except psytext.AnaliseCancelada:
+            log.info("Analysis cancelled by the user.")
+            self.status_label.config(text=st['status_cancelled'])
+            return
         except Exception as e:
-            print(f"Exception during text analysis: {str(e)}")
-            self.status_label.config(text=st['error'])
-            messagebox.showerror(st['error'], f"{st['error']} {st['gen']} {st['html_file']}:\n{str(e)}")
+            ao_falhar(e)
+            return
+        ao_terminar(resultado)
 
+    def cancelar_analise(self):
+        """pede à tarefa em segundo plano para parar (ela pára na próxima verificação)"""
+        if self._tarefa_atual is not None and self._cancelar is not None:
+            log.debug("User clicked on cancel button.")
+            self._cancelar.set()
+            self.status_label.config(text=st['status_cancelling'])
 
     def abrir_janela_manual(self):
         """
@@ -302,7 +450,7 @@ class App:
         """
         janela = tk.Toplevel(self.root)
         janela.title(st['manual_analysis'])
-        print("Opening manual text input window.")
+        log.debug("Opening manual text input window.")
         janela.geometry(f"+{janela.winfo_screenwidth() // 2 - janela.winfo_reqwidth() // 2}+{janela.winfo_screenheight() // 2 - janela.winfo_reqheight() // 2}") # para centrar
 
         tk.Label(janela, text=st['or_manual']).pack(pady=5)
@@ -310,17 +458,58 @@ class App:
         text_area = tk.Text(janela, height=10, width=60)
         text_area.pack(padx=10, pady=5)
 
+        # a análise desta janela é incremental: cada clique só volta a pontuar as frases que mudaram
+        analise = incremental.AnaliseIncremental()
+        analise_ao_escrever = tk.BooleanVar(value=False)
+        agendamento = {"id": None} # o 'after' pendente da análise ao escrever
+
         def analisar_texto():
             """
             esta função interna analisa o texto que foi metido na janela toplevel
             """
             texto = text_area.get("1.0", tk.END).strip()
             if not texto:
-                print("Warning: No text entered for manual analysis.")
+                log.warning("No text entered for manual analysis.")
                 messagebox.showwarning(st['warning'], st['please_text'])
                 return
             
-            self._iniciar_analise(texto, "manual_input", janela_manual=janela)
+            # a janela fica aberta (não se passa janela_manual) para o user poder continuar a editar o texto
+            self._iniciar_analise(texto, "manual_input", analise=analise)
+
+        def analisar_ao_escrever():
+            """atualiza só as estatísticas (sem escrever ficheiros) depois de o user parar de escrever"""
+            agendamento["id"] = None
+            if not analise_ao_escrever.get() or not janela.winfo_exists():
+                return
+            if self._tarefa_atual is not None or not psytext.analisador_pronto():
+                agendar_analise() # ainda há uma tarefa a correr (ou o modelo a carregar), tenta daqui a pouco
+                return
+            texto = text_area.get("1.0", tk.END).strip()
+
+            def tarefa(progresso, cancelar):
+                return analise.atualizar(texto, progresso=progresso, cancelar=cancelar)
+
+            def ao_terminar(resultado):
+                frases_info, stats_data = resultado
+                self.analise_em_fluxo = False
+                self.frases_info = frases_info or None
+                self.current_stats_data = stats_data if frases_info else None
+                self.atualizar_labels_estatisticas(stats_data)
+                self.status_label.config(text=st['status_live_done'].format(stats_data['num_frases'], analise.frases_pontuadas))
+
+            self._em_segundo_plano(tarefa, ao_terminar, self._erro_analise)
+
+        def agendar_analise(event=None):
+            """debounce: cada tecla adia a análise, que só corre quando o user pára de escrever"""
+            text_area.edit_modified(False) # para o <<Modified>> voltar a disparar na próxima alteração
+            if not analise_ao_escrever.get():
+                return
+            if agendamento["id"] is not None:
+                janela.after_cancel(agendamento["id"])
+            agendamento["id"] = janela.after(cfg_manual["debounce_ms"], analisar_ao_escrever)
+
+        text_area.bind("<<Modified>>", agendar_analise)
+        tk.Checkbutton(janela, text=st['live_analysis'], variable=analise_ao_escrever, command=agendar_analise).pack()
 
         btn_analisar = tk.Button(janela, text=st['colors_to_html'], command=analisar_texto)
         btn_analisar.pack(pady=10)
@@ -329,34 +518,43 @@ class App:
     def gerar_grid(self):
         """
         * gera e mostra o gráfico "affect grid" (valence vs. arousal) na interface
-        * o gráfico também é guardado como uma imagem
+        * a figura é mostrada diretamente (sem passar por um png) e a imagem é guardada depois, em segundo plano
         * requer que "self.frases_info" tenha sido preenchido antes, ou seja, através da função "gerar_html"
         """
-        print("Generate Affect Grid button clicked.")
+        log.debug("Generate Affect Grid button clicked.")
+        if self.analise_em_fluxo:
+            messagebox.showinfo(st['warning'], st['streamed_no_charts'])
+            return
         if self.frases_info is None:
             messagebox.showwarning(st['warning'], st['please_file2'])
-            print("Warning: No data (frases_info) available to generate Affect Grid.")
+            log.warning("No data (frases_info) available to generate Affect Grid.")
             return
 
-        try:
-            self.status_label.config(text=st['status_generating_grid'])
-            self.root.update_idletasks()
-
-            filename_base = os.path.basename(self.file_path) if self.file_path else "manual_input"
-            output_img_path = os.path.join(ph["output_dir"], f"{filename_base}{ph['affect_grid_suffix']}")
-
-            # 1. chama a função do psytext para criar e guardar o gráfico
-            psytext.gerar_affect_grid(self.frases_info, output_img_path)
-            # 2. usa o método auxiliar para mostrar a imagem que foi guardada
-            self._mostrar_imagem_em_janela(output_img_path, f"Affect Grid ({filename_base})")
-            self.status_label.config(text=f"{st['status_grid_done']} {os.path.basename(output_img_path)}")
-        except Exception as e:
-            print(f"Exception during Affect Grid generation: {str(e)}")
+        self.status_label.config(text=st['status_generating_grid'])
+        filename_base = os.path.basename(self.file_path) if self.file_path else "manual_input"
+        output_img_path = os.path.join(ph["output_dir"], f"{filename_base}{ph['affect_grid_suffix']}")
+        frases_info = self.frases_info
+
+        def tarefa(progresso, cancelar):
+            # 1. constrói a figura e o png em segundo plano (o png a partir da mesma figura, sem a construir outra vez)
+            return self._figura_e_png(graficos.figura_affect_grid(frases_info))
+
+        def ao_terminar(resultado):
+            # 2. mostra a figura e só depois escreve a imagem no disco, noutra thread
+            fig, png = resultado
+            self._mostrar_figura_em_janela(fig, f"Affect Grid ({filename_base})")
+            self.status_label.config(text=st['status_grid_shown'])
+            self._guardar_grafico(png, output_img_path, st['status_grid_done'])
+
+        def ao_falhar(e):
+            log.error(f"Exception during Affect Grid generation: {str(e)}")
             self.status_label.config(text=st['error'])
             messagebox.showerror(st['error'], f"{st['error']} {st['gen']} {st['ag_file']}: \n{str(e)}")
+
+        self._em_segundo_plano(tarefa, ao_terminar, ao_falhar)
     
     def atualizar_labels_estatisticas(self, stats_data):
-        print(f"Updating statistics labels with data: {stats_data is not None}")
+        log.debug(f"Updating statistics labels with data: {stats_data is not None}")
         """atualiza os labels da interface com as estatísticas do texto"""
         if stats_data:
             self.label_num_frases.config(text=f"{st['stats_num_sentences']} {stats_data.get('num_frases', '-')}")
@@ -371,15 +569,15 @@ class App:
             self.label_flesch.config(text=f"{st['stats_flesch_ease']} {stats_data.get('flesch_reading_ease', '-')}")
 
             # atualizar ou criar os labels da contagem de emoções
-            # for widget in self.emotion_labels_frame.winfo_children(): # para limpar os anteriores # Comentado para desativar a contagem de emoções
-            #     widget.destroy() # Comentado para desativar a contagem de emoções
-            # self.emotion_labels = {} # Comentado para desativar a contagem de emoções
-            # if 'emotion_counts' in stats_data: # Comentado para desativar a contagem de emoções
-            #     for emotion, count in stats_data['emotion_counts'].items(): # Comentado para desativar a contagem de emoções
-            #         display_emotion = emotion.replace("_", " ").capitalize() # Comentado para desativar a contagem de emoções
-            #         label_text = f"{display_emotion}: {count}" # Comentado para desativar a contagem de emoções
-            #         self.emotion_labels[emotion] = tk.Label(self.emotion_labels_frame, text=label_text) # Comentado para desativar a contagem de emoções
-            #         self.emotion_labels[emotion].pack(anchor="w") # Comentado para desativar a contagem de emoções
+            for widget in self.emotion_labels_frame.winfo_children(): # para limpar os anteriores
+                widget.destroy()
+            self.emotion_labels = {}
+            if 'emotion_counts' in stats_data:
+                for emotion, count in stats_data['emotion_counts'].items():
+                    display_emotion = emotion.replace("_", " ").capitalize()
+                    label_text = f"{display_emotion}: {count}"
+                    self.emotion_labels[emotion] = tk.Label(self.emotion_labels_frame, text=label_text)
+                    self.emotion_labels[emotion].pack(anchor="w")
             
             # atualizar ou criar os labels da contagem de pronomes
             for widget in self.pronoun_labels_frame.winfo_children(): # para limpar os anteriores
@@ -394,8 +592,8 @@ class App:
 
         else: # ou então limpa os labels
             self.current_stats_data = None
-            # for widget in self.emotion_labels_frame.winfo_children(): widget.destroy() # Comentado para desativar a contagem de emoções
-            # self.emotion_labels = {} # Comentado para desativar a contagem de emoções
+            for widget in self.emotion_labels_frame.winfo_children(): widget.destroy()
+            self.emotion_labels = {}
             for widget in self.pronoun_labels_frame.winfo_children(): widget.destroy()
             self.pronoun_labels = {}
             self.label_num_frases.config(text=f"{st['stats_num_sentences']} -")
@@ -411,9 +609,10 @@ class App:
 
     def limpar_dados_analise(self):
         """limpa os dados da análise anterior (frases_info, estatísticas, gráfico)"""
-        print("Clearing previous analysis data")
+        log.debug("Clearing previous analysis data")
         # o self.current_stats_data é reiniciado pela função atualizar_labels_estatisticas(none)
         self.frases_info = None
+        self.analise_em_fluxo = False
         self.atualizar_labels_estatisticas(None) # limpa os labels de estatísticas
         # o self.canvas_grid era para o affect grid embutido, que agora está numa toplevel
         if self.canvas_grid: # se alguma vez se voltar a meter um canvas embutido
@@ -424,26 +623,30 @@ class App:
         """
         o que fazer quando se fecha a janela principal e se encerra o python
         """
-        print("Main window closing...")
+        log.debug("Main window closing...")
+        if self._cancelar is not None:
+            self._cancelar.set() # pede à análise em curso para parar
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._executor_gravacao.shutdown(wait=True) # deixa acabar de gravar as imagens que já começaram
         self.root.destroy()
         import sys
         sys.exit() # é uma forma um bocado súbita, mas é mais eficaz para o psytext
     
     def limpar_interface(self):
         """limpa a seleção do ficheiro, os dados da análise e o gráfico"""
-        print("User clicked on clear button.\nClearing interface...")
+        log.debug("User clicked on clear button. Clearing interface...")
         self.file_path = None
         self.label_arquivo.config(text=st['no_file'])
         self.limpar_dados_analise()
         self.status_label.config(text=st['status_cleared'])
 
     def mostrar_sobre(self):
-        print("Showing 'About' window")
+        log.debug("Showing 'About' window")
         """mostra a janela 'sobre'"""
         messagebox.showinfo(st['about_title'], st['about_content'])
 
     def mostrar_ajuda_info(self):
-        print("Showing 'Help/Info' window.")
+        log.debug("Showing 'Help/Info' window.")
         """mostra a janela de ajuda/informações"""
         help_text = st['help_content']
         messagebox.showinfo(st['help_title'], help_text)
@@ -452,110 +655,154 @@ class App:
         """
         gera e mostra uma trajetória de sentimentos (sentiment trajectory) numa nova janela 'toplevel'
         """
-        print("Generate Sentiment Trajectory button clicked.")
+        log.debug("Generate Sentiment Trajectory button clicked.")
+        if self.analise_em_fluxo:
+            messagebox.showinfo(st['warning'], st['streamed_no_charts'])
+            return
         if self.frases_info is None:
             messagebox.showwarning(st['warning'], st['please_file2']) # o user tem de gerar primeiro um html
-            print("Warning: No data (frases_info) available to generate Sentiment Trajectory.")
+            log.warning("No data (frases_info) available to generate Sentiment Trajectory.")
             return
 
-        try:
-            self.status_label.config(text="Generating Sentiment Trajectory graph...")
-            print("Generating Sentiment Trajectory graph...")
-            self.root.update_idletasks()
-
-            os.makedirs(ph["output_dir"], exist_ok=True)
-            filename_base = os.path.basename(self.file_path) if self.file_path else "manual_input"
-            output_img_path = os.path.join(ph["output_dir"], f"{filename_base}_sentiment_trajectory.png")
+        self.status_label.config(text="Generating Sentiment Trajectory graph...")
+        log.debug("Generating Sentiment Trajectory graph...")
+        filename_base = os.path.basename(self.file_path) if self.file_path else "manual_input"
+        output_img_path = os.path.join(ph["output_dir"], f"{filename_base}_sentiment_trajectory.png")
+        frases_info = self.frases_info
 
-            # chama a função do psytext.py para gerar e guardar o gráfico
-            # esta função vai criar a sua própria figura e fechá-la
-            psytext.generate_sentiment_trajectory_graph(self.frases_info, output_img_path)
+        def tarefa(progresso, cancelar):
+            # constrói a figura e o png em segundo plano; a imagem só é escrita depois de a figura estar à vista
+            return self._figura_e_png(graficos.figura_trajetoria(frases_info))
 
-            self._mostrar_imagem_em_janela(output_img_path, f"Sentiment Trajectory ({filename_base})")
-            self.status_label.config(text=f"Sentiment Trajectory graph saved: {os.path.basename(output_img_path)}")
+        def ao_terminar(resultado):
+            fig, png = resultado
+            self._mostrar_figura_em_janela(fig, f"Sentiment Trajectory ({filename_base})")
+            self.status_label.config(text="Sentiment Trajectory graph ready.")
+            self._guardar_grafico(png, output_img_path, "Sentiment Trajectory graph saved:")
 
-        except Exception as e:
-            print(f"Exception during Sentiment Trajectory generation: {str(e)}")
+        def ao_falhar(e):
+            log.error(f"Exception during Sentiment Trajectory generation: {str(e)}")
             self.status_label.config(text=st['error'])
             messagebox.showerror(st['error'], f"Error generating Sentiment Trajectory graph:\n{str(e)}")
-    
-    def _mostrar_imagem_em_janela(self, image_path, window_title):
-        """mostra uma imagem guardada numa janela toplevel de tamanho fixo"""
-        if not os.path.exists(image_path):
-            print(f"Error: Image not found at {image_path}")
-            messagebox.showerror(st['error'], f"Could not display graph. File not found:\n{image_path}")
-            return
 
+        self._em_segundo_plano(tarefa, ao_terminar, ao_falhar)
+
+    def _mostrar_figura_em_janela(self, fig, window_title):
+        """mostra uma figura do matplotlib numa janela toplevel, desenhada diretamente pelo FigureCanvasTkAgg"""
         window = tk.Toplevel(self.root)
         window.title(window_title)
-        window.grab_set()
         window.focus_set()
-        window.resizable(False, False) # impede que se mude o tamanho da janela
 
         try:
-            # carrega a imagem com o pillow
-            pil_image = Image.open(image_path)
-            # converte para um formato que o tkinter percebe
-            photo_image = ImageTk.PhotoImage(pil_image)
-
-            # cria um label para ter a imagem
-            image_label = tk.Label(window, image=photo_image)
-            # guarda uma referência à imagem para o garbage collector não a apagar
-            image_label.image = photo_image
-            image_label.pack(padx=10, pady=10)
-            print(f"Displaying graph in new Toplevel window from: {image_path}")
+            # o backend do tkinter só é importado quando o primeiro gráfico é mostrado
+            from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
+            canvas = FigureCanvasTkAgg(fig, master=window)
+            # a barra do matplotlib permite fazer zoom e guardar a imagem noutro sítio
+            NavigationToolbar2Tk(canvas, window).update()
+            canvas.draw()
+            canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+            log.debug(f"Displaying graph in new Toplevel window: {window_title}")
         except Exception as e:
-            print(f"Error displaying image with Pillow: {e}")
-            messagebox.showerror(st['error'], f"Could not display image:\n{e}")
+            log.error(f"Error displaying graph: {e}")
+            messagebox.showerror(st['error'], f"Could not display graph:\n{e}")
             window.destroy()
 
+    def _figura_e_png(self, fig):
+        """
+        o png de uma figura já construída, feito na thread de trabalho (para a figura não ter de ser construída
+        outra vez só para ser gravada); sem gravação a partir da interface (defaults.charts) não há png
+
+        Returns:
+            tuple: (figura, bytes do png ou None)
+        """
+        return fig, graficos.figura_para_png(fig) if cfg_graficos["save_from_gui"] else None
+
+    def _guardar_grafico(self, png, output_path, mensagem):
+        """
+        escreve o png do gráfico numa thread à parte, depois de ele já estar à vista
+
+        Args:
+            png (bytes | None): a imagem já renderizada (ver _figura_e_png); None se não for para gravar
+            output_path (str): onde guardar o png
+            mensagem (str): o texto do status quando a imagem estiver guardada
+        """
+        if png is None:
+            return
+
+        def guardar():
+            os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+            with open(output_path, "wb") as f:
+                f.write(png)
+
+        futuro = self._executor_gravacao.submit(guardar)
+
+        def verificar():
+            if not futuro.done():
+                self.root.after(200, verificar)
+                return
+            erro = futuro.exception()
+            if erro is not None:
+                log.error(f"Error saving graph to {output_path}: {erro}")
+            else:
+                log.info(f"Graph saved to: {output_path}")
+                self.status_label.config(text=f"{mensagem} {os.path.basename(output_path)}")
+
+        self.root.after(200, verificar)
+
     def exportar_stats_csv(self):
-        """exporta as estatísticas gerais atuais para um ficheiro csv"""
-        print("Export Stats to CSV button clicked.")
+        """exporta as estatísticas gerais atuais para um ficheiro csv (escrito na thread de trabalho)"""
+        log.debug("Export Stats to CSV button clicked.")
         if not self.current_stats_data:
             messagebox.showwarning(st['warning'], st['csv_no_data_warning'])
-            print("Warning: No statistics data to export.")
+            log.warning("No statistics data to export.")
             return
 
         filename_base = os.path.basename(self.file_path) if self.file_path else "manual_input"
         csv_filename = f"{filename_base}_statistics.csv"
         csv_path = os.path.join(ph["output_dir"], csv_filename)
 
-        try:
+        # temos de lidar com dicionários dentro de outros, como o emotion_counts e o pronoun_counts
+        flat_stats = {}
+        for key, value in self.current_stats_data.items():
+            if isinstance(value, dict): # para lidar com emotion_counts e pronoun_counts
+                for sub_key, sub_value in value.items():
+                    # cria uma chave mais descritiva para o cabeçalho do csv
+                    flat_stats[f"{key.replace('_counts', '')}_{sub_key}"] = sub_value
+            else:
+                flat_stats[key] = value
+
+        # usa as chaves do dicionário "achatado" como cabeçalhos
+        if not flat_stats: # não deve acontecer se o self.current_stats_data existir
+            log.error("No data to write to CSV after flattening.")
+            messagebox.showerror(st['csv_export_error_title'], "No data to write to CSV.")
+            return
+
+        def tarefa(progresso, cancelar):
+            # só a escrita do ficheiro corre fora da thread principal; as mensagens ficam para o ao_terminar/ao_falhar
             os.makedirs(ph["output_dir"], exist_ok=True)
             with open(csv_path, 'w', newline='', encoding='utf-8') as csvfile:
-                # temos de lidar com dicionários dentro de outros, como o emotion_counts e o pronoun_counts
-                flat_stats = {}
-                for key, value in self.current_stats_data.items():
-                    if isinstance(value, dict): # para lidar com emotion_counts e pronoun_counts
-                        for sub_key, sub_value in value.items():
-                            # cria uma chave mais descritiva para o cabeçalho do csv
-                            flat_stats[f"{key.replace('_counts', '')}_{sub_key}"] = sub_value
-                    else:
-                        flat_stats[key] = value
-                
-                # usa as chaves do dicionário "achatado" como cabeçalhos
-                if not flat_stats: # não deve acontecer se o self.current_stats_data existir
-                    print("Error: No data to write to CSV after flattening.")
-                    messagebox.showerror(st['csv_export_error_title'], "No data to write to CSV.")
-                    return
-
                 writer = csv.DictWriter(csvfile, fieldnames=flat_stats.keys())
                 writer.writeheader()
                 writer.writerow(flat_stats)
-            
-            print(f"Statistics successfully exported to CSV: {csv_path}")
-            messagebox.showinfo(st['csv_export_success_title'], st['csv_export_success_message'].format(csv_path))
+            return csv_path
+
+        def ao_terminar(caminho):
+            log.info(f"Statistics successfully exported to CSV: {caminho}")
+            messagebox.showinfo(st['csv_export_success_title'], st['csv_export_success_message'].format(caminho))
             self.status_label.config(text=f"Stats exported to: {csv_filename}")
-        except Exception as e:
-            print(f"Error exporting statistics to CSV: {str(e)}")
+
+        def ao_falhar(e):
+            log.error(f"Error exporting statistics to CSV: {str(e)}")
             messagebox.showerror(st['csv_export_error_title'], st['csv_export_error_message'].format(str(e)))
             self.status_label.config(text="Error exporting CSV.")
 
+        self._em_segundo_plano(tarefa, ao_terminar, ao_falhar)
+
 # condição principal (quando se abre e fecha a app)
 if __name__ == "__main__":
-    print(f"Welcome!")
+    configurar_registo()
+    log.info("Welcome!")
     root = tk.Tk()
     app = App(root)
     root.mainloop()
-    print("Goodbye!")
+    log.info("Goodbye!")
@@ -0,0 +1,102 @@
+# este módulo calcula o flesch reading ease a partir de palavras já tokenizadas (as do Documento), sem voltar a partir
+# o texto como o textstat.flesch_reading_ease faz
+# as sílabas de cada palavra vêm do textstat, mas só na primeira vez que a palavra aparece no processo: depois ficam
+# num memo limitado (ver defaults.readability), partilhado por todos os textos, ficheiros e frases analisados
+# com as sílabas de cada frase, o flesch de uma frase ou de uma janela de frases custa só umas somas
+
+# imports locais
+from defaults import readability as cfg_legibilidade
+
+# bibliotecas gerais
+import functools  # para o memo das sílabas
+
+def flesch_de_contagens(num_palavras, num_frases, silabas):
+    """
+    flesch reading ease a partir das contagens de palavras, frases e sílabas
+    (a mesma fórmula e os mesmos coeficientes para inglês que o textstat.flesch_reading_ease usa)
+    """
+    if num_palavras == 0 or num_frases == 0:
+        return "N/A"
+    palavras_por_frase = num_palavras / num_frases
+    silabas_por_palavra = silabas / num_palavras
+    return 206.835 - 1.015 * palavras_por_frase - 84.6 * silabas_por_palavra
+
+@functools.lru_cache(maxsize=cfg_legibilidade["syllable_cache_size"])
+def contar_silabas(palavra):
+    """as sílabas de uma palavra (do textstat), guardadas no memo do processo"""
+    import textstat
+    return textstat.syllable_count(palavra)
+
+def estado_memo():
+    """
+    Returns:
+        dict: acertos, falhas e tamanho do memo das sílabas neste processo
+    """
+    info = contar_silabas.cache_info()
+    return {"acertos": info.hits, "falhas": info.misses, "palavras": info.currsize, "maximo": info.maxsize}
+
+def silabas_de_contagens(palavras):
+    """
+    total de sílabas de um vocabulário
+
+    Args:
+        palavras (Counter | dict): palavra -> ocorrências
+
+    Returns:
+        int: o total de sílabas (cada palavra é contada uma vez e multiplicada pelas ocorrências)
+    """
+    return sum(contar_silabas(palavra) * n for palavra, n in palavras.items())
+
+def silabas_das_palavras(palavras):
+    """total de sílabas de uma lista de palavras (com repetições)"""
+    return sum(map(contar_silabas, palavras))
+
+def contagens_por_frase(tokens_por_frase):
+    """
+    palavras e sílabas de cada frase
+
+    Args:
+        tokens_por_frase (list): para cada frase, os seus tokens (como Documento.tokens_por_frase);
+                                 a pontuação é ignorada, como no Documento.palavras
+
+    Returns:
+        tuple: (lista do número de palavras de cada frase, lista do número de sílabas de cada frase)
+    """
+    num_palavras, silabas = [], []
+    for tokens in tokens_por_frase:
+        palavras = [token for token in tokens if token.isalnum()]
+        num_palavras.append(len(palavras))
+        silabas.append(silabas_das_palavras(palavras))
+    return num_palavras, silabas
+
+def flesch_por_frase(tokens_por_frase):
+    """o flesch reading ease de cada frase ("N/A" nas frases sem palavras)"""
+    num_palavras, silabas = contagens_por_frase(tokens_por_frase)
+    return [flesch_de_contagens(n, 1, s) for n, s in zip(num_palavras, silabas)]
+
+def flesch_em_janelas(tokens_por_frase, janela=None, passo=1):
+    """
+    o flesch reading ease de janelas de frases seguidas (ex: para uma trajetória de legibilidade ao longo do texto)
+    as contagens de cada frase são feitas uma vez e cada janela é calculada com somas acumuladas
+
+    Args:
+        tokens_por_frase (list): para cada frase, os seus tokens (como Documento.tokens_por_frase)
+        janela (int, optional): frases em cada janela; por defeito defaults.readability["window_sentences"]
+        passo (int, optional): de quantas em quantas frases começa uma janela
+
+    Returns:
+        list: (índice da primeira frase, flesch) de cada janela; com menos frases do que a janela, uma só janela
+    """
+    janela = max(1, janela or cfg_legibilidade["window_sentences"])
+    num_palavras, silabas = contagens_por_frase(tokens_por_frase)
+    acumuladas_palavras, acumuladas_silabas = [0], [0]
+    for n, s in zip(num_palavras, silabas):
+        acumuladas_palavras.append(acumuladas_palavras[-1] + n)
+        acumuladas_silabas.append(acumuladas_silabas[-1] + s)
+    total = len(num_palavras)
+    if total == 0:
+        return []
+    janela = min(janela, total)
+    return [(inicio, flesch_de_contagens(acumuladas_palavras[inicio + janela] - acumuladas_palavras[inicio], janela,
+                                         acumuladas_silabas[inicio + janela] - acumuladas_silabas[inicio]))
+            for inicio in range(0, total - janela + 1, max(1, passo))]
@@ -0,0 +1,115 @@
+# este módulo guarda o léxico do VADER já junto com o léxico personalizado num "snapshot" binário (marshal),
+# para cada processo carregar o dicionário pronto em vez de voltar a ler e a partir o ficheiro de texto do nltk
+# o snapshot tem uma versão (hash do léxico personalizado + versão do nltk); se a versão mudar, volta-se ao caminho lento
+#
+# uso: python lexico_snapshot.py   (constrói o snapshot no caminho definido em defaults.paths)
+
+# imports locais
+from defaults import paths as ph
+from registo import obter_logger
+
+# bibliotecas gerais
+import os  # para os caminhos e a escrita atómica
+import json  # para serializar o léxico personalizado de forma estável antes do hash
+import marshal  # formato binário mais rápido de carregar para um dicionário str -> float
+import hashlib  # para a versão do léxico
+
+log = obter_logger(__name__)
+
+_FORMATO = 1  # muda se o conteúdo do snapshot mudar de estrutura
+
+def caminho_snapshot():
+    """caminho do snapshot, dentro da pasta de cache definida em defaults.paths"""
+    return os.path.join(ph["cache_dir"], ph["lexicon_snapshot"])
+
+def versao_lexico(overrides):
+    """
+    calcula a versão do léxico: um hash do léxico personalizado, da versão do nltk e do formato do snapshot
+
+    Args:
+        overrides (dict): o léxico personalizado (palavra -> valência) aplicado por cima do VADER
+
+    Returns:
+        str: o hash em hexadecimal
+    """
+    import importlib.metadata  # para saber a versão do nltk sem o importar (só aqui, porque é lento de importar)
+    try:
+        versao_nltk = importlib.metadata.version("nltk")
+    except importlib.metadata.PackageNotFoundError:
+        versao_nltk = "unknown"
+    conteudo = json.dumps({"formato": _FORMATO, "nltk": versao_nltk, "overrides": overrides}, sort_keys=True)
+    return hashlib.sha256(conteudo.encode("utf-8")).hexdigest()
+
+def gravar_snapshot(lexicon, overrides, caminho=None):
+    """
+    grava o léxico já combinado no snapshot (escreve num ficheiro temporário e depois troca,
+    para um processo nunca ler um snapshot a meio de ser escrito)
+
+    Args:
+        lexicon (dict): o léxico final do VADER (já com o léxico personalizado aplicado)
+        overrides (dict): o léxico personalizado, para calcular a versão
+        caminho (str, optional): onde gravar; por defeito é caminho_snapshot()
+
+    Returns:
+        str: o caminho do snapshot gravado
+    """
+    caminho = caminho or caminho_snapshot()
+    pasta = os.path.dirname(caminho)
+    if pasta:
+        os.makedirs(pasta, exist_ok=True)
+    temporario = f"{caminho}.{os.getpid()}.tmp"
+    with open(temporario, "wb") as f:
+        marshal.dump({"versao": versao_lexico(overrides), "lexicon": dict(lexicon)}, f)
+    os.replace(temporario, caminho)
+    return caminho
+
+def carregar_lexico(overrides, caminho=None):
+    """
+    carrega o léxico do snapshot, se existir e tiver a versão certa
+
+    Returns:
+        dict | None: o léxico combinado, ou None se for preciso usar o caminho lento
+    """
+    caminho = caminho or caminho_snapshot()
+    try:
+        # ler tudo de uma vez e usar loads é bem mais rápido do que marshal.load, que lê o ficheiro aos bocadinhos
+        with open(caminho, "rb") as f:
+            dados = marshal.loads(f.read())
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+    if not isinstance(dados, dict) or dados.get("versao") != versao_lexico(overrides):
+        log.info("Lexicon snapshot is outdated, rebuilding it.")
+        return None
+    return dados["lexicon"]
+
+def analisador_do_snapshot(overrides, caminho=None):
+    """
+    constrói o SentimentIntensityAnalyzer com o léxico do snapshot
+    o analisador é construído normalmente (o __init__ do nltk corre todo); só o make_lex_dict, que parte as
+    milhares de linhas do ficheiro do léxico, é trocado por devolver o dicionário já pronto
+
+    Returns:
+        SentimentIntensityAnalyzer | None: o analisador pronto, ou None se o snapshot não servir
+    """
+    lexicon = carregar_lexico(overrides, caminho)
+    if lexicon is None:
+        return None
+    from nltk.sentiment.vader import SentimentIntensityAnalyzer
+
+    class AnalisadorDoSnapshot(SentimentIntensityAnalyzer):
+        def make_lex_dict(self):
+            return lexicon
+
+    return AnalisadorDoSnapshot()
+
+# condição principal: passo de build do snapshot
+if __name__ == "__main__":
+    from registo import configurar_registo
+    configurar_registo()
+    from nltk.sentiment import SentimentIntensityAnalyzer
+    from psytext import custom_vader_lexicon, _garantir_recursos_nltk
+    _garantir_recursos_nltk()
+    sia = SentimentIntensityAnalyzer()
+    sia.lexicon.update(custom_vader_lexicon)
+    caminho = gravar_snapshot(sia.lexicon, custom_vader_lexicon)
+    log.info(f"Lexicon snapshot ({len(sia.lexicon)} entries, version {versao_lexico(custom_vader_lexicon)[:12]}) written to: {caminho}")
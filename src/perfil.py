@@ -0,0 +1,150 @@
+# este módulo captura o perfil de uma análise: o cProfile (onde se gasta o tempo, função a função)
+# e o tracemalloc (onde se aloca a memória, linha a linha) à volta de uma execução
+# no fim são escritos, na pasta de saída e ao lado do html e do json, três ficheiros:
+# - <nome>_profile.txt: as funções mais pesadas, ordenadas pelo tempo acumulado e pelo tempo próprio
+# - <nome>_profile.prof: os dados do cProfile, para abrir com o pstats ou com o snakeviz
+# - <nome>_memory.txt: o pico de memória, os sítios do código que mais cresceram até perto do pico
+#   e os que ainda tinham memória no fim da execução
+# o cProfile só vê a thread onde a captura começou, por isso durante uma captura as saídas da análise
+# (html, gráficos, json) são escritas nessa thread, uma a seguir à outra (ver psytext.executar_saidas)
+
+# imports locais
+from defaults import paths as ph, profiling as cfg_perfil
+from registo import obter_logger
+
+# bibliotecas gerais
+import os  # para os caminhos
+import io  # para o relatório do pstats
+import time  # para o tempo total da captura
+import threading  # para saber se há uma captura a decorrer
+
+log = obter_logger(__name__)
+
+_capturas_ativas = 0  # capturas a decorrer neste processo
+_lock = threading.Lock()
+
+def captura_ativa():
+    """diz se há uma captura de perfil a decorrer neste processo"""
+    return _capturas_ativas > 0
+
+def caminhos_perfil(base_filename, output_dir=None):
+    """os caminhos dos ficheiros do perfil para um nome base"""
+    base = os.path.join(output_dir or ph["output_dir"], base_filename)
+    return {"report": f"{base}{ph['profile_suffix']}", "stats": f"{base}{ph['profile_stats_suffix']}",
+            "memory": f"{base}{ph['memory_profile_suffix']}"}
+
+class CapturaPerfil:
+    """
+    captura o perfil do que corre dentro do bloco `with`:
+
+        with CapturaPerfil("relatorio") as captura:
+            psytext.analisar_texto(texto, "relatorio")
+        print(captura.caminhos["report"])
+
+    Attributes:
+        caminhos (dict): os ficheiros escritos ("report", "stats" e "memory"), preenchido no fim do bloco
+    """
+    def __init__(self, base_filename, output_dir=None):
+        self.base_filename = base_filename
+        self.output_dir = output_dir or ph["output_dir"]
+        self.caminhos = {}
+        self._perfil = None
+        self._iniciou_tracemalloc = False
+        self._parar_amostragem = threading.Event()
+        self._amostragem = None
+        self._fotografia_inicio = None
+        self._fotografia_pico = None  # (memória quando foi tirada, fotografia)
+
+    def __enter__(self):
+        global _capturas_ativas
+        import cProfile
+        import tracemalloc
+        with _lock:
+            _capturas_ativas += 1
+        # se o tracemalloc já estiver ligado (ex: por quem chamou), não é desligado no fim
+        self._iniciou_tracemalloc = not tracemalloc.is_tracing()
+        if self._iniciou_tracemalloc:
+            tracemalloc.start(cfg_perfil["tracemalloc_frames"])
+        tracemalloc.reset_peak()
+        self._fotografia_inicio = tracemalloc.take_snapshot()
+        self._amostragem = threading.Thread(target=self._amostrar_memoria, name="psytext-memory-sampler", daemon=True)
+        self._amostragem.start()
+        self._inicio = time.perf_counter()
+        self._perfil = cProfile.Profile()
+        self._perfil.enable()
+        return self
+
+    def __exit__(self, tipo, *excecao):
+        global _capturas_ativas
+        import tracemalloc
+        self._perfil.disable()
+        segundos = time.perf_counter() - self._inicio
+        self._parar_amostragem.set()
+        self._amostragem.join()
+        fotografia = tracemalloc.take_snapshot()
+        atual, pico = tracemalloc.get_traced_memory()
+        if self._iniciou_tracemalloc:
+            tracemalloc.stop()
+        with _lock:
+            _capturas_ativas -= 1
+        try:
+            self._escrever(segundos, fotografia, atual, pico, falhou=tipo is not None)
+        except OSError as e:
+            log.error(f"Could not write the profile for {self.base_filename}: {e}")
+        return False
+
+    def _amostrar_memoria(self):
+        """
+        corre numa thread à parte durante a captura: tira uma fotografia das alocações sempre que a memória
+        passa do último máximo em mais de profiling["peak_growth"], para se ver o que ocupava a memória perto do pico
+        (os buffers temporários, já libertados no fim, não aparecem na fotografia do fim)
+        """
+        import tracemalloc
+        intervalo = cfg_perfil["memory_sample_ms"] / 1000
+        crescimento = 1 + cfg_perfil["peak_growth"]
+        limiar = tracemalloc.get_traced_memory()[0] * crescimento
+        while not self._parar_amostragem.wait(intervalo):
+            atual = tracemalloc.get_traced_memory()[0]
+            if atual > limiar:
+                self._fotografia_pico = (atual, tracemalloc.take_snapshot())
+                limiar = atual * crescimento
+
+    def _escrever(self, segundos, fotografia, atual, pico, falhou=False):
+        import pstats
+        import tracemalloc
+        os.makedirs(self.output_dir, exist_ok=True)
+        self.caminhos = caminhos_perfil(self.base_filename, self.output_dir)
+        self._perfil.dump_stats(self.caminhos["stats"])
+
+        cabecalho = (f"PsyText profile of '{self.base_filename}': {segundos:.3f}s wall time"
+                     + (" (the analysis raised an error)" if falhou else "") + "\n"
+                     "Only the thread that ran the analysis is included (worker processes are not).\n")
+        limite = cfg_perfil["top_functions"]
+        relatorio = io.StringIO()
+        for ordem, titulo in (("cumulative", "cumulative time"), ("tottime", "own time")):
+            relatorio.write(f"\n=== Top {limite} functions by {titulo} ===\n")
+            pstats.Stats(self._perfil, stream=relatorio).strip_dirs().sort_stats(ordem).print_stats(limite)
+        with open(self.caminhos["report"], "w", encoding="utf-8") as f:
+            f.write(cabecalho + relatorio.getvalue())
+
+        # as alocações do próprio tracemalloc e do sistema de imports não interessam
+        filtros = (tracemalloc.Filter(False, tracemalloc.__file__),
+                   tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+                   tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"))
+        inicio = self._fotografia_inicio.filter_traces(filtros)
+        limite = cfg_perfil["top_allocations"]
+        with open(self.caminhos["memory"], "w", encoding="utf-8") as f:
+            f.write(f"PsyText memory profile of '{self.base_filename}'\n")
+            f.write(f"Peak traced memory: {pico / 1024 / 1024:.1f} MiB; still allocated at the end: {atual / 1024 / 1024:.1f} MiB\n")
+            if self._fotografia_pico:
+                memoria, fotografia_pico = self._fotografia_pico
+                f.write(f"\n=== Top {limite} allocation sites by growth from the start to near the peak "
+                        f"(snapshot at {memoria / 1024 / 1024:.1f} MiB traced) ===\n")
+                for diferenca in fotografia_pico.filter_traces(filtros).compare_to(inicio, "lineno")[:limite]:
+                    f.write(f"{diferenca.size_diff / 1024:+10.1f} KiB {diferenca.count_diff:+9d} blocks  {diferenca.traceback}\n")
+            else:
+                f.write("\nMemory never grew enough during the run for a snapshot near the peak.\n")
+            f.write(f"\n=== Top {limite} allocation sites by growth retained at the end of the run ===\n")
+            for diferenca in fotografia.filter_traces(filtros).compare_to(inicio, "lineno")[:limite]:
+                f.write(f"{diferenca.size_diff / 1024:+10.1f} KiB {diferenca.count_diff:+9d} blocks  {diferenca.traceback}\n")
+        log.info(f"Profile written to: {self.caminhos['report']} and {self.caminhos['memory']}")
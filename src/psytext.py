@@ -3,36 +3,42 @@
 # um gráfico de "affect grid" (valence vs arousal) e a exportação dos dados da análise para json
 
 # imports locais
-from defaults import paths as ph, english as st  # Importa configurações de caminhos do ficheiro defaults.py
+from defaults import paths as ph, english as st, sentence_cache as cfg_cache, html_report as cfg_relatorio, exports as cfg_exportacao  # Importa configurações de caminhos do ficheiro defaults.py
+from documento import construir_documento, como_documento  # texto tokenizado uma só vez e partilhado pelas métricas
+from categorias import obter_indice  # índice palavra -> categoria para contar pronomes e emoções numa passagem
+import lexico_snapshot  # léxico do VADER já combinado, guardado em binário para carregar depressa
+import expressoes  # as entradas de várias palavras do léxico (ex: "dead end"), encontradas com um autómato de Aho-Corasick
+from cache_frases import CacheFrases  # cache persistente das pontuações de cada frase
+from resultados import FrasesAnalisadas  # resultados das frases em colunas (arrays), com cara de lista de dicionários
+from relatorio import gerar_relatorio_paginado  # relatório html em páginas, para textos muito compridos
+from exportacao import exportar_frases, verificar_formatos  # json lines, colunas .npy e parquet
+from graficos import figura_affect_grid, figura_trajetoria  # figuras dos gráficos, feitas a partir de arrays numpy
+from acumulador import AcumuladorEstatisticas  # estatísticas numa só passagem, que se podem juntar
+from legibilidade import flesch_de_contagens, silabas_das_palavras, flesch_em_janelas  # flesch com memo das sílabas
+from registo import obter_logger, medir_etapa  # mensagens com níveis e medição das etapas
+from perfil import captura_ativa, CapturaPerfil  # perfil (cProfile + tracemalloc) de uma análise
 
 # bibliotecas gerais
 import os  # Para operações de sistema de ficheiros, como criar diretórios e manipular caminhos
 import webbrowser  # Para abrir o ficheiro HTML no navegador
 import json  # Para trabalhar com dados em formato JSON (exportação)
-import nltk  # Natural Language Toolkit para processamento de linguagem natural (PLN)
-import matplotlib.pyplot as plt  # Para gerar gráficos (affect grid)
-import pandas as pd  # Para manipulação de dados, especialmente para o affect grid
-from nltk.sentiment import SentimentIntensityAnalyzer  # Analisador de sentimento VADER do NLTK
-from nltk.tokenize import word_tokenize # Para tokenização de palavras
-import jinja2 # Para templating HTML
-from nltk.downloader import Downloader # verifica e descarregar coisas do nltk
-import textstat # Para cálculo de métricas de legibilidade
-
-# recursos do nltk que são precisos
-# Ver se o léxico vader já foi descarregado; se não, descarrega-o. isto evita estar sempre a descarregar o e mostrar mensagens chatas
-try:
-    nltk.data.find('sentiment/vader_lexicon.zip')
-    print("NLTK: vader_lexicon found.")
-except nltk.downloader.DownloadError:
-    print("NLTK: vader_lexicon not found. Downloading...")
-    nltk.download('vader_lexicon', quiet=True) # quiet=True para suprimir output excessivo
-
-try:
-    nltk.data.find('tokenizers/punkt')
-    print("NLTK: punkt tokenizer found.")
-except nltk.downloader.DownloadError:
-    print("NLTK: punkt tokenizer not found. Downloading...")
-    nltk.download('punkt', quiet=True)
+import threading  # Para carregar o modelo em segundo plano (e só uma vez, mesmo com várias threads)
+import time  # Para medir o tempo de cada saída
+
+log = obter_logger(__name__)
+
+def _contar_frases(frases_info, *args, **kwargs):
+    """frases e tokens de uma etapa que recebe a lista de frases (para medir_etapa)"""
+    return len(frases_info) if frases_info else 0, 0
+
+def _contar_documento(texto, *args, **kwargs):
+    """frases e tokens de uma etapa que recebe o texto ou o documento (só contados se já estiver tokenizado)"""
+    documento = texto if hasattr(texto, "tokens_por_frase") else None
+    return (documento.num_frases, sum(map(len, documento.tokens_por_frase))) if documento else (0, 0)
+
+# as bibliotecas pesadas (nltk, matplotlib, numpy, jinja2 e textstat) só são importadas dentro das funções que as usam,
+# para importar o psytext ser quase instantâneo (a interface abre logo e os workers do batch arrancam depressa)
+# o VADER é construído na primeira análise através de obter_analisador(), ou antes com aquecer_em_segundo_plano()
 
 # personalização do VADER (replacements/substituições) por causa de nuances e cínica mal-interpretados
 custom_vader_lexicon = {
@@ -64,10 +70,140 @@ custom_vader_lexicon = {
     "nothing": -1.0,        # Tornar "nothing" explicitamente negativo
 }
 
-print("Initializing SentimentIntensityAnalyzer...")
-sia = SentimentIntensityAnalyzer() # Initialize VADER with the default lexicon
-print("Updating VADER lexicon with custom scores...")
-sia.lexicon.update(custom_vader_lexicon) # Update the lexicon with custom values
+_sia = None  # o SentimentIntensityAnalyzer, criado só quando é preciso
+_sia_lock = threading.Lock()  # para duas threads não construírem o VADER ao mesmo tempo
+
+def _garantir_recursos_nltk():
+    """
+    vê se os recursos do nltk que são precisos já foram descarregados; se não, descarrega-os.
+    isto evita estar sempre a descarregar e a mostrar mensagens chatas
+    """
+    import nltk  # Natural Language Toolkit para processamento de linguagem natural (PLN)
+    # o punkt_tab é o formato do punkt usado pelas versões mais recentes do nltk
+    for recurso, pacote in (('sentiment/vader_lexicon.zip', 'vader_lexicon'),
+                            ('tokenizers/punkt', 'punkt'),
+                            ('tokenizers/punkt_tab', 'punkt_tab')):
+        try:
+            nltk.data.find(recurso)
+            log.debug(f"NLTK: {pacote} found.")
+        except LookupError:
+            log.info(f"NLTK: {pacote} not found. Downloading...")
+            nltk.download(pacote, quiet=True) # quiet=True para suprimir output excessivo
+
+def obter_analisador():
+    """
+    devolve o SentimentIntensityAnalyzer (VADER) já com o léxico personalizado e as expressões de várias palavras,
+    construindo-o na primeira chamada (as chamadas seguintes são só uma leitura)
+    se houver um snapshot do léxico com a versão certa, é carregado diretamente; senão o léxico é construído
+    a partir do ficheiro do nltk e o snapshot é gravado para os próximos processos
+
+    Returns:
+        SentimentIntensityAnalyzer: o analisador partilhado pelo processo
+    """
+    global _sia
+    if _sia is None:
+        with _sia_lock:
+            if _sia is None:  # outra thread pode tê-lo construído enquanto se esperava pelo lock
+                _garantir_recursos_nltk()
+                sia = lexico_snapshot.analisador_do_snapshot(custom_vader_lexicon)
+                if sia is not None:
+                    log.debug("Loaded VADER lexicon from snapshot.")
+                else:
+                    from nltk.sentiment import SentimentIntensityAnalyzer  # Analisador de sentimento VADER do NLTK
+                    log.debug("Initializing SentimentIntensityAnalyzer...")
+                    sia = SentimentIntensityAnalyzer() # Initialize VADER with the default lexicon
+                    log.debug("Updating VADER lexicon with custom scores...")
+                    sia.lexicon.update(custom_vader_lexicon) # Update the lexicon with custom values
+                    try:
+                        lexico_snapshot.gravar_snapshot(sia.lexicon, custom_vader_lexicon)
+                    except OSError as e:
+                        log.error(f"Could not write lexicon snapshot: {e}")
+                # o VADER só procura palavras soltas no léxico: as expressões de várias palavras passam por um índice
+                _sia = expressoes.AnalisadorComExpressoes(sia)
+    return _sia
+
+def analisador_pronto():
+    """diz se o VADER já foi carregado (sem o carregar)"""
+    return _sia is not None
+
+def aquecer_em_segundo_plano():
+    """
+    carrega o VADER e o tokenizador punkt numa thread à parte, para a primeira análise não ter de esperar
+
+    Returns:
+        threading.Thread: a thread do aquecimento (daemon, para não impedir o programa de fechar)
+    """
+    def _aquecer():
+        try:
+            obter_analisador()
+            construir_documento("Warm up.")  # carrega também o punkt e o tokenizador de palavras
+        except Exception as e:
+            log.error(f"Error warming up the sentiment model: {e}")
+    thread = threading.Thread(target=_aquecer, name="psytext-warmup", daemon=True)
+    thread.start()
+    return thread
+
+_versao_lexico = None
+_cache_frases = None  # a cache das pontuações das frases, aberta na primeira análise (ver obter_cache_frases)
+_cache_desativada = not cfg_cache["enabled"]
+
+def versao_lexico():
+    """
+    a versão do léxico em uso (hash do léxico personalizado e versão da pontuação das expressões),
+    calculada uma vez por processo
+    """
+    global _versao_lexico
+    if _versao_lexico is None:
+        _versao_lexico = f"{lexico_snapshot.versao_lexico(custom_vader_lexicon)}-e{expressoes.VERSAO}"
+    return _versao_lexico
+
+def ativar_cache_frases(caminho=None, max_entradas=None):
+    """
+    ativa a cache persistente das pontuações das frases
+
+    Args:
+        caminho (str, optional): o ficheiro sqlite; por defeito fica na pasta de cache de defaults.paths
+        max_entradas (int, optional): tamanho máximo da cache; por defeito o de defaults.sentence_cache
+
+    Returns:
+        CacheFrases: a cache ativa
+    """
+    global _cache_frases, _cache_desativada
+    desativar_cache_frases()
+    caminho = caminho or os.path.join(ph["cache_dir"], ph["sentence_cache"])
+    _cache_frases = CacheFrases(caminho, versao_lexico(), max_entradas or cfg_cache["max_entries"])
+    _cache_desativada = False
+    return _cache_frases
+
+def desativar_cache_frases():
+    """desliga a cache das pontuações (todas as frases passam a ser pontuadas pelo VADER)"""
+    global _cache_frases, _cache_desativada
+    if _cache_frases is not None:
+        _cache_frases.fechar()
+    _cache_frases = None
+    _cache_desativada = True
+
+def obter_cache_frases():
+    """devolve a cache ativa (abrindo-a na primeira vez, se estiver ligada em defaults), ou None se estiver desligada"""
+    if _cache_frases is None and not _cache_desativada:
+        ativar_cache_frases()
+    return _cache_frases
+
+def __getattr__(nome):
+    # compatibilidade: o código antigo usava psytext.sia diretamente
+    if nome == "sia":
+        return obter_analisador()
+    raise AttributeError(f"module {__name__!r} has no attribute {nome!r}")
+
+class AnaliseCancelada(Exception):
+    """lançada quando uma análise é cancelada a meio (ver o argumento `cancelar` de analisar_texto)"""
+
+_INTERVALO_PROGRESSO = 20  # de quantas em quantas frases o progresso é comunicado
+
+def _verificar_cancelamento(cancelar):
+    """lança AnaliseCancelada se o evento de cancelamento tiver sido ativado"""
+    if cancelar is not None and cancelar.is_set():
+        raise AnaliseCancelada()
 
 def cor_por_sentimento(pontuacao):
     """
@@ -113,53 +249,152 @@ def calcular_arousal(pontuacoes):
         return 0
     return max(relevant_scores.values()) - min(relevant_scores.values())
 
-def _analisar_frases(texto):
+def _analisar_frases(texto, progresso=None, cancelar=None):
     """
     analisa cada frase do texto para sacar o sentimento, arousal e a cor
     esta é a função central de análise de frases para evitar repetição
+
+    Args:
+        texto (str | Documento): o texto, ou o documento já tokenizado por construir_documento
+        progresso (callable, optional): chamado com (frases_feitas, total_frases) à medida que a análise avança
+        cancelar (threading.Event, optional): se for ativado, a análise pára com AnaliseCancelada
+
+    Returns:
+        FrasesAnalisadas: os resultados em colunas, que se usam como uma lista de dicionários (frase, valence, arousal, cor)
+    """
+    documento = como_documento(texto)
+    # cada frase fica guardada só como a sua posição no texto original (sem os espaços das pontas)
+    posicoes = documento.spans or [None] * documento.num_frases
+    frases, inicios = [], []
+    for frase, span in zip(documento.frases, posicoes):
+        limpa = frase.strip()
+        if limpa:
+            frases.append(limpa)
+            inicios.append(span[0] + len(frase) - len(frase.lstrip()) if span else None)
+    resultados = FrasesAnalisadas(documento.texto if documento.spans else None)
+    for frase, inicio, pontuacao in zip(frases, inicios, _pontuar_frases(frases, progresso, cancelar)):
+        if pontuacao is not None:
+            resultados.adicionar(frase, *pontuacao, inicio=inicio)
+    return resultados
+
+@medir_etapa("score", _contar_frases)
+def _pontuar_frases(frases, progresso=None, cancelar=None):
+    """
+    pontua uma lista de frases (já sem espaços nas pontas e não vazias)
+
+    Returns:
+        list: para cada frase, pela mesma ordem, o tuplo (valence, arousal, cor),
+              ou None se o VADER não a conseguiu pontuar
     """
-    frases = nltk.sent_tokenize(texto, language='english')
+    sia = obter_analisador()
+    cache = obter_cache_frases()
+
+    # com a cache ligada, as frases já conhecidas vêm todas de uma vez da cache e só as outras passam pelo VADER
+    chaves = [cache.chave(frase) for frase in frases] if cache else [None] * len(frases)
+    conhecidas = cache.obter_muitos(chaves) if cache else {}
+    novas = {}
+
     frases_info = []
-    for frase in frases:
-        frase = frase.strip()
-        if not frase:
-            continue
-        try:
-            scores = sia.polarity_scores(frase)
-            compound = scores['compound']
-            arousal = calcular_arousal(scores)
-            cor = cor_por_sentimento(compound)
-            frases_info.append({
-                "frase": frase,
-                "valence": compound,
-                "arousal": arousal,
-                "cor": cor
-            })
-        except Exception as e:
-            print(f"Error analyzing sentence: '{frase}'. Error: {str(e)}")
+    total = len(frases)
+    for i, (frase, chave) in enumerate(zip(frases, chaves), start=1):
+        if i % _INTERVALO_PROGRESSO == 0:
+            _verificar_cancelamento(cancelar)
+            if progresso:
+                progresso(i, total)
+        resultado = conhecidas.get(chave) or novas.get(chave)
+        if resultado is None:
+            try:
+                scores = sia.polarity_scores(frase)
+                compound = scores['compound']
+                resultado = (compound, calcular_arousal(scores), cor_por_sentimento(compound))
+            except Exception as e:
+                log.error(f"Error analyzing sentence: '{frase}'. Error: {str(e)}")
+                frases_info.append(None)
+                continue
+            if cache:
+                novas[chave] = resultado
+        frases_info.append(resultado)
+    if cache:
+        cache.guardar_muitos(novas)
+    if progresso:
+        progresso(total, total)
     return frases_info
 
-def gerar_html_frases_coloridas(frases_info, output_path, estatisticas_gerais=None):
+_TAMANHO_BUFFER_HTML = 64  # quantos pedaços do template são juntados antes de cada escrita no ficheiro
+_ambiente_templates = None  # o ambiente do jinja2, criado uma vez por processo (ver _carregar_template)
+_templates_lock = threading.Lock()
+
+def _obter_ambiente_templates():
+    """
+    devolve o ambiente do jinja2, criado só na primeira vez
+    o ambiente guarda os templates já compilados em memória e a cache de bytecode guarda-os em disco,
+    por isso o template.html só é lido e compilado uma vez (e nem isso nos processos seguintes)
+    """
+    global _ambiente_templates
+    if _ambiente_templates is None:
+        with _templates_lock:
+            if _ambiente_templates is None:
+                import jinja2 # Para templating HTML
+                pasta_cache = os.path.join(ph["cache_dir"], ph["template_cache"])
+                try:
+                    os.makedirs(pasta_cache, exist_ok=True)
+                    bytecode_cache = jinja2.FileSystemBytecodeCache(pasta_cache)
+                except OSError as e:
+                    log.debug(f"Template bytecode cache disabled ({e}).")
+                    bytecode_cache = None
+                # configura o ambiente do jinja2 para carregar o template da pasta do script
+                template_loader = jinja2.FileSystemLoader(searchpath=os.path.dirname(os.path.abspath(__file__)))
+                _ambiente_templates = jinja2.Environment(loader=template_loader, bytecode_cache=bytecode_cache)
+    return _ambiente_templates
+
+def _carregar_template(nome="template.html"):
+    """carrega o template html da pasta do script (já compilado, se já foi usado antes)"""
+    return _obter_ambiente_templates().get_template(nome)
+
+def _escrever_template(template, context, output_path):
+    """renderiza o template diretamente para o ficheiro, aos bocados, sem construir o html todo em memória"""
+    stream = template.stream(context)
+    stream.enable_buffering(_TAMANHO_BUFFER_HTML)  # junta vários pedaços pequenos em cada escrita
+    with open(output_path, "w", encoding="utf-8") as f:
+        stream.dump(f)
+
+@medir_etapa("html", _contar_frases)
+def gerar_html_frases_coloridas(frases_info, output_path, estatisticas_gerais=None, paginado=None, levantar_erros=False):
     """
     gera um ficheiro html com as frases do texto original coloridas de acordo com o seu sentimento
+    textos muito compridos dão um relatório paginado (ver relatorio.py), que abre logo em vez de obrigar
+    o browser a desenhar dezenas de milhares de frases de uma vez
 
     Args:
         frases_info (list): lista de dicionários com os dados já analisados de cada frase
         output_path (str, optional): o caminho onde o ficheiro html será guardado
         estatisticas_gerais (dict, optional): dicionário com estatísticas gerais do texto
+        paginado (bool, optional): força (ou impede) o relatório paginado; por defeito é usado
+                                   quando há mais frases do que defaults.html_report["paginate_above"]
+        levantar_erros (bool, optional): se for True, os erros de escrita são lançados depois de mostrados
     """
-    print(f"Starting HTML generation for output path: {output_path if output_path else 'default'}")
+    log.debug(f"Starting HTML generation for output path: {output_path if output_path else 'default'}")
 
     # garante que a pasta de saída para o html existe
     output_dir_for_html = os.path.dirname(output_path)
     if output_dir_for_html: # vê se o dirname não está vazio (por exemplo, para não dar erro num ficheiro na raiz)
         os.makedirs(output_dir_for_html, exist_ok=True)
-        print(f"Ensured output directory exists: {output_dir_for_html}")
+        log.debug(f"Ensured output directory exists: {output_dir_for_html}")
 
-    # configura o ambiente do jinja2 para carregar o template da pasta do script
-    template_loader = jinja2.FileSystemLoader(searchpath=os.path.dirname(__file__))
-    template_env = jinja2.Environment(loader=template_loader)
-    template = template_env.get_template("template.html")
+    if paginado is None:
+        paginado = len(frases_info) > cfg_relatorio["paginate_above"]
+    if paginado:
+        try:
+            num_paginas = gerar_relatorio_paginado(frases_info, output_path, estatisticas_gerais)
+            log.debug(f"Paginated HTML ({num_paginas} pages) successfully exported to: {output_path}")
+        except Exception as e:
+            log.error(f"Exception - error creating/writing paginated HTML at {output_path}: {str(e)}")
+            if levantar_erros:
+                raise
+        log.debug("Finished HTML generation.")
+        return
+
+    template = _carregar_template()
 
     # prepara os dados para o template
     context = {
@@ -168,105 +403,105 @@ def gerar_html_frases_coloridas(frases_info, output_path, estatisticas_gerais=No
         "st": st  # passa o dicionário de strings para o template
     }
 
-    # renderiza o template com os dados
-    html_output = template.render(context)
-
     try:
-        # escreve o conteúdo html no ficheiro de saída
-        with open(output_path, "w", encoding="utf-8") as f:
-            f.write(html_output)
-        print(f"HTML successfully exported to: {output_path}")
+        # renderiza o template com os dados e escreve o html no ficheiro de saída à medida que é gerado
+        _escrever_template(template, context, output_path)
+        log.debug(f"HTML successfully exported to: {output_path}")
     except Exception as e:
-        print(f"Exception - error creating/writing HTML file at {output_path}: {str(e)}")
+        log.error(f"Exception - error creating/writing HTML file at {output_path}: {str(e)}")
+        if levantar_erros:
+            raise
 
-    print("Finished HTML generation.")
+    log.debug("Finished HTML generation.")
 
-def gerar_affect_grid(frases_info, output_path):
+@medir_etapa("grid", _contar_frases)
+def gerar_affect_grid(frases_info, output_path=None, modo=None, levantar_erros=False):
     """
     Gera um gráfico "Affect Grid" (Valence vs. Arousal) e guarda-o como uma imagem.
 
     Args:
         frases_info (list): Lista de dicionários com informações das frases (requer 'valence', 'arousal', 'cor').
-        output_path (str): Caminho onde a imagem do gráfico será guardada.
+        output_path (str, optional): Caminho onde a imagem do gráfico será guardada; sem caminho a imagem não é guardada.
+        modo (str, optional): "scatter" ou "density"; por defeito é escolhido pelo número de frases.
+        levantar_erros (bool, optional): se for True, os erros ao guardar a imagem são lançados depois de mostrados.
+
+    Returns:
+        matplotlib.figure.Figure: a figura, para ser mostrada diretamente (ou None se não houver dados)
     """
     if not frases_info:
-        print("Sem dados para gerar o Affect Grid.")
-        return
-
-    print(f'Attempting to generate Affect Grid to: {output_path}...')
-    df = pd.DataFrame(frases_info)
-
-    fig, ax = plt.subplots(figsize=(8, 8))  # Cria uma figura e um conjunto de subplots
-    ax.axhline(0, color='black', lw=0.5)  # linha horizontal no eixo y=0
-    ax.axvline(0, color='black', lw=0.5)  # linha vertical no eixo x=0
-    # scatter plot: valence no x, arousal no y, e a cor baseada no sentimento
-    ax.scatter(df["valence"], df["arousal"], c=df["cor"], alpha=0.6)
+        log.warning("Sem dados para gerar o Affect Grid.")
+        return None
 
-    ax.set_title("Affect Grid (Valence vs Arousal)")
-    ax.set_xlabel("Valence (Negative <-> Positive)")
-    ax.set_ylabel("Arousal (Passive <-> Active)")
-    ax.grid(True)  # adiciona uma grelha ao gráfico
+    # a figura é feita a partir de arrays numpy; com muitas frases passa a um mapa de densidade (ver graficos.py)
+    fig = figura_affect_grid(frases_info, modo)
+    if output_path is None:
+        return fig
 
+    log.debug(f'Attempting to generate Affect Grid to: {output_path}...')
     try:
         # garante que a pasta de saída para o gráfico existe
         output_dir_for_grid = os.path.dirname(output_path) # saca o diretório do caminho de saída
         if output_dir_for_grid:
             os.makedirs(output_dir_for_grid, exist_ok=True)
-            print(f"Ensured output directory for grid exists: {output_dir_for_grid}")
+            log.debug(f"Ensured output directory for grid exists: {output_dir_for_grid}")
         fig.savefig(output_path)  # guarda a figura no caminho que foi dito
-        print(f"Affect Grid saved to: {output_path}")
+        log.debug(f"Affect Grid saved to: {output_path}")
     except Exception as e:
-        print(f"Exception - error saving Affect Grid to {output_path}: {str(e)}")
-    finally:
-        plt.close(fig)  # fecha a figura para libertar memória, o que é importante se for executado várias vezes
-
-def exportar_json(frases_info, output_path):
+        log.error(f"Exception - error saving Affect Grid to {output_path}: {str(e)}")
+        if levantar_erros:
+            raise
+    # sem o pyplot não há figuras abertas para fechar: a figura é libertada quando deixa de ser usada
+    return fig
+
+@medir_etapa("json", _contar_frases)
+def exportar_json(frases_info, output_path, levantar_erros=False):
     """
     Exporta as informações das frases analisadas para um ficheiro JSON.
 
     Args:
         frases_info (list): Lista de dicionários com informações das frases.
         output_path (str): Caminho onde o ficheiro JSON será guardado.
+        levantar_erros (bool, optional): se for True, os erros de escrita são lançados depois de mostrados.
     """
     if not frases_info:
-        print("Sem dados para exportar para JSON.")
+        log.warning("Sem dados para exportar para JSON.")
         return
 
-    print(f'Attempting to export JSON to: {output_path}...')
+    log.debug(f'Attempting to export JSON to: {output_path}...')
     try:
         # garante que o caminho existe
         output_dir_for_json = os.path.dirname(output_path)
         if output_dir_for_json:
             os.makedirs(output_dir_for_json, exist_ok=True)
-            print(f"Ensured output directory for JSON exists: {output_dir_for_json}")
+            log.debug(f"Ensured output directory for JSON exists: {output_dir_for_json}")
         # escreve no ficheiro json
         with open(output_path, "w", encoding="utf-8") as f:
-            json.dump(frases_info, f, indent=4, ensure_ascii=False)
-        print(f"JSON successfully exported to: {output_path}")
+            # o json precisa de uma lista (os resultados em colunas são convertidos frase a frase)
+            json.dump(frases_info if isinstance(frases_info, list) else list(frases_info), f, indent=4, ensure_ascii=False)
+        log.debug(f"JSON successfully exported to: {output_path}")
     except Exception as e:
-        print(f"Error exporting JSON to {output_path}: {str(e)}")
+        log.error(f"Error exporting JSON to {output_path}: {str(e)}")
+        if levantar_erros:
+            raise
 
+@medir_etapa("descriptors", _contar_documento)
 def calcular_descritores_textuais(texto):
     """
     calcula descritores de texto básicos: contagem de palavras, média de palavras por frase e type-token ratio
-    usa nltk.sent_tokenize para uma melhor contagem de frases
+    usa as frases e as palavras do documento já tokenizado, em vez de voltar a tokenizar o texto
 
     Args:
-        texto (str): O texto original.
+        texto (str | Documento): O texto original, ou o documento já tokenizado.
 
     Returns:
         dict: Um dicionário com os descritores calculados.
     """
-    print("A calcular descritores textuais...")
+    log.debug("A calcular descritores textuais...")
     try:
-        # NLTK tentará usar 'portuguese'
-        frases = nltk.sent_tokenize(texto, language='english')
-        num_frases_nltk = len(frases)
-        # aqui usou-se 'portuguese' como um "placeholder" dado que o nltk trata do idioma inglês por defeito se não houver recursos portugueses do punkt
-        # a sua implementação não foi contiunuada no psytext portanto isto em específico foi deixado de lado
-        palavras = nltk.word_tokenize(texto.lower(), language='english')
-        # tira a pontuação da lista de palavras para as contagens serem mais certas
-        palavras = [palavra for palavra in palavras if palavra.isalnum()]
+        documento = como_documento(texto)
+        num_frases_nltk = documento.num_frases
+        # o documento já tem as palavras em minúsculas e sem a pontuação, para as contagens serem mais certas
+        palavras = documento.palavras
         num_palavras = len(palavras)
         
         avg_palavras_frase = num_palavras / num_frases_nltk if num_frases_nltk > 0 else 0
@@ -282,105 +517,195 @@ def calcular_descritores_textuais(texto):
             "num_frases_nltk": num_frases_nltk # usado para os cálculos dos descritores serem consistentes
         }
     except Exception as e:
-        print(f"Error calculating textual descriptors: {e}")
+        log.error(f"Error calculating textual descriptors: {e}")
         return {"total_palavras": "N/A", "avg_palavras_frase": "N/A", "ttr": "N/A", "num_frases_nltk": "N/A"}
 
+@medir_etapa("flesch", _contar_documento)
 def calcular_legibilidade_flesch(texto):
-    """calcula o flesch reading ease com a biblioteca textstat"""
-    print("Calculating Flesch Reading Ease...")
+    """
+    calcula o flesch reading ease a partir das frases e palavras do documento já tokenizado
+    as sílabas de cada palavra vêm do memo do legibilidade.py (o textstat só é chamado para palavras novas)
+    """
+    log.debug("Calculating Flesch Reading Ease...")
     try:
         # nota: o textstat pode não ser 100% certo para português sem uma configuração de idioma específica
         # ou adaptação das regras de contagem de sílabas
         # para texto em inglês, deve ser certinho
-        return textstat.flesch_reading_ease(texto)
+        documento = como_documento(texto)
+        palavras = documento.palavras
+        if not palavras or documento.num_frases == 0:
+            return "N/A"
+        return flesch_de_contagens(len(palavras), documento.num_frases, silabas_das_palavras(palavras))
     except Exception as e:
-        print(f"Error calculating Flesch Reading Ease with textstat: {e}")
+        log.error(f"Error calculating Flesch Reading Ease with textstat: {e}")
         return "N/A"
 
-# def count_emotion_words(text, emotion_lexicons):
-#     """
-#     conta as palavras de emoção que aparecem no texto, com base nos léxicos
-#
-#     Args:
-#         text (str): O texto de entrada.
-#         emotion_lexicons (dict): Um dicionário onde as chaves são nomes de emoções
-#                                  e os valores são listas de palavras para essa emoção.
-#
-#     Returns:
-#         dict: Um dicionário com nomes de emoções como chaves e as suas contagens de palavras como valores.
-#     """
-#     print("Counting emotion words...")
-#     emotion_counts = {emotion: 0 for emotion in emotion_lexicons}
-#     try:
-#         # outra vez o "placeholder"
-#         words = word_tokenize(text.lower(), language='english')
-#         for emotion, lexicon in emotion_lexicons.items():
-#             for word in lexicon:
-#                 emotion_counts[emotion] += words.count(word.lower())
-#     except Exception as e:
-#         print(f"Error counting emotion words: {e}")
-#     return emotion_counts
+@medir_etapa("readability_trajectory", _contar_documento)
+def calcular_trajetoria_legibilidade(texto, janela=None, passo=1):
+    """
+    o flesch reading ease ao longo do texto, em janelas de frases seguidas (ver legibilidade.flesch_em_janelas)
+
+    Args:
+        texto (str | Documento): o texto, ou o documento já tokenizado por construir_documento
+        janela (int, optional): frases em cada janela; por defeito defaults.readability["window_sentences"]
+        passo (int, optional): de quantas em quantas frases começa uma janela
+
+    Returns:
+        list: (índice da primeira frase, flesch) de cada janela
+    """
+    return flesch_em_janelas(como_documento(texto).tokens_por_frase, janela, passo)
+
+@medir_etapa("emotions", _contar_documento)
+def count_emotion_words(text, emotion_lexicons):
+    """
+    conta as palavras de emoção que aparecem no texto, com base nos léxicos
+    usa o índice pré-compilado do léxico, por isso é uma só passagem pelas palavras
+
+    Args:
+        text (str | Documento): O texto de entrada, ou o documento já tokenizado.
+        emotion_lexicons (dict): Um dicionário onde as chaves são nomes de emoções
+                                 e os valores são listas de palavras para essa emoção.
 
+    Returns:
+        dict: Um dicionário com nomes de emoções como chaves e as suas contagens de palavras como valores.
+    """
+    log.debug("Counting emotion words...")
+    emotion_counts = {emotion: 0 for emotion in emotion_lexicons}
+    try:
+        emotion_counts = obter_indice(emotion_lexicons).contar(como_documento(text).tokens)
+    except Exception as e:
+        log.error(f"Error counting emotion words: {e}")
+    return emotion_counts
+
+@medir_etapa("pronouns", _contar_documento)
 def count_pronouns(text, pronoun_categories):
     """
     conta os pronomes que aparecem, com base nas categorias definidas
+    usa o índice pré-compilado das categorias, por isso é uma só passagem pelas palavras
 
     Args:
-        text (str): O texto de entrada.
+        text (str | Documento): O texto de entrada, ou o documento já tokenizado.
         pronoun_categories (dict): Um dicionário onde as chaves são nomes de categorias de pronomes
                                    e os valores são listas de pronomes nessa categoria.
 
     Returns:
         dict: Um dicionário com nomes de categorias de pronomes como chaves e as suas contagens como valores.
     """
-    print("Counting pronouns...")
+    log.debug("Counting pronouns...")
     pronoun_counts = {category: 0 for category in pronoun_categories}
     try:
-        
-        words = word_tokenize(text.lower(), language='english')
-        for category, pronouns_in_category in pronoun_categories.items():
-            for pronoun in pronouns_in_category:
-                pronoun_counts[category] += words.count(pronoun.lower()) # garante que o pronome no léxico também está em minúsculas
+        # o índice guarda os pronomes em minúsculas, tal como os tokens do documento
+        pronoun_counts = obter_indice(pronoun_categories).contar(como_documento(text).tokens)
     except Exception as e:
-        print(f"Error counting pronouns: {e}")
+        log.error(f"Error counting pronouns: {e}")
     return pronoun_counts
 
-def generate_sentiment_trajectory_graph(frases_info, output_path):
+@medir_etapa("trajectory", _contar_frases)
+def generate_sentiment_trajectory_graph(frases_info, output_path=None):
     """
     gera um gráfico de linhas da trajetória do sentimento (a valência) ao longo das frases
 
     Args:
         frases_info (list): Lista de dicionários, cada um com uma chave 'valence'.
-        output_path (str): Caminho para guardar a imagem do gráfico gerado.
+        output_path (str, optional): Caminho para guardar a imagem do gráfico gerado; sem caminho não é guardada.
+
+    Returns:
+        matplotlib.figure.Figure: a figura, para ser mostrada diretamente (ou None se não houver dados)
     """
-    print(f"Generating sentiment trajectory graph to: {output_path}")
     if not frases_info:
-        print("No data for sentiment trajectory graph.")
-        return
-    
-    valences = [info['valence'] for info in frases_info]
-    sentence_indices = range(1, len(valences) + 1)
-
-    fig, ax = plt.subplots(figsize=(10, 5))
-    ax.plot(sentence_indices, valences, marker='o', linestyle='-', color='b')
-    ax.axhline(0, color='grey', lw=0.8, linestyle='--') # linha de referência no zero
-    ax.set_title("Sentiment Trajectory Over Sentences")
-    ax.set_xlabel("Sentence Index")
-    ax.set_ylabel("Valence Score")
-    ax.grid(True)
+        log.warning("No data for sentiment trajectory graph.")
+        return None
     
+    # com muitas frases a linha é suavizada e reduzida a cerca de um ponto por píxel (ver graficos.py)
+    fig = figura_trajetoria(frases_info)
+    if output_path is None:
+        return fig
+
+    log.debug(f"Generating sentiment trajectory graph to: {output_path}")
+
     try:
         output_dir_for_graph = os.path.dirname(output_path)
         if output_dir_for_graph:
             os.makedirs(output_dir_for_graph, exist_ok=True)
         fig.savefig(output_path)
-        print(f"Sentiment trajectory graph saved to: {output_path}")
+        log.info(f"Sentiment trajectory graph saved to: {output_path}")
     except Exception as e:
-        print(f"Error saving sentiment trajectory graph: {e}")
-    finally:
-        plt.close(fig)
+        log.error(f"Error saving sentiment trajectory graph: {e}")
+    return fig
 
-def analisar_texto(texto, base_filename="analysis_default"):
+def executar_saidas(saidas, cancelar=None):
+    """
+    corre as saídas de uma análise (html, affect grid, json...) ao mesmo tempo, numa pool de threads
+    nenhuma depende das outras, e a maior parte do tempo delas (codificar o png, escrever ficheiros) é passado
+    fora do GIL, por isso o tempo total fica perto do da saída mais lenta em vez da soma de todas
+    os gráficos usam a Figure do matplotlib sem o pyplot, que pode ser usada fora da thread principal
+    durante uma captura de perfil (ver perfil.py) as saídas são escritas nesta thread, uma a seguir à outra,
+    porque o cProfile só vê a thread onde começou
+
+    Args:
+        saidas (dict): nome da saída -> função sem argumentos que a escreve (e lança uma exceção se falhar)
+        cancelar (threading.Event, optional): se já estiver ativado, nenhuma saída é escrita (AnaliseCancelada)
+
+    Returns:
+        dict: nome da saída -> {"segundos": tempo gasto, "erro": mensagem do erro ou None}
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    _verificar_cancelamento(cancelar)
+
+    def medir(funcao):
+        inicio = time.perf_counter()
+        try:
+            funcao()
+            erro = None
+        except Exception as e:
+            erro = str(e) or type(e).__name__
+        return {"segundos": time.perf_counter() - inicio, "erro": erro}
+
+    if len(saidas) <= 1 or captura_ativa():
+        return {nome: medir(funcao) for nome, funcao in saidas.items()}
+    with ThreadPoolExecutor(max_workers=len(saidas), thread_name_prefix="psytext-output") as executor:
+        futuros = {nome: executor.submit(medir, funcao) for nome, funcao in saidas.items()}
+    return {nome: futuro.result() for nome, futuro in futuros.items()}
+
+def analisar_sem_saidas(texto, progresso=None, cancelar=None, processos=None):
+    """
+    a parte do analisar_texto que não escreve ficheiros: pontua as frases e junta as estatísticas do texto
+    (usada também pelo serviço local, que devolve os resultados sem gerar html nem gráficos)
+
+    Args:
+        texto (str): o texto
+        progresso (callable, optional): chamado com (frases_feitas, total_frases) durante a pontuação das frases
+        cancelar (threading.Event, optional): se for ativado, a análise pára com AnaliseCancelada
+        processos (int, optional): como no analisar_texto (ver fragmentos.py)
+
+    Returns:
+        tuple: (FrasesAnalisadas, AcumuladorEstatisticas) do texto
+    """
+    import fragmentos
+    if processos != 1 and fragmentos.deve_fragmentar(texto, processos):
+        # 0+1. um texto muito grande é partido em fragmentos (em fronteiras de frases) e cada processo da pool
+        # tokeniza, pontua e junta as estatísticas de um fragmento; as frases e os acumuladores são juntados pela ordem
+        frases_info_completas, acumulador_texto = fragmentos.analisar_em_fragmentos(
+            texto, processos=processos, progresso=progresso, cancelar=cancelar)
+    else:
+        # 0. garante que o VADER e os recursos do nltk estão carregados (só custa na primeira análise)
+        # e tokeniza o texto só uma vez; o documento é partilhado por todas as métricas
+        obter_analisador()
+        documento = construir_documento(texto)
+
+        # 1. analisa as frases do texto só uma vez
+        frases_info_completas = _analisar_frases(documento, progresso=progresso, cancelar=cancelar)
+
+        log.debug("Calculating Aggregate Statistics...")
+        # 2. junta todas as estatísticas num acumulador: as de sentimento de uma vez sobre as colunas dos resultados,
+        # e as palavras, sílabas, emoções e pronomes numa só passagem pelos tokens do documento
+        acumulador_texto = AcumuladorEstatisticas()
+        acumulador_texto.adicionar_frases(frases_info_completas)
+        acumulador_texto.adicionar_documento(documento)
+    return frases_info_completas, acumulador_texto
+
+def analisar_texto(texto, base_filename="analysis_default", progresso=None, cancelar=None, tempos_saidas=None,
+                   acumulador=None, processos=None):
     """
     faz uma análise completa do texto: gera html colorido, affect grid e ficheiro json,
     os ficheiros de saída são guardados na pasta definida em `ph["output_dir"]`
@@ -390,98 +715,107 @@ def analisar_texto(texto, base_filename="analysis_default"):
         texto (str): O texto em português a ser analisado.
         base_filename (str, optional): O nome base para os ficheiros de saída.
                                        Defaults to "analysis_default".
+        progresso (callable, optional): chamado com (frases_feitas, total_frases) durante a pontuação das frases
+        cancelar (threading.Event, optional): se for ativado, a análise pára com AnaliseCancelada
+                                              antes de escrever os ficheiros
+        tempos_saidas (dict, optional): se for dado, é preenchido com o tempo e o erro de cada saída
+                                        (ver executar_saidas)
+        acumulador (AcumuladorEstatisticas, optional): se for dado, as estatísticas deste texto são também
+                                                       juntadas a ele (ex: para as estatísticas de um corpus inteiro)
+        processos (int, optional): com mais de 1, o texto é partido em fragmentos pontuados numa pool de processos
+                                   (ver fragmentos.py); por defeito só textos grandes (ver defaults.sharding)
 
     Returns:
-        tuple: (caminho_html, estatisticas) ou (None, None) se a geração falhar.
-               estatisticas é um dicionário com as métricas agregadas do texto.
-               frases_info_completas é a lista detalhada de informações de cada frase.
+        tuple: (caminho_html, estatisticas, frases_info_completas), ou (None, None, None) se nenhuma frase
+               for analisada. estatisticas é um dicionário com as métricas agregadas do texto (como
+               AcumuladorEstatisticas.para_dict) e frases_info_completas são as frases analisadas (FrasesAnalisadas).
+
+    Raises:
+        ValueError: se defaults.exports["formats"] tiver um formato que não existe
+        AnaliseCancelada: se `cancelar` for ativado
     """
-    print(f"Starting full text analysis for base filename: {base_filename}...")
+    log.debug(f"Starting full text analysis for base filename: {base_filename}...")
+    # um formato mal escrito em defaults.exports é recusado já, e não só depois de o texto estar todo pontuado
+    verificar_formatos(cfg_exportacao["formats"])
     output_dir = ph["output_dir"] # pasta de saída principal
     os.makedirs(output_dir, exist_ok=True)  # garante que a pasta de saída principal existe
 
-    trajectory_graph_suffix = "_sentiment_trajectory.png" # define o sufixo para o gráfico da trajetória
     # constrói os caminhos completos para os ficheiros de saída
     html_out_path = os.path.join(output_dir, f"{base_filename}{ph['html_suffix']}")
 
-    # 1. analisa as frases do texto só uma vez
-    frases_info_completas = _analisar_frases(texto)
+    frases_info_completas, acumulador_texto = analisar_sem_saidas(texto, progresso=progresso, cancelar=cancelar,
+                                                                  processos=processos)
+    estatisticas = acumulador_texto.para_dict()
+    if acumulador is not None:
+        acumulador.juntar(acumulador_texto)
 
-    print("Calculating Aggregate Statistics...")
-    # inicializa o dicionário das estatísticas
-    estatisticas = {"num_frases": 0, "media_valencia": 0.0, "media_arousal": 0.0,
-                    "perc_positivas": 0.0, "perc_negativas": 0.0, "perc_neutras": 0.0,
-                    "cont_positivas": 0, "cont_negativas": 0, "cont_neutras": 0}
-    
-    # 2. calcula as estatísticas a partir dos dados que já foram analisados
-    if frases_info_completas:
-        estatisticas["num_frases"] = len(frases_info_completas)
-        if estatisticas["num_frases"] > 0:
-            # mudei o nome para 'media_valencia' para ser consistente com o que o html espera
-            estatisticas["media_valencia"] = sum(f['valence'] for f in frases_info_completas) / estatisticas["num_frases"]
-            estatisticas["media_arousal"] = sum(f['arousal'] for f in frases_info_completas) / estatisticas["num_frases"]
-        else: # para evitar a divisão por zero se não houver frases válidas
-            estatisticas["media_valencia"] = 0.0
-            estatisticas["media_arousal"] = 0.0
-        estatisticas["cont_positivas"] = sum(1 for f in frases_info_completas if f['valence'] >= 0.05)
-        estatisticas["cont_negativas"] = sum(1 for f in frases_info_completas if f['valence'] <= -0.05)
-        estatisticas["cont_neutras"] = estatisticas["num_frases"] - estatisticas["cont_positivas"] - estatisticas["cont_negativas"]
-        if estatisticas["num_frases"] > 0:
-            estatisticas["perc_positivas"] = (estatisticas["cont_positivas"] / estatisticas["num_frases"]) * 100
-            estatisticas["perc_negativas"] = (estatisticas["cont_negativas"] / estatisticas["num_frases"]) * 100
-            estatisticas["perc_neutras"] = (estatisticas["cont_neutras"] / estatisticas["num_frases"]) * 100
-
-    # calcula os descritores do texto e a legibilidade
-    estatisticas.update(calcular_descritores_textuais(texto))
-    estatisticas['flesch_reading_ease'] = calcular_legibilidade_flesch(texto)
-
-    # calcula e adiciona as contagens de emoções e pronomes
-    # garante que estes léxicos estão definidos no defaults.py e que foram importados
-    from defaults import pronoun_categories_en # garante que estes são importados
-    # estatisticas['emotion_counts'] = count_emotion_words(texto, emotion_lexicons_en) # Comentado para desativar a contagem de emoções
-    estatisticas['pronoun_counts'] = count_pronouns(texto, pronoun_categories_en)
-
-    # 3. gera o html a partir dos dados que já foram analisados
-    gerar_html_frases_coloridas(frases_info_completas, output_path=html_out_path, estatisticas_gerais=estatisticas)
-    
-    if frases_info_completas:  # só continua se a geração do html (e das frases_info_completas) correr bem
+    if frases_info_completas:  # só há ficheiros para escrever se alguma frase foi analisada
         # constrói aqui os caminhos para os outros ficheiros de saída
         grid_out_path = os.path.join(output_dir, f"{base_filename}{ph['affect_grid_suffix']}")
         json_out_path = os.path.join(output_dir, f"{base_filename}{ph.get('json_suffix', '_analysis.json')}")
 
-        # 4. gera os outros outputs
-        gerar_affect_grid(frases_info_completas, output_path=grid_out_path)
-        exportar_json(frases_info_completas, output_path=json_out_path)
-        print(f"Full text analysis completed for {base_filename}.")
+        # 3. gera o html, o affect grid e as exportações ao mesmo tempo (nenhum depende dos outros)
+        saidas = {
+            "html": lambda: gerar_html_frases_coloridas(frases_info_completas, output_path=html_out_path,
+                                                        estatisticas_gerais=estatisticas, levantar_erros=True),
+            "affect_grid": lambda: gerar_affect_grid(frases_info_completas, output_path=grid_out_path, levantar_erros=True),
+        }
+        formatos = cfg_exportacao["formats"]
+        if "json" in formatos:
+            saidas["json"] = lambda: exportar_json(frases_info_completas, output_path=json_out_path, levantar_erros=True)
+        if any(formato != "json" for formato in formatos):
+            # json lines, colunas e parquet (ver exportacao.py)
+            saidas["exports"] = lambda: exportar_frases(frases_info_completas, output_dir, base_filename)
+        relatorio = executar_saidas(saidas, cancelar)
+        if tempos_saidas is not None:
+            tempos_saidas.update(relatorio)
+        log.debug("Output timings: " + ", ".join(f"{nome} {r['segundos']:.3f}s" + (f" (error: {r['erro']})" if r["erro"] else "")
+                                             for nome, r in relatorio.items()))
+        log.info(f"Full text analysis completed for {base_filename}.")
         return html_out_path, estatisticas, frases_info_completas
-    print(f"Full text analysis failed or produced no data for {base_filename}.")
+    log.warning(f"Full text analysis failed or produced no data for {base_filename}.")
     return None, None, None
 
 
 
 # condição principal
 if __name__ == "__main__":
+    import argparse
+    import contextlib
+    from registo import configurar_registo
+    parser = argparse.ArgumentParser(description="Analyze a text file with PsyText.")
+    parser.add_argument("input", nargs="?", default="message.txt", help="text file to analyze (default: message.txt)")
+    parser.add_argument("--profile", action="store_true",
+                        help="capture cProfile and tracemalloc reports of the analysis in the output directory")
+    args = parser.parse_args()
+    configurar_registo()
     try:
-        input_file_path = "message.txt"  # ficheiro de exemplo para testar
+        input_file_path = args.input  # por defeito o ficheiro de exemplo para testar
         # tira a extensão do nome do ficheiro para usar como base_filename
         base_name = os.path.splitext(os.path.basename(input_file_path))[0]
 
-        print(f"Running psytext.py as main script with input file: {input_file_path}")
-        with open(input_file_path, "r", encoding="utf-8") as f:
-            texto = f.read()
-            print(f"Read {len(texto)} characters from {input_file_path}")
+        log.info(f"Running psytext.py as main script with input file: {input_file_path}")
+        import fluxo
+        with CapturaPerfil(base_name) if args.profile else contextlib.nullcontext():
+            if fluxo.deve_usar_fluxo(input_file_path):
+                # ficheiros muito grandes são lidos e analisados aos bocados, sem os ter inteiros em memória
+                generated_html_file, stats = fluxo.analisar_ficheiro_em_fluxo(input_file_path, base_filename=base_name)
+            else:
+                with open(input_file_path, "r", encoding="utf-8") as f:
+                    texto = f.read()
+                    log.info(f"Read {len(texto)} characters from {input_file_path}")
 
-        # faz a análise completa do texto do ficheiro
-        generated_html_file, stats, _ = analisar_texto(texto, base_filename=base_name) # ignora o frases_info_completas aqui
+                # faz a análise completa do texto do ficheiro
+                generated_html_file, stats, _ = analisar_texto(texto, base_filename=base_name) # ignora o frases_info_completas aqui
 
         # se o ficheiro html foi gerado bem, abre-o no browser
         if generated_html_file and os.path.exists(generated_html_file):
-            print(f"Opening generated HTML in browser: {generated_html_file}")
+            log.info(f"Opening generated HTML in browser: {generated_html_file}")
             webbrowser.open(f"file://{os.path.abspath(generated_html_file)}") # o file:// é para o browser o abrir bem
         else:
-            print(f"Output HTML file not found or not generated.")
+            log.warning("Output HTML file not found or not generated.")
     except FileNotFoundError:
-        print(f"Input file '{input_file_path}' not found.")
+        log.warning(f"Input file '{input_file_path}' not found.")
     except Exception as e:
         # apanha qualquer outra exceção que possa acontecer durante a execução principal
-        print(f"An error occurred in the main execution of psytext.py: {str(e)}")
+        log.error(f"An error occurred in the main execution of psytext.py: {str(e)}")
@@ -0,0 +1,216 @@
+# este módulo tem as mensagens (logging com níveis) e a medição das etapas da análise
+# cada módulo escreve as suas mensagens com obter_logger(__name__); quem corre o programa (interface, batch, psytext
+# como script) chama configurar_registo() uma vez para escolher o nível e o formato (ver defaults.logs)
+# a medição guarda, para cada etapa (tokenize, score, descriptors, pronouns, flesch, html, grid, json, ...),
+# quantas vezes correu, o tempo total e máximo, e as frases e tokens tratados; desligada, etapa() devolve sempre
+# o mesmo objeto vazio e não mede nada
+
+# imports locais
+from defaults import logs as cfg_registo, instrumentation as cfg_instrumentacao
+
+# bibliotecas gerais
+import sys  # para as mensagens irem para o stdout, como os antigos prints
+import json  # para exportar as medições
+import functools  # para o decorador medir_etapa
+import time  # para medir cada etapa
+import logging  # para as mensagens com níveis
+import threading  # as saídas são escritas em várias threads ao mesmo tempo
+
+_RAIZ = "psytext"  # todos os loggers do programa ficam debaixo deste
+
+def obter_logger(nome):
+    """o logger de um módulo (ex: obter_logger(__name__)), debaixo do logger 'psytext'"""
+    return logging.getLogger(nome if nome == _RAIZ or nome.startswith(_RAIZ + ".") else f"{_RAIZ}.{nome}")
+
+def configurar_registo(nivel=None, formato=None, stream=None):
+    """
+    mostra as mensagens do programa num stream (por defeito o stdout), a partir do nível pedido
+    pode ser chamada mais do que uma vez: a configuração anterior é substituída
+
+    Args:
+        nivel (str | int, optional): "DEBUG", "INFO", "WARNING", ...; por defeito defaults.logs["level"]
+        formato (str, optional): o formato de cada linha (do módulo logging); por defeito defaults.logs["format"]
+        stream (file, optional): onde escrever; por defeito o sys.stdout
+    """
+    raiz = logging.getLogger(_RAIZ)
+    for handler in list(raiz.handlers):
+        if getattr(handler, "_psytext", False):
+            raiz.removeHandler(handler)
+    handler = logging.StreamHandler(stream or sys.stdout)
+    handler.setFormatter(logging.Formatter(formato or cfg_registo["format"]))
+    handler._psytext = True
+    raiz.addHandler(handler)
+    nivel = nivel or cfg_registo["level"]
+    raiz.setLevel(nivel.upper() if isinstance(nivel, str) else nivel)
+    raiz.propagate = False
+
+class _EtapaVazia:
+    """o que etapa() devolve com a medição desligada: não faz nada"""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excecao):
+        return False
+
+    def __bool__(self):
+        return False  # para `if medicao: medicao.contar(...)` não calcular as contagens sem medição
+
+    def contar(self, frases=0, tokens=0):
+        pass
+
+_ETAPA_VAZIA = _EtapaVazia()
+
+class _Etapa:
+    """uma execução de uma etapa a ser medida (usada com `with`)"""
+    __slots__ = ("_instrumentacao", "_nome", "_inicio", "frases", "tokens")
+
+    def __init__(self, instrumentacao, nome, frases, tokens):
+        self._instrumentacao = instrumentacao
+        self._nome = nome
+        self.frases = frases
+        self.tokens = tokens
+
+    def __enter__(self):
+        self._inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, tipo, *excecao):
+        self._instrumentacao.registar(self._nome, time.perf_counter() - self._inicio, self.frases, self.tokens,
+                                      erro=tipo is not None)
+        return False
+
+    def contar(self, frases=0, tokens=0):
+        """junta frases e tokens tratados nesta execução (quando só se sabem dentro da etapa)"""
+        self.frases += frases
+        self.tokens += tokens
+
+class Instrumentacao:
+    """
+    as medições das etapas de um processo
+
+    Attributes:
+        ativa (bool): se as etapas estão a ser medidas
+    """
+    def __init__(self, ativa=False):
+        self.ativa = ativa
+        self._lock = threading.Lock()
+        self._etapas = {}
+
+    def etapa(self, nome, frases=0, tokens=0):
+        """
+        mede uma etapa: `with instrumentacao.etapa("html", frases=n): ...`
+
+        Args:
+            nome (str): o nome da etapa
+            frases (int, optional): frases tratadas (também se podem juntar depois com contar())
+            tokens (int, optional): tokens tratados
+        """
+        if not self.ativa:
+            return _ETAPA_VAZIA
+        return _Etapa(self, nome, frases, tokens)
+
+    def registar(self, nome, segundos, frases=0, tokens=0, erro=False, chamadas=1, maximo=None):
+        """junta uma (ou mais) execuções de uma etapa às medições"""
+        with self._lock:
+            etapa = self._etapas.get(nome)
+            if etapa is None:
+                etapa = self._etapas[nome] = {"chamadas": 0, "erros": 0, "segundos": 0.0, "segundos_max": 0.0,
+                                              "frases": 0, "tokens": 0}
+            etapa["chamadas"] += chamadas
+            etapa["erros"] += int(erro)
+            etapa["segundos"] += segundos
+            etapa["segundos_max"] = max(etapa["segundos_max"], segundos if maximo is None else maximo)
+            etapa["frases"] += frases
+            etapa["tokens"] += tokens
+
+    def juntar(self, medicoes):
+        """junta as medições de outro processo (o dicionário devolvido pelo para_dict dele)"""
+        for nome, etapa in medicoes.items():
+            self.registar(nome, etapa["segundos"], etapa["frases"], etapa["tokens"], chamadas=etapa["chamadas"],
+                          maximo=etapa["segundos_max"])
+            with self._lock:
+                self._etapas[nome]["erros"] += etapa["erros"]
+
+    def limpar(self):
+        """apaga as medições feitas até agora"""
+        with self._lock:
+            self._etapas = {}
+
+    def para_dict(self):
+        """
+        Returns:
+            dict: etapa -> chamadas, erros, segundos (total e máximo), frases, tokens e frases por segundo
+        """
+        with self._lock:
+            etapas = {nome: dict(etapa) for nome, etapa in self._etapas.items()}
+        for etapa in etapas.values():
+            etapa["frases_por_segundo"] = etapa["frases"] / etapa["segundos"] if etapa["frases"] and etapa["segundos"] else None
+        return etapas
+
+    def para_json(self):
+        return json.dumps(self.para_dict(), indent=4)
+
+    def para_prometheus(self, prefixo="psytext_stage"):
+        """as medições no formato de texto do Prometheus (uma série por etapa para cada métrica)"""
+        etapas = self.para_dict()
+        metricas = [("calls_total", "chamadas", "counter", "Times each analysis stage ran."),
+                    ("errors_total", "erros", "counter", "Times each analysis stage raised an error."),
+                    ("seconds_total", "segundos", "counter", "Wall time spent in each analysis stage."),
+                    ("seconds_max", "segundos_max", "gauge", "Longest single run of each analysis stage."),
+                    ("sentences_total", "frases", "counter", "Sentences processed by each analysis stage."),
+                    ("tokens_total", "tokens", "counter", "Tokens processed by each analysis stage.")]
+        linhas = []
+        for sufixo, chave, tipo, ajuda in metricas:
+            nome = f"{prefixo}_{sufixo}"
+            linhas.append(f"# HELP {nome} {ajuda}")
+            linhas.append(f"# TYPE {nome} {tipo}")
+            for etapa, valores in etapas.items():
+                linhas.append(f'{nome}{{stage="{etapa}"}} {valores[chave]}')
+        return "\n".join(linhas) + "\n"
+
+    def exportar(self, caminho):
+        """escreve as medições num ficheiro: formato Prometheus se acabar em .prom ou .txt, senão json"""
+        conteudo = self.para_prometheus() if caminho.endswith((".prom", ".txt")) else self.para_json()
+        with open(caminho, "w", encoding="utf-8") as f:
+            f.write(conteudo)
+        return caminho
+
+# as medições deste processo
+instrumentacao = Instrumentacao(ativa=cfg_instrumentacao["enabled"])
+
+def etapa(nome, frases=0, tokens=0):
+    """mede uma etapa nas medições deste processo (ver Instrumentacao.etapa)"""
+    if not instrumentacao.ativa:
+        return _ETAPA_VAZIA
+    return _Etapa(instrumentacao, nome, frases, tokens)
+
+def medir_etapa(nome, contar=None):
+    """
+    decorador: mede cada chamada da função como a etapa `nome`
+
+    Args:
+        nome (str): o nome da etapa
+        contar (callable, optional): recebe os mesmos argumentos da função e devolve (frases, tokens);
+                                     só é chamado com a medição ligada
+    """
+    def decorador(funcao):
+        @functools.wraps(funcao)
+        def medida(*args, **kwargs):
+            if not instrumentacao.ativa:
+                return funcao(*args, **kwargs)
+            frases, tokens = contar(*args, **kwargs) if contar else (0, 0)
+            with _Etapa(instrumentacao, nome, frases, tokens):
+                return funcao(*args, **kwargs)
+        return medida
+    return decorador
+
+def ativar_instrumentacao(limpar=True):
+    """liga a medição das etapas (por defeito a começar do zero)"""
+    if limpar:
+        instrumentacao.limpar()
+    instrumentacao.ativa = True
+
+def desativar_instrumentacao():
+    instrumentacao.ativa = False
@@ -0,0 +1,109 @@
+# este módulo escreve o relatório html "paginado", usado para textos muito compridos
+# em vez de uma página com todas as frases, as frases vão para ficheiros .js pequenos (uma página cada)
+# e o html só tem as estatísticas e um visualizador que carrega e desenha a página que está a ser vista,
+# por isso o relatório abre logo, seja qual for o tamanho do documento
+
+# imports locais
+from defaults import english as st, html_report as cfg_relatorio
+
+# bibliotecas gerais
+import os  # para os caminhos das páginas
+import json  # para escrever as frases de cada página
+import shutil  # para apagar as páginas de um relatório que não chegou ao fim
+
+class EscritorRelatorioPaginado:
+    """
+    vai escrevendo as frases em páginas à medida que chegam (não precisa da lista toda em memória)
+    e no fim escreve o html com as estatísticas e o visualizador
+
+    Attributes:
+        output_path (str): o ficheiro html do relatório
+        pasta (str): a pasta com as páginas (ao lado do html, com o mesmo nome e o sufixo "_pages")
+        frases_por_pagina (int): quantas frases vão para cada página
+        num_paginas (int): quantas páginas já foram escritas
+    """
+    def __init__(self, output_path, frases_por_pagina=None):
+        self.output_path = output_path
+        self.pasta = f"{os.path.splitext(output_path)[0]}_pages"
+        self.frases_por_pagina = frases_por_pagina or cfg_relatorio["sentences_per_page"]
+        self.num_paginas = 0
+        self.paleta = []  # as cores usadas; cada frase guarda só o índice da cor, para as páginas serem mais pequenas
+        self._indices_cores = {}
+        self._pagina = []
+        os.makedirs(self.pasta, exist_ok=True)
+
+    def adicionar(self, info):
+        """junta uma frase (dicionário com frase e cor) à página atual e grava a página quando fica cheia"""
+        cor = info["cor"]
+        indice = self._indices_cores.get(cor)
+        if indice is None:
+            indice = self._indices_cores[cor] = len(self.paleta)
+            self.paleta.append(cor)
+        self._pagina.append((info["frase"], indice))
+        if len(self._pagina) >= self.frases_por_pagina:
+            self._gravar_pagina()
+
+    def _gravar_pagina(self):
+        self.num_paginas += 1
+        caminho = os.path.join(self.pasta, f"page_{self.num_paginas:05d}.js")
+        dados = json.dumps(self._pagina, ensure_ascii=False, separators=(",", ":"))
+        with open(caminho, "w", encoding="utf-8") as f:
+            f.write(f"PsyText.registarPagina({self.num_paginas}, {dados});\n")
+        self._pagina = []
+
+    def _apagar_paginas_antigas(self):
+        """apaga páginas que sobraram de um relatório anterior mais comprido com o mesmo nome"""
+        for nome in os.listdir(self.pasta):
+            if nome.startswith("page_") and nome.endswith(".js"):
+                try:
+                    numero = int(nome[5:-3])
+                except ValueError:
+                    continue
+                if numero > self.num_paginas:
+                    os.remove(os.path.join(self.pasta, nome))
+
+    def fechar(self, estatisticas_gerais=None):
+        """
+        grava a última página e escreve o html do relatório
+
+        Args:
+            estatisticas_gerais (dict, optional): as estatísticas, mostradas no início do relatório
+        """
+        from psytext import _carregar_template, _escrever_template
+        if self._pagina or self.num_paginas == 0:
+            self._gravar_pagina()  # há sempre pelo menos uma página, mesmo que vazia
+        self._apagar_paginas_antigas()
+        context = {
+            "estatisticas_gerais": estatisticas_gerais,
+            "st": st,
+            "num_paginas": self.num_paginas,
+            "pasta_paginas": os.path.basename(self.pasta),  # relativo ao html
+            "paleta": self.paleta,
+        }
+        _escrever_template(_carregar_template("template_paginado.html"), context, self.output_path)
+
+    def descartar(self):
+        """
+        apaga o que já foi escrito, quando o relatório não vai chegar ao fim (ex: a análise foi cancelada):
+        a pasta das páginas e o html com o mesmo nome, que de outro modo mostraria páginas de outra análise
+        """
+        self._pagina = []
+        shutil.rmtree(self.pasta, ignore_errors=True)
+        if os.path.exists(self.output_path):
+            os.remove(self.output_path)
+
+def gerar_relatorio_paginado(frases_info, output_path, estatisticas_gerais=None, frases_por_pagina=None):
+    """
+    escreve o relatório paginado de uma lista de frases já analisadas
+
+    Args:
+        frases_info (iterable): os dicionários de cada frase (frase, valence, arousal, cor)
+        output_path (str): o ficheiro html
+        estatisticas_gerais (dict, optional): as estatísticas do texto
+        frases_por_pagina (int, optional): por defeito, o valor de defaults.html_report
+    """
+    escritor = EscritorRelatorioPaginado(output_path, frases_por_pagina)
+    for info in frases_info:
+        escritor.adicionar(info)
+    escritor.fechar(estatisticas_gerais)
+    return escritor.num_paginas
@@ -0,0 +1,117 @@
+# este módulo tem o contentor dos resultados das frases, guardado em colunas em vez de uma lista de dicionários:
+# a valência e o arousal em arrays de floats, a cor num código de um byte e, quando o texto original é conhecido,
+# só as posições de cada frase no texto (a frase é cortada do texto quando é pedida)
+# por fora continua a parecer uma lista de dicionários (frase, valence, arousal, cor), por isso o template,
+# a interface e as exportações não mudam; por dentro as estatísticas podem ser calculadas de forma vetorizada (ver acumulador.py)
+
+from array import array  # arrays tipados da biblioteca padrão (8 bytes por float, 1 byte por código de cor)
+from collections.abc import Sequence  # para o contentor se comportar como uma lista só de leitura
+
+class FrasesAnalisadas(Sequence):
+    """
+    os resultados das frases de um texto, em colunas
+
+    Attributes:
+        texto (str | None): o texto original; se existir, as frases são guardadas só como posições nele
+        valence (array): a valência (compound) de cada frase
+        arousal (array): o arousal de cada frase
+        codigos_cor (array): o índice da cor de cada frase em `paleta`
+        paleta (list): os nomes das cores, pela ordem em que apareceram
+    """
+    __slots__ = ("texto", "valence", "arousal", "codigos_cor", "paleta", "_indices_cores", "_inicios", "_fins", "_frases")
+
+    def __init__(self, texto=None):
+        self.texto = texto
+        self.valence = array("d")
+        self.arousal = array("d")
+        self.codigos_cor = array("B")
+        self.paleta = []
+        self._indices_cores = {}
+        self._inicios = array("q")  # usados quando há texto
+        self._fins = array("q")
+        self._frases = []  # usado quando não há texto (ex: frases que chegam em fluxo)
+
+    def adicionar(self, frase, valence, arousal, cor, inicio=None):
+        """
+        junta uma frase
+
+        Args:
+            frase (str): a frase (já sem espaços nas pontas)
+            valence (float): a valência
+            arousal (float): o arousal
+            cor (str): o nome da cor
+            inicio (int, optional): a posição da frase no texto original (obrigatória se o contentor tiver o texto)
+        """
+        codigo = self._indices_cores.get(cor)
+        if codigo is None:
+            codigo = self._indices_cores[cor] = len(self.paleta)
+            self.paleta.append(cor)
+        self.valence.append(valence)
+        self.arousal.append(arousal)
+        self.codigos_cor.append(codigo)
+        if self.texto is not None:
+            self._inicios.append(inicio)
+            self._fins.append(inicio + len(frase))
+        else:
+            self._frases.append(frase)
+
+    def estender(self, outras, deslocamento=0):
+        """
+        junta no fim as frases de outro contentor, por exemplo o de um fragmento do mesmo texto
+
+        Args:
+            outras (FrasesAnalisadas): as frases a juntar
+            deslocamento (int, optional): a posição no texto deste contentor onde começa o texto de `outras`
+        """
+        if (self.texto is None) != (outras.texto is None):
+            raise ValueError("both containers must either keep the original text or not")
+        # os códigos de cor do outro contentor são traduzidos para os índices da paleta deste
+        traducao = bytes(self._indices_cores.setdefault(cor, len(self._indices_cores)) for cor in outras.paleta)
+        self.paleta = list(self._indices_cores)
+        self.valence.extend(outras.valence)
+        self.arousal.extend(outras.arousal)
+        self.codigos_cor.frombytes(outras.codigos_cor.tobytes().translate(traducao.ljust(256, b"\0")))
+        if self.texto is not None:
+            self._inicios.extend(inicio + deslocamento for inicio in outras._inicios)
+            self._fins.extend(fim + deslocamento for fim in outras._fins)
+        else:
+            self._frases.extend(outras.frase(i) for i in range(len(outras)))
+
+    def frase(self, i):
+        """o texto da frase i"""
+        if self.texto is None:
+            return self._frases[i]
+        return self.texto[self._inicios[i]:self._fins[i]]
+
+    def __len__(self):
+        return len(self.valence)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("sentence index out of range")
+        return {"frase": self.frase(i), "valence": self.valence[i], "arousal": self.arousal[i],
+                "cor": self.paleta[self.codigos_cor[i]]}
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def __repr__(self):
+        return f"FrasesAnalisadas({len(self)} sentences)"
+
+    @property
+    def cores(self):
+        """o nome da cor de cada frase"""
+        paleta = self.paleta
+        return [paleta[codigo] for codigo in self.codigos_cor]
+
+    def colunas_numpy(self):
+        """a valência e o arousal como arrays numpy, sem copiar os dados"""
+        import numpy as np
+        if not len(self):
+            return np.zeros(0), np.zeros(0)
+        return np.frombuffer(self.valence, dtype=float), np.frombuffer(self.arousal, dtype=float)
@@ -0,0 +1,409 @@
+# este módulo é um serviço http local: um processo que fica a correr, com o VADER e o tokenizador punkt
+# já carregados numa pool de workers, para outros programas não terem de pagar o arranque do nltk em cada análise
+# os pedidos pequenos que chegam quase ao mesmo tempo são juntados num lote (micro-batching) no ciclo do asyncio
+# e cada lote vai de uma vez para um worker: menos idas e voltas entre processos e uma só consulta à cache de frases
+#
+# pedidos (json no corpo, respostas em json):
+#   GET  /health      -> estado do serviço, workers e quantos pedidos e lotes já foram tratados
+#   POST /analyze     {"text": "...", "sentences": true, "base_filename": "nome"}
+#                     -> {"statistics": {...}, "sentences": [...]} (as mesmas do psytext.analisar_texto);
+#                        com "base_filename" também escreve o html, o affect grid e o json na pasta de saída
+#   POST /sentences   {"text": "..."} ou {"sentences": ["...", "..."]}
+#                     -> {"sentences": [{"frase", "valence", "arousal", "cor"}, ...]}
+#
+# uso: python servico.py [--port 8765] [--workers 2]   (só escuta em 127.0.0.1, ver defaults.service)
+
+# imports locais
+from defaults import paths as ph, service as cfg_servico, logs as cfg_registo
+from registo import obter_logger, configurar_registo
+
+# bibliotecas gerais
+import os  # para o número de cores e os nomes dos ficheiros de saída
+import sys  # para o código de saída
+import re  # para validar os nomes dos ficheiros de saída
+import json  # para os pedidos e as respostas
+import asyncio  # para o servidor e o micro-batching
+import argparse  # para os argumentos da linha de comandos
+import socket  # para resolver o nome do host antes de arrancar
+import ipaddress  # para avisar quando o serviço não fica só nesta máquina
+import multiprocessing  # para o contexto "spawn" da pool
+import concurrent.futures  # para a pool de workers
+
+log = obter_logger(__name__)
+
+# o psytext é importado em cada worker (ver _inicializar_worker) e não aqui, como no batch
+psytext = None
+
+_NOME_VALIDO = re.compile(r"[\w-][\w.-]{0,99}")  # nomes base das saídas: sem pastas nem caminhos
+_ESTADOS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 411: "Length Required",
+            413: "Payload Too Large", 500: "Internal Server Error", 503: "Service Unavailable"}
+
+class PedidoInvalido(Exception):
+    """um pedido que não pode ser tratado (devolvido ao cliente com o código http)"""
+    def __init__(self, mensagem, estado=400):
+        super().__init__(mensagem)
+        self.estado = estado
+
+def _inicializar_worker(output_dir, usar_cache=True, nivel_registo=None):
+    """corre uma vez em cada processo da pool: carrega o VADER e o punkt, que ficam quentes para todos os pedidos"""
+    global psytext
+    configurar_registo(nivel_registo)
+    ph["output_dir"] = output_dir
+    import psytext as _psytext
+    psytext = _psytext
+    if not usar_cache:
+        psytext.desativar_cache_frases()
+    psytext.obter_analisador()
+    psytext.construir_documento("Warm up.")  # carrega também o tokenizador das frases
+
+def _aquecer():
+    """não faz nada: só obriga a pool a arrancar um worker (que corre o _inicializar_worker)"""
+    return os.getpid()
+
+def _pontuar_lote_frases(pedidos):
+    """
+    pontua as frases de vários pedidos /sentences de uma vez (uma só consulta à cache e uma só passagem pelo VADER)
+
+    Returns:
+        list: para cada pedido, a lista de frases pontuadas
+    """
+    por_pedido = []
+    for pedido in pedidos:
+        frases = pedido["sentences"] if "sentences" in pedido else psytext.construir_documento(pedido["text"]).frases
+        por_pedido.append([frase.strip() for frase in frases if frase.strip()])
+    pontuacoes = iter(psytext._pontuar_frases([frase for frases in por_pedido for frase in frases]))
+    resultados = []
+    for frases in por_pedido:
+        resultados.append([{"frase": frase, "valence": p[0], "arousal": p[1], "cor": p[2]}
+                           for frase, p in zip(frases, pontuacoes) if p is not None])
+    return resultados
+
+def _analisar(pedido):
+    """analisa um texto inteiro (pedido /analyze)"""
+    if pedido.get("base_filename"):
+        html, estatisticas, frases_info = psytext.analisar_texto(pedido["text"], base_filename=pedido["base_filename"],
+                                                                 processos=1)
+        resultado = {"statistics": estatisticas, "html": html}
+    else:
+        frases_info, acumulador = psytext.analisar_sem_saidas(pedido["text"], processos=1)
+        resultado = {"statistics": acumulador.para_dict()}
+    if pedido.get("sentences", True):
+        resultado["sentences"] = list(frases_info or [])
+    return resultado
+
+def _processar_lote(lote):
+    """
+    trata um lote de pedidos dentro de um worker; o erro de um pedido não estraga os outros
+
+    Args:
+        lote (list): (tipo, pedido) de cada pedido, com tipo "analyze" ou "sentences"
+
+    Returns:
+        list: (True, resposta) ou (False, mensagem de erro) de cada pedido, pela mesma ordem
+    """
+    respostas = [None] * len(lote)
+    frases = [i for i, (tipo, _) in enumerate(lote) if tipo == "sentences"]
+    if frases:
+        try:
+            for i, resultado in zip(frases, _pontuar_lote_frases([lote[i][1] for i in frases])):
+                respostas[i] = (True, {"sentences": resultado})
+        except Exception as e:
+            log.error(f"Error scoring a batch of {len(frases)} requests: {e}")
+            for i in frases:
+                respostas[i] = (False, str(e))
+    for i, (tipo, pedido) in enumerate(lote):
+        if tipo == "analyze":
+            try:
+                respostas[i] = (True, _analisar(pedido))
+            except Exception as e:
+                log.error(f"Error analyzing a text of {len(pedido['text'])} characters: {e}")
+                respostas[i] = (False, str(e))
+    return respostas
+
+class LoteadorPedidos:
+    """
+    junta os pedidos que chegam quase ao mesmo tempo em lotes e envia cada lote para a pool de workers
+    há no máximo um lote a correr por worker: enquanto estão todos ocupados os pedidos novos ficam na fila
+    e vão no lote seguinte, por isso os lotes crescem sozinhos quando há muitos pedidos
+
+    Attributes:
+        pedidos (int): pedidos tratados até agora
+        lotes (int): lotes enviados até agora
+    """
+    def __init__(self, executor, lotes_em_curso, max_lote=None, espera_ms=None):
+        self._executor = executor
+        self._max_lote = max_lote or cfg_servico["batch_max"]
+        self._espera = (cfg_servico["batch_wait_ms"] if espera_ms is None else espera_ms) / 1000
+        self._vagas = asyncio.Semaphore(lotes_em_curso)
+        self._fila = asyncio.Queue()
+        self._tarefas = set()  # os lotes a correr (guardados para não serem apagados antes de acabarem)
+        self._ciclo = None
+        self.pedidos = 0
+        self.lotes = 0
+
+    def iniciar(self):
+        self._ciclo = asyncio.create_task(self._juntar_lotes())
+
+    async def parar(self):
+        if self._ciclo:
+            self._ciclo.cancel()
+            await asyncio.gather(self._ciclo, *self._tarefas, return_exceptions=True)
+
+    async def pedir(self, tipo, pedido):
+        """põe um pedido na fila e espera pela sua resposta"""
+        futuro = asyncio.get_running_loop().create_future()
+        await self._fila.put(((tipo, pedido), futuro))
+        return await futuro
+
+    async def _juntar_lotes(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            await self._vagas.acquire()  # espera por um worker livre antes de fechar o lote seguinte
+            lote = [await self._fila.get()]
+            prazo = loop.time() + self._espera
+            while len(lote) < self._max_lote:
+                try:
+                    lote.append(self._fila.get_nowait())
+                    continue
+                except asyncio.QueueEmpty:
+                    pass
+                restante = prazo - loop.time()
+                if restante <= 0:
+                    break
+                try:
+                    lote.append(await asyncio.wait_for(self._fila.get(), restante))
+                except asyncio.TimeoutError:
+                    break
+            tarefa = asyncio.create_task(self._executar(lote))
+            self._tarefas.add(tarefa)
+            tarefa.add_done_callback(self._tarefas.discard)
+
+    async def _executar(self, lote):
+        try:
+            self.pedidos += len(lote)
+            self.lotes += 1
+            respostas = await asyncio.get_running_loop().run_in_executor(
+                self._executor, _processar_lote, [pedido for pedido, _ in lote])
+            for (_, futuro), (ok, valor) in zip(lote, respostas):
+                if futuro.done():
+                    continue  # o cliente já desistiu
+                if ok:
+                    futuro.set_result(valor)
+                else:
+                    futuro.set_exception(PedidoInvalido(valor, estado=500))
+        except Exception as e:  # ex: um worker morreu e a pool ficou partida
+            log.error(f"Error running a batch of {len(lote)} requests: {e}")
+            for _, futuro in lote:
+                if not futuro.done():
+                    futuro.set_exception(PedidoInvalido(str(e), estado=503))
+        finally:
+            self._vagas.release()
+
+def host_local(host):
+    """
+    diz se todos os endereços de um host (nome ou ip) são desta máquina
+
+    Raises:
+        ValueError: se o nome não puder ser resolvido
+    """
+    try:
+        enderecos = socket.getaddrinfo(host, None, proto=socket.IPPROTO_TCP)
+    except socket.gaierror as e:
+        raise ValueError(f"cannot resolve host {host!r}: {e}") from None
+    # o endereço pode trazer a zona do ipv6 (ex: "fe80::1%eth0"), que o ipaddress não aceita
+    return all(ipaddress.ip_address(endereco[4][0].split("%")[0]).is_loopback for endereco in enderecos)
+
+class ServicoAnalise:
+    """
+    o serviço http: um servidor asyncio à frente de uma pool de workers com o psytext já carregado
+
+        servico = ServicoAnalise(port=0)
+        await servico.iniciar()  # depois disto servico.port tem a porta escolhida
+        ...
+        await servico.parar()
+    """
+    def __init__(self, host=None, port=None, workers=None, max_lote=None, espera_ms=None, usar_cache=True,
+                 output_dir=None, nivel_registo=None):
+        self.host = host or cfg_servico["host"]
+        self.port = cfg_servico["port"] if port is None else port
+        self.workers = max(1, workers or cfg_servico["workers"] or os.cpu_count() or 1)
+        self._max_lote = max_lote
+        self._espera_ms = espera_ms
+        self._usar_cache = usar_cache
+        self._output_dir = output_dir or ph["output_dir"]
+        self._nivel_registo = nivel_registo
+        self._executor = None
+        self._loteador = None
+        self._servidor = None
+
+    async def iniciar(self):
+        """arranca os workers (e espera que fiquem todos quentes) e começa a aceitar ligações"""
+        if not host_local(self.host):
+            log.warning(f"The service is listening on {self.host}: it has no authentication, keep it on a trusted network.")
+        loop = asyncio.get_running_loop()
+        self._executor = concurrent.futures.ProcessPoolExecutor(
+            max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"),
+            initializer=_inicializar_worker, initargs=(self._output_dir, self._usar_cache, self._nivel_registo))
+        log.info(f"Starting {self.workers} warm analysis workers...")
+        await asyncio.gather(*(loop.run_in_executor(self._executor, _aquecer) for _ in range(self.workers)))
+        self._loteador = LoteadorPedidos(self._executor, self.workers, self._max_lote, self._espera_ms)
+        self._loteador.iniciar()
+        self._servidor = await asyncio.start_server(self._tratar_ligacao, self.host, self.port)
+        self.port = self._servidor.sockets[0].getsockname()[1]
+        log.info(f"PsyText service listening on http://{self.host}:{self.port}")
+
+    async def parar(self):
+        if self._servidor:
+            self._servidor.close()
+            await self._servidor.wait_closed()
+        if self._loteador:
+            await self._loteador.parar()
+        if self._executor:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+
+    async def servir(self):
+        """arranca e fica a servir até ser interrompido"""
+        await self.iniciar()
+        try:
+            await self._servidor.serve_forever()
+        finally:
+            await self.parar()
+
+    def estado(self):
+        return {"status": "ok", "workers": self.workers, "requests": self._loteador.pedidos,
+                "batches": self._loteador.lotes}
+
+    async def _tratar_ligacao(self, reader, writer):
+        """lê os pedidos http de uma ligação (com keep-alive) e escreve as respostas"""
+        try:
+            while True:
+                linha = await reader.readline()
+                if not linha.strip():
+                    break
+                manter = False
+                try:
+                    metodo, caminho, versao = linha.decode("latin-1").split()
+                    cabecalhos = {}
+                    while True:
+                        linha = await reader.readline()
+                        if linha in (b"\r\n", b"\n", b""):
+                            break
+                        nome, _, valor = linha.decode("latin-1").partition(":")
+                        cabecalhos[nome.strip().lower()] = valor.strip()
+                    manter = versao == "HTTP/1.1" and cabecalhos.get("connection", "").lower() != "close"
+                    corpo = await self._ler_corpo(reader, cabecalhos)
+                    estado, resposta = 200, await self._encaminhar(metodo, caminho.split("?", 1)[0], corpo)
+                except PedidoInvalido as e:
+                    estado, resposta = e.estado, {"error": str(e)}
+                    manter = manter and estado < 500 and estado != 413
+                except ValueError:
+                    estado, resposta, manter = 400, {"error": "malformed HTTP request"}, False
+                await self._responder(writer, estado, resposta, manter)
+                if not manter:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass  # o cliente fechou a ligação a meio
+        finally:
+            writer.close()
+
+    async def _ler_corpo(self, reader, cabecalhos):
+        if "transfer-encoding" in cabecalhos:
+            raise PedidoInvalido("chunked request bodies are not supported, send a Content-Length", estado=411)
+        tamanho = int(cabecalhos.get("content-length") or 0)
+        if tamanho > cfg_servico["max_body_bytes"]:
+            raise PedidoInvalido(f"request body larger than {cfg_servico['max_body_bytes']} bytes", estado=413)
+        return await reader.readexactly(tamanho) if tamanho else b""
+
+    async def _encaminhar(self, metodo, caminho, corpo):
+        if caminho == "/health":
+            if metodo != "GET":
+                raise PedidoInvalido("use GET", estado=405)
+            return self.estado()
+        if caminho not in ("/analyze", "/sentences"):
+            raise PedidoInvalido(f"unknown path: {caminho}", estado=404)
+        if metodo != "POST":
+            raise PedidoInvalido("use POST with a JSON body", estado=405)
+        tipo = caminho[1:]
+        return await self._loteador.pedir(tipo, _validar_pedido(tipo, corpo))
+
+    async def _responder(self, writer, estado, resposta, manter):
+        corpo = json.dumps(resposta, ensure_ascii=False).encode("utf-8")
+        cabecalho = (f"HTTP/1.1 {estado} {_ESTADOS.get(estado, '')}\r\n"
+                     "Content-Type: application/json; charset=utf-8\r\n"
+                     f"Content-Length: {len(corpo)}\r\n"
+                     f"Connection: {'keep-alive' if manter else 'close'}\r\n\r\n")
+        writer.write(cabecalho.encode("latin-1") + corpo)
+        await writer.drain()
+
+def _validar_pedido(tipo, corpo):
+    """lê o json de um pedido e verifica os campos, antes de ele entrar num lote"""
+    try:
+        pedido = json.loads(corpo or b"null")
+    except (UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise PedidoInvalido(f"invalid JSON: {e}")
+    if not isinstance(pedido, dict):
+        raise PedidoInvalido('the body must be a JSON object, e.g. {"text": "..."}')
+    if tipo == "sentences" and "sentences" in pedido:
+        frases = pedido["sentences"]
+        if not isinstance(frases, list) or not all(isinstance(frase, str) for frase in frases):
+            raise PedidoInvalido('"sentences" must be a list of strings')
+        return {"sentences": frases}
+    if not isinstance(pedido.get("text"), str):
+        raise PedidoInvalido('missing "text" (a string)')
+    if tipo == "sentences":
+        return {"text": pedido["text"]}
+    nome = pedido.get("base_filename")
+    if nome is not None and (not isinstance(nome, str) or not _NOME_VALIDO.fullmatch(nome)):
+        raise PedidoInvalido('"base_filename" must be a plain file name (letters, digits, "_", "-" and ".")')
+    incluir_frases = pedido.get("sentences", True)
+    if not isinstance(incluir_frases, bool):
+        raise PedidoInvalido('"sentences" must be true or false')
+    return {"text": pedido["text"], "sentences": incluir_frases, "base_filename": nome}
+
+def pedir(caminho, dados=None, host=None, port=None, timeout=60):
+    """
+    faz um pedido ao serviço (ex: pedir("/analyze", {"text": "I am happy."}))
+
+    Args:
+        caminho (str): "/analyze", "/sentences" ou "/health"
+        dados (dict, optional): o corpo do pedido; sem ele é feito um GET
+        host (str, optional): por defeito defaults.service["host"]
+        port (int, optional): por defeito defaults.service["port"]
+        timeout (float, optional): segundos à espera da resposta
+
+    Returns:
+        dict: a resposta do serviço (os erros http são lançados como urllib.error.HTTPError)
+    """
+    import urllib.request
+    url = f"http://{host or cfg_servico['host']}:{port or cfg_servico['port']}{caminho}"
+    corpo = None if dados is None else json.dumps(dados).encode("utf-8")
+    pedido = urllib.request.Request(url, data=corpo, headers={"Content-Type": "application/json"})
+    with urllib.request.urlopen(pedido, timeout=timeout) as resposta:
+        return json.loads(resposta.read().decode("utf-8"))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run PsyText as a local HTTP analysis service with warm workers.")
+    parser.add_argument("--host", default=cfg_servico["host"], help="address to listen on (default: %(default)s, this machine only)")
+    parser.add_argument("--port", type=int, default=cfg_servico["port"], help="port to listen on (default: %(default)s)")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="number of worker processes (default: number of cores)")
+    parser.add_argument("--batch-max", type=int, default=cfg_servico["batch_max"], help="most requests in one batch (default: %(default)s)")
+    parser.add_argument("--batch-wait-ms", type=float, default=cfg_servico["batch_wait_ms"],
+                        help="how long the first request of a batch waits for others (default: %(default)s)")
+    parser.add_argument("-o", "--output-dir", default=ph["output_dir"], help="directory for the outputs of requests with a base_filename")
+    parser.add_argument("--no-cache", action="store_true", help="do not use the persistent sentence cache")
+    parser.add_argument("--log-level", default=None, help="message level: DEBUG, INFO, WARNING or ERROR (default: %s)" % cfg_registo["level"])
+    args = parser.parse_args(argv)
+    configurar_registo(args.log_level)
+    servico = ServicoAnalise(args.host, args.port, args.workers, args.batch_max, args.batch_wait_ms,
+                             usar_cache=not args.no_cache, output_dir=args.output_dir, nivel_registo=args.log_level)
+    try:
+        asyncio.run(servico.servir())
+    except KeyboardInterrupt:
+        log.info("PsyText service stopped.")
+    except (ValueError, OSError) as e:  # host que não existe, porta ocupada, ...
+        log.error(f"Could not start the PsyText service: {e}")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,76 @@
+# este script mede quanto tempo demora a importar os módulos do psytext, cada um num processo python novo,
+# e compara com o orçamento definido em defaults.import_budget
+# também falha se algum módulo pesado (nltk, matplotlib, ...) for importado logo no arranque
+#
+# uso: python tempo_importacao.py   (sai com código 1 se o orçamento for ultrapassado)
+
+# imports locais
+from defaults import import_budget
+
+# bibliotecas gerais
+import os  # para a pasta do script
+import sys  # para o executável do python e o código de saída
+import json  # para receber as medições do processo filho
+import statistics  # para a mediana
+import subprocess  # para medir cada importação num processo novo (sem caches de módulos)
+
+# código corrido no processo filho: importa o módulo e devolve o tempo e os módulos pesados que ficaram carregados
+_CODIGO_MEDICAO = """
+import json, sys, time
+inicio = time.perf_counter()
+import {modulo}
+decorrido = time.perf_counter() - inicio
+pesados = [m for m in {pesados!r} if m in sys.modules]
+print(json.dumps({{"segundos": decorrido, "pesados": pesados}}))
+"""
+
+def medir_importacao(modulo, pesados, execucoes=5):
+    """
+    importa o módulo várias vezes, sempre num processo novo
+
+    Args:
+        modulo (str): nome do módulo a importar
+        pesados (list): nomes dos módulos que não podem ficar carregados depois da importação
+        execucoes (int, optional): quantas vezes medir
+
+    Returns:
+        dict: mediana dos tempos (segundos) e os módulos pesados que foram importados
+    """
+    pasta = os.path.dirname(os.path.abspath(__file__))
+    codigo = _CODIGO_MEDICAO.format(modulo=modulo, pesados=list(pesados))
+    tempos = []
+    pesados_carregados = set()
+    for _ in range(execucoes):
+        saida = subprocess.run([sys.executable, "-c", codigo], cwd=pasta, capture_output=True, text=True, check=True)
+        # a medição é a última linha (o módulo pode escrever outras coisas antes)
+        medicao = json.loads(saida.stdout.strip().splitlines()[-1])
+        tempos.append(medicao["segundos"])
+        pesados_carregados.update(medicao["pesados"])
+    return {"segundos": statistics.median(tempos), "pesados": sorted(pesados_carregados)}
+
+def verificar_orcamento(orcamento=import_budget):
+    """
+    mede todos os módulos do orçamento e mostra o resultado
+
+    Returns:
+        bool: True se todos os módulos cumprirem o orçamento
+    """
+    tudo_ok = True
+    for modulo, limite in orcamento["modules"].items():
+        try:
+            medicao = medir_importacao(modulo, orcamento["heavy_modules"], orcamento.get("runs", 5))
+        except subprocess.CalledProcessError as e:
+            print(f"{modulo}: import failed\n{e.stderr}")
+            tudo_ok = False
+            continue
+        ok = medicao["segundos"] <= limite and not medicao["pesados"]
+        tudo_ok = tudo_ok and ok
+        estado = "OK" if ok else "OVER BUDGET"
+        print(f"{modulo}: {medicao['segundos'] * 1000:.1f} ms (budget {limite * 1000:.0f} ms) {estado}")
+        if medicao["pesados"]:
+            print(f"  heavy modules loaded at import: {', '.join(medicao['pesados'])}")
+    return tudo_ok
+
+# condição principal
+if __name__ == "__main__":
+    sys.exit(0 if verificar_orcamento() else 1)
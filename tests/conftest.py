@@ -0,0 +1,30 @@
+# os módulos do psytext estão em src/ e importam-se uns aos outros pelo nome (ex: from defaults import ...)
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+import pytest
+
+
+@pytest.fixture(scope="session", autouse=True)
+def _sem_cache_de_frases():
+    """os testes pontuam sempre com o VADER e não escrevem na cache persistente das frases"""
+    import psytext
+    psytext.desativar_cache_frases()
+    yield
+
+
+TEXTO = (
+    "I love this little town. The people are kind and the coffee is great! "
+    "But the winters are long, dark and cold. Nobody wants to stay here after October. "
+    "We tried to fight for the old library and failed. It felt like a dead end. "
+    "Still, I am hoping things get better. My sister says I am too optimistic. "
+    "They laughed when I said I would stay. Honestly, I can't stand the noise at night. "
+    "Is it pointless? Maybe. But it is home, and home is not nothing."
+)
+
+
+@pytest.fixture
+def texto():
+    return TEXTO
@@ -0,0 +1,76 @@
+# testes do acumulador de estatísticas (acumulador.py): juntar bocados dá o mesmo que ver tudo de uma vez
+import random
+
+import pytest
+
+from acumulador import AcumuladorEstatisticas, MomentosWelford
+from documento import construir_documento, documento_de_frases
+
+
+def _comparar(a, b):
+    assert a.keys() == b.keys()
+    for chave in a:
+        if isinstance(a[chave], float):
+            assert a[chave] == pytest.approx(b[chave], rel=1e-9, abs=1e-12), chave
+        else:
+            assert a[chave] == b[chave], chave
+
+
+def test_momentos_juntados_iguais_aos_seguidos():
+    aleatorio = random.Random(7)
+    valores = [aleatorio.uniform(-1, 1) for _ in range(1000)]
+    seguidos = MomentosWelford()
+    for valor in valores:
+        seguidos.adicionar(valor)
+    juntados = MomentosWelford()
+    for inicio in range(0, len(valores), 137):
+        parte = MomentosWelford()
+        for valor in valores[inicio:inicio + 137]:
+            parte.adicionar(valor)
+        juntados.juntar(parte)
+    media = sum(valores) / len(valores)
+    assert juntados.n == seguidos.n == len(valores)
+    assert juntados.media == pytest.approx(media) == seguidos.media
+    assert juntados.variancia == pytest.approx(sum((v - media) ** 2 for v in valores) / len(valores))
+    assert juntados.variancia == pytest.approx(seguidos.variancia)
+
+
+def test_momentos_remover_desfaz_adicionar():
+    momentos = MomentosWelford()
+    for valor in (0.5, -0.2, 0.9, 0.1):
+        momentos.adicionar(valor)
+    momentos.remover(0.9)
+    assert momentos.n == 3
+    assert momentos.media == pytest.approx((0.5 - 0.2 + 0.1) / 3)
+
+
+def test_acumuladores_juntados_iguais_ao_calculo_seguido(texto):
+    import psytext
+    frases = [texto[inicio:fim] for inicio, fim in construir_documento(texto).spans]
+
+    seguido = AcumuladorEstatisticas()
+    documento = documento_de_frases(frases)
+    seguido.adicionar_frases(psytext._analisar_frases(documento))
+    seguido.adicionar_documento(documento)
+
+    juntado = AcumuladorEstatisticas()
+    for inicio in range(0, len(frases), 3):
+        parte = documento_de_frases(frases[inicio:inicio + 3])
+        acumulador = AcumuladorEstatisticas()
+        acumulador.adicionar_frases(psytext._analisar_frases(parte))
+        acumulador.adicionar_documento(parte)
+        juntado.juntar(acumulador)
+
+    _comparar(juntado.para_dict(), seguido.para_dict())
+
+
+def test_acumulador_igual_ao_analisar_sem_saidas(texto):
+    import psytext
+    _, acumulador = psytext.analisar_sem_saidas(texto, processos=1)
+    frases_info, _ = psytext.analisar_sem_saidas(texto, processos=1)
+    estatisticas = acumulador.para_dict()
+    valencias = [info["valence"] for info in frases_info]
+    assert estatisticas["num_frases"] == len(valencias)
+    assert estatisticas["media_valencia"] == pytest.approx(sum(valencias) / len(valencias))
+    assert estatisticas["cont_positivas"] == sum(v >= 0.05 for v in valencias)
+    assert estatisticas["cont_negativas"] == sum(v <= -0.05 for v in valencias)
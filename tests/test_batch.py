@@ -0,0 +1,80 @@
+# testes da análise de um corpus na linha de comandos (batch.py), com um corpus pequeno numa pasta temporária
+import json
+import os
+
+import pytest
+
+import batch
+
+TEXTOS = {
+    os.path.join("a", "x.txt"): "I love this place. The food is great and the people are kind.",
+    os.path.join("b", "x.txt"): "It was a terrible day. Nothing worked and everyone was angry!",
+    os.path.join("b", "sub", "y.txt"): "Is it raining? Maybe. We stayed home and read a book.",
+}
+
+
+@pytest.fixture
+def corpus(tmp_path):
+    pasta = tmp_path / "corpus"
+    for relativo, texto in TEXTOS.items():
+        caminho = pasta / relativo
+        caminho.parent.mkdir(parents=True, exist_ok=True)
+        caminho.write_text(texto, encoding="utf-8")
+    (pasta / "a" / "notes.md").write_text("Not a text file.", encoding="utf-8")
+    return pasta
+
+
+def test_recolher_ficheiros(corpus):
+    esperados = sorted(str(corpus / relativo) for relativo in TEXTOS)
+    assert batch.recolher_ficheiros([str(corpus)]) == esperados
+    # pastas, ficheiros e padrões glob juntam-se sem repetições
+    assert batch.recolher_ficheiros([str(corpus / "a"), str(corpus / "**" / "x.txt"), str(corpus / "a" / "x.txt")]) == \
+        [str(corpus / "a" / "x.txt"), str(corpus / "b" / "x.txt")]
+    assert batch.recolher_ficheiros([str(corpus / "nada")]) == []
+
+
+def test_nomes_base_unicos_com_nomes_repetidos(corpus):
+    nomes = batch.nomes_base_unicos(batch.recolher_ficheiros([str(corpus)]))
+    assert sorted(nomes.values()) == ["a__x", "b__sub__y", "b__x"]
+    assert batch.nomes_base_unicos([str(corpus / "a" / "x.txt")]) == {str(corpus / "a" / "x.txt"): "x"}
+
+
+def test_main_analisa_o_corpus(corpus, tmp_path):
+    import psytext
+    saida = tmp_path / "saida"
+    assert batch.main([str(corpus), "--workers", "1", "--no-cache", "-o", str(saida)]) == 0
+    for nome in ("a__x", "b__x", "b__sub__y"):
+        assert (saida / f"{nome}_emotions.html").is_file() and (saida / f"{nome}_analysis.json").is_file()
+    with open(saida / "corpus_summary.json", encoding="utf-8") as f:
+        resumo = json.load(f)
+    assert (saida / "corpus_summary.csv").is_file()
+    assert [os.path.relpath(r["ficheiro"], corpus) for r in resumo["ficheiros"]] == sorted(TEXTOS)
+    assert all(r["erro"] is None for r in resumo["ficheiros"])
+
+    # o resumo do corpus junta os acumuladores dos ficheiros: é o mesmo que analisar o corpus como um só texto
+    corpus_inteiro = "\n\n".join(TEXTOS[relativo] for relativo in sorted(TEXTOS))
+    _, acumulador = psytext.analisar_sem_saidas(corpus_inteiro, processos=1)
+    esperado = acumulador.para_dict()
+    assert resumo["corpus"]["num_ficheiros"] == resumo["corpus"]["num_ficheiros_ok"] == 3
+    for chave, valor in esperado.items():
+        assert resumo["corpus"][chave] == (pytest.approx(valor) if isinstance(valor, float) else valor), chave
+
+
+def test_main_sem_ficheiros_sai_com_1(tmp_path):
+    assert batch.main([str(tmp_path / "nada"), "-o", str(tmp_path / "saida")]) == 1
+
+
+def test_main_com_um_ficheiro_que_falha_sai_com_2(corpus, tmp_path):
+    (corpus / "vazio.txt").write_text("", encoding="utf-8")
+    saida = tmp_path / "saida"
+    assert batch.main([str(corpus), "--workers", "1", "--no-cache", "-o", str(saida)]) == 2
+    with open(saida / "corpus_summary.json", encoding="utf-8") as f:
+        resumo = json.load(f)
+    assert resumo["corpus"]["num_ficheiros_erro"] == 1
+    assert [r["erro"] for r in resumo["ficheiros"] if r["erro"]] == ["no sentences found"]
+
+
+def test_formato_desconhecido_recusado_na_linha_de_comandos(corpus, capsys):
+    with pytest.raises(SystemExit):
+        batch.main([str(corpus), "--formats", "json,parquett"])
+    assert "parquett" in capsys.readouterr().err
@@ -0,0 +1,85 @@
+# testes da cache persistente das pontuações das frases (cache_frases.py), sempre numa base de dados temporária
+import itertools
+
+import pytest
+
+import cache_frases
+from cache_frases import CacheFrases
+
+
+@pytest.fixture
+def relogio(monkeypatch):
+    """um relógio que avança uma unidade a cada leitura, para a ordem dos acessos não depender da resolução do sistema"""
+    contador = itertools.count(1)
+    monkeypatch.setattr(cache_frases.time, "time_ns", lambda: next(contador))
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = CacheFrases(str(tmp_path / "cache" / "frases.sqlite3"), "v1", max_entradas=3)
+    yield cache
+    cache.fechar()
+
+
+def _guardar(cache, *frases):
+    cache.guardar_muitos({cache.chave(frase): (0.5, 0.1, "green") for frase in frases})
+
+
+def test_acertos_e_falhas(cache):
+    chaves = [cache.chave(frase) for frase in ("Good.", "Bad.", "Good.")]
+    assert cache.obter_muitos(chaves) == {}
+    assert (cache.acertos, cache.falhas) == (0, 3)
+    _guardar(cache, "Good.")
+    assert cache.obter_muitos(chaves) == {cache.chave("Good."): (0.5, 0.1, "green")}
+    assert (cache.acertos, cache.falhas) == (2, 4)  # as frases repetidas contam uma vez cada
+    assert cache.estatisticas() == {"hits": 2, "misses": 4, "hit_rate": 2 / 6, "entries": 1}
+
+
+def test_lru_apaga_as_usadas_ha_mais_tempo(cache, relogio):
+    for frase in ("A.", "B.", "C."):
+        _guardar(cache, frase)
+    cache.obter_muitos([cache.chave("A.")])  # o A passa a ser o mais recente
+    _guardar(cache, "D.")
+    restantes = cache.obter_muitos([cache.chave(frase) for frase in ("A.", "B.", "C.", "D.")])
+    assert set(restantes) == {cache.chave("A."), cache.chave("C."), cache.chave("D.")}
+
+
+def test_cache_persiste_entre_ligacoes(cache, tmp_path):
+    _guardar(cache, "Kept.")
+    cache.fechar()
+    outra = CacheFrases(cache.caminho, "v1")
+    assert outra.obter_muitos([outra.chave("Kept.")]) == {outra.chave("Kept."): (0.5, 0.1, "green")}
+    outra.fechar()
+
+
+def test_chave_depende_da_versao_e_normaliza_espacos(cache):
+    assert cache.chave("I am  happy.\n") == cache.chave(" I am happy.")
+    assert cache.chave("I am HAPPY.") != cache.chave("I am happy.")  # as maiúsculas contam no VADER
+    _guardar(cache, "Old score.")
+    nova = CacheFrases(cache.caminho, "v2")
+    assert nova.chave("Old score.") != cache.chave("Old score.")
+    assert nova.obter_muitos([nova.chave("Old score.")]) == {}
+    nova.fechar()
+
+
+def test_versao_do_psytext_muda_com_as_expressoes(monkeypatch):
+    import expressoes
+    import psytext
+    monkeypatch.setattr(psytext, "_versao_lexico", None)
+    antes = psytext.versao_lexico()
+    monkeypatch.setattr(psytext, "_versao_lexico", None)
+    monkeypatch.setattr(expressoes, "VERSAO", expressoes.VERSAO + 1)
+    assert psytext.versao_lexico() != antes
+
+
+def test_psytext_usa_a_cache(tmp_path, texto):
+    import psytext
+    cache = psytext.ativar_cache_frases(str(tmp_path / "psytext.sqlite3"))
+    try:
+        primeira, _ = psytext.analisar_sem_saidas(texto, processos=1)
+        assert cache.acertos == 0 and cache.falhas == len(primeira)
+        segunda, _ = psytext.analisar_sem_saidas(texto, processos=1)
+        assert cache.acertos == len(primeira)
+        assert list(segunda) == list(primeira)
+    finally:
+        psytext.desativar_cache_frases()
@@ -0,0 +1,33 @@
+# testes do índice de categorias dos pronomes e das emoções (categorias.py)
+from categorias import IndiceCategorias, obter_indice
+from defaults import emotion_lexicons_en, pronoun_categories_en
+
+
+def _contar_ingenuo(lexicos, tokens):
+    """a contagem antiga: uma passagem pelos tokens por cada palavra de cada categoria"""
+    return {categoria: sum(tokens.count(palavra.lower()) for palavra in palavras)
+            for categoria, palavras in lexicos.items()}
+
+
+def test_contagem_igual_a_contagem_ingenua(texto):
+    from documento import construir_documento
+    tokens = construir_documento(texto + " We were happy, then sad and afraid; she was furious with them.").tokens
+    for lexicos in (pronoun_categories_en, emotion_lexicons_en):
+        assert IndiceCategorias(lexicos).contar(tokens) == _contar_ingenuo(lexicos, tokens)
+
+
+def test_palavras_em_varias_categorias_e_repetidas():
+    lexicos = {"a": ["It", "that"], "b": ["it", "it"], "c": []}
+    assert IndiceCategorias(lexicos).contar(["it", "that", "it", "other"]) == {"a": 3, "b": 4, "c": 0}
+
+
+def test_indice_construido_uma_vez():
+    assert obter_indice(pronoun_categories_en) is obter_indice(pronoun_categories_en)
+    assert obter_indice(dict(pronoun_categories_en)) is not obter_indice(pronoun_categories_en)
+
+
+def test_psytext_conta_pelo_indice(texto):
+    import psytext
+    from nltk.tokenize import word_tokenize
+    tokens = word_tokenize(texto.lower())
+    assert psytext.count_pronouns(texto, pronoun_categories_en) == _contar_ingenuo(pronoun_categories_en, tokens)
@@ -0,0 +1,24 @@
+# testes do documento tokenizado uma só vez (documento.py)
+from nltk.tokenize import sent_tokenize, word_tokenize
+
+from documento import construir_documento, documento_de_frases
+
+
+def test_documento_igual_ao_nltk(texto):
+    documento = construir_documento(texto)
+    assert documento.frases == sent_tokenize(texto)
+    assert [texto[inicio:fim] for inicio, fim in documento.spans] == documento.frases
+    assert documento.tokens == [token.lower() for token in word_tokenize(texto)]
+    assert documento.palavras == [token for token in documento.tokens if token.isalnum()]
+
+
+def test_documento_de_frases_igual_ao_do_texto(texto):
+    documento = construir_documento(texto)
+    das_frases = documento_de_frases(documento.frases)
+    assert das_frases.texto is None
+    assert das_frases.tokens_por_frase == documento.tokens_por_frase
+
+
+def test_texto_vazio():
+    documento = construir_documento("")
+    assert documento.num_frases == 0 and documento.tokens == [] and documento.palavras == []
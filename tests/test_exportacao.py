@@ -0,0 +1,86 @@
+# testes dos formatos compactos de exportação das frases (exportacao.py)
+import numpy as np
+import pytest
+
+import exportacao
+from exportacao import (EscritorColunas, EscritorJsonl, abrir_escritores, carregar_colunas, carregar_jsonl,
+                        exportar_frases)
+
+FRASES = [{"frase": f"Frase número {i} — ação! 😀" if i % 3 else f"Sentence {i}.",
+           "valence": round((i % 7 - 3) / 3.5, 4), "arousal": round(i / 10.0, 3),
+           "cor": ("green", "red", "gray", "yellow")[i % 4]} for i in range(10)]
+
+
+def _escrever(escritor, frases):
+    for info in frases:
+        escritor.escrever(info)
+    escritor.fechar()
+
+
+def test_jsonl_ida_e_volta(tmp_path):
+    caminho = str(tmp_path / "sub" / "frases.jsonl")
+    _escrever(EscritorJsonl(caminho), FRASES)
+    assert list(carregar_jsonl(caminho)) == FRASES
+
+
+@pytest.mark.parametrize("mmap", [True, False])
+@pytest.mark.parametrize("lote", [3, 4096])  # com vários lotes escritos aos bocados e com um só
+def test_colunas_ida_e_volta(tmp_path, monkeypatch, mmap, lote):
+    monkeypatch.setattr(EscritorColunas, "_LOTE", lote)
+    pasta = str(tmp_path / "colunas")
+    _escrever(EscritorColunas(pasta), FRASES)
+    colunas = carregar_colunas(pasta, mmap=mmap)
+    assert len(colunas) == len(FRASES)
+    assert list(colunas) == FRASES
+    assert colunas[-1] == FRASES[-1] and colunas.cor == [info["cor"] for info in FRASES]
+
+
+def test_cabecalho_npy_reescrito_no_fim(tmp_path):
+    # o cabeçalho é escrito com tamanho 0 e reescrito no fim: o numpy tem de o ler como um .npy normal
+    pasta = tmp_path / "colunas"
+    _escrever(EscritorColunas(str(pasta)), FRASES)
+    for nome, dtype, n in (("valence", "<f8", 10), ("arousal", "<f8", 10), ("color", "|u1", 10), ("offsets", "<i8", 11)):
+        with open(pasta / f"{nome}.npy", "rb") as f:
+            assert np.lib.format.read_magic(f) == (1, 0)
+            forma, fortran, tipo = np.lib.format.read_array_header_1_0(f)
+            assert (forma, fortran, tipo) == ((n,), False, np.dtype(dtype))
+            assert f.tell() % 64 == 0  # o início dos dados fica alinhado, como nos .npy do numpy
+    np.testing.assert_array_equal(np.load(pasta / "valence.npy"), [info["valence"] for info in FRASES])
+
+
+def test_colunas_vazias(tmp_path):
+    pasta = str(tmp_path / "vazia")
+    _escrever(EscritorColunas(pasta), [])
+    colunas = carregar_colunas(pasta)
+    assert len(colunas) == 0 and list(colunas) == []
+
+
+def test_exportar_frases_escreve_os_formatos_pedidos(tmp_path):
+    caminhos = exportar_frases(FRASES, str(tmp_path), "base", formatos=["json", "jsonl", "columns"])
+    assert set(caminhos) == {"jsonl", "columns"}  # o json com indentação é escrito pelo psytext
+    assert list(carregar_jsonl(caminhos["jsonl"])) == list(carregar_colunas(caminhos["columns"])) == FRASES
+
+
+def test_formato_desconhecido_e_recusado(tmp_path, monkeypatch):
+    with pytest.raises(ValueError, match="parquett"):
+        abrir_escritores(str(tmp_path), "base", ["jsonl", "parquett"])
+    monkeypatch.setitem(exportacao.cfg_exportacao, "formats", ["json", "colums"])
+    with pytest.raises(ValueError, match="colums"):
+        exportar_frases(FRASES, str(tmp_path), "base")
+    assert not list(tmp_path.iterdir())  # nada fica escrito a meio
+
+
+def test_analisar_texto_recusa_formato_desconhecido(tmp_path, monkeypatch, texto):
+    import psytext
+    monkeypatch.setitem(psytext.ph, "output_dir", str(tmp_path))
+    monkeypatch.setitem(exportacao.cfg_exportacao, "formats", ["json", "jsonlines"])
+    with pytest.raises(ValueError, match="jsonlines"):
+        psytext.analisar_texto(texto, base_filename="base")
+
+
+def test_parquet_ida_e_volta(tmp_path):
+    pytest.importorskip("pyarrow")
+    caminho = exportar_frases(FRASES, str(tmp_path), "base", formatos=["parquet"])["parquet"]
+    tabela = exportacao.carregar_parquet(caminho).to_pydict()
+    assert tabela["sentence"] == [info["frase"] for info in FRASES]
+    assert tabela["color"] == [info["cor"] for info in FRASES]
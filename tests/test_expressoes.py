@@ -0,0 +1,100 @@
+# testes das expressões de várias palavras (expressoes.py)
+import random
+
+import pytest
+
+from expressoes import IndiceExpressoes, AnalisadorComExpressoes
+
+
+@pytest.fixture(scope="module")
+def vader():
+    """o VADER do nltk, sem o índice de expressões, com o mesmo léxico personalizado do psytext"""
+    from nltk.sentiment import SentimentIntensityAnalyzer
+    import psytext
+    psytext.obter_analisador()  # garante os recursos do nltk
+    sia = SentimentIntensityAnalyzer()
+    sia.lexicon.update(psytext.custom_vader_lexicon)
+    return sia
+
+
+def test_aho_corasick_igual_a_procura_ingenua():
+    aleatorio = random.Random(3)
+    vocabulario = list("abcdefg")
+    expressoes = {" ".join(aleatorio.choices(vocabulario, k=aleatorio.randint(2, 4))) for _ in range(300)}
+    indice = IndiceExpressoes(expressoes)
+    for _ in range(300):
+        palavras = aleatorio.choices(vocabulario, k=30)
+        ingenua = sorted((i, i + len(e.split()), e) for e in expressoes for i in range(len(palavras))
+                         if palavras[i:i + len(e.split())] == e.split())
+        assert sorted(indice.procurar(palavras)) == ingenua
+
+
+def test_encontrar_escolhe_a_mais_comprida_sem_sobreposicoes():
+    indice = IndiceExpressoes(["dead end", "dead end road", "end road", "single"])
+    assert len(indice) == 3  # as de uma só palavra são ignoradas
+    assert indice.encontrar("a dead end road and a dead end".split()) == [(1, 4, "dead end road"), (6, 8, "dead end")]
+
+
+def test_frases_sem_expressoes_iguais_ao_vader(vader, texto):
+    from documento import construir_documento
+    analisador = AnalisadorComExpressoes(vader)
+    frases = [frase for frase in construir_documento(texto).frases
+              if "dead end" not in frase.lower() and "can't stand" not in frase.lower()]
+    frases += ["Kind of good, kind of bad.", "The food was GREAT!!!", "It was not very good at all, but ok :)",
+               "never so happy", "good good good bad", "least happy person", ""]
+    for frase in frases:
+        assert analisador.polarity_scores(frase) == vader.polarity_scores(frase), frase
+
+
+def test_muitas_frases_sem_expressoes_iguais_ao_vader(vader):
+    # frases aleatórias com as palavras que mexem nas regras do VADER (intensificadores, negações, "but", "kind of",
+    # maiúsculas, pontuação, emoticons e palavras repetidas): o ciclo copiado tem de dar sempre o mesmo que o do nltk
+    from nltk.sentiment.vader import SentiText
+    constantes = vader.constants
+    aleatorio = random.Random(7)
+    vocabulario = (aleatorio.sample(sorted(vader.lexicon), 400) + sorted(constantes.BOOSTER_DICT)
+                   + sorted(constantes.NEGATE) + ["but", "kind", "of", "least", "never", "so", "this", "without",
+                                                  "doubt", "the", "a", "is", "it", "dead", "end", "fed", "up"] * 3)
+    analisador = AnalisadorComExpressoes(vader)
+    comparadas = 0
+    for _ in range(5000):
+        palavras = [palavra.upper() if aleatorio.random() < 0.1 else palavra
+                    for palavra in aleatorio.choices(vocabulario, k=aleatorio.randint(1, 15))]
+        frase = " ".join(palavras) + aleatorio.choice(["", ".", "!", "!!!", "?", "?!", " :)", " :("])
+        palavras = SentiText(frase, constantes.PUNC_LIST, constantes.REGEX_REMOVE_PUNCTUATION).words_and_emoticons
+        if analisador.expressoes.encontrar([palavra.lower() for palavra in palavras]):
+            continue
+        assert analisador.polarity_scores(frase) == vader.polarity_scores(frase), frase
+        comparadas += 1
+    assert comparadas > 4000
+
+
+def test_emoticons_com_espacos_nao_sao_expressoes(vader):
+    from expressoes import e_expressao
+    assert "( '}{' )" in vader.lexicon
+    assert not e_expressao("( '}{' )") and not e_expressao("single") and e_expressao("fed up")
+    assert "( '}{' )" not in AnalisadorComExpressoes(vader).expressoes.expressoes
+
+
+@pytest.mark.parametrize("frase, equivalente", [
+    ("This is a dead end.", "This is a deadend xqj."),
+    ("This is not a dead end.", "This is not a deadend xqj."),
+    ("It's a DEAD END!", "It's a DEADEND XQJ!"),
+    ("A very dead end, but I love it", "A very deadend xqj, but I love it"),
+    ("dead end dead end", "deadend xqj deadend xqj"),
+])
+def test_expressao_pontuada_como_uma_palavra_do_lexico(vader, frase, equivalente):
+    # a expressão conta como uma só palavra do léxico na posição da primeira palavra (e a outra fica a 0):
+    # o mesmo que uma palavra inventada com a valência da expressão seguida de uma palavra neutra
+    from nltk.sentiment import SentimentIntensityAnalyzer
+    referencia = SentimentIntensityAnalyzer()
+    referencia.lexicon = dict(vader.lexicon, deadend=vader.lexicon["dead end"])
+    assert "xqj" not in referencia.lexicon
+    analisador = AnalisadorComExpressoes(vader)
+    assert analisador.polarity_scores(frase) == referencia.polarity_scores(equivalente)
+    assert analisador.polarity_scores(frase) != vader.polarity_scores(frase)
+
+
+def test_psytext_usa_as_expressoes():
+    import psytext
+    assert "dead end" in psytext.obter_analisador().expressoes.expressoes
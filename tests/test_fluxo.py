@@ -0,0 +1,91 @@
+# testes da leitura e da análise em fluxo (fluxo.py)
+import json
+import os
+import threading
+
+import pytest
+
+import fluxo
+
+
+def _blocos(texto, tamanho):
+    return (texto[i:i + tamanho] for i in range(0, len(texto), tamanho))
+
+
+def test_texto_sem_pontuacao_nao_acumula_o_ficheiro_todo():
+    # um log sem pontuação de frase: antes, a sobra entre bocados crescia até ser o ficheiro inteiro
+    linhas = [f"2024-01-01 12:00:{i % 60:02d} INFO worker {i} handled request {i * 7919 % 100003} ok" for i in range(3000)]
+    texto = "\n".join(linhas)
+    frases = list(fluxo.iterar_frases(_blocos(texto, 4096), max_caracteres=10_000))
+    assert len(frases) > 1
+    assert max(len(frase) for frase in frases) <= 10_000
+    # os cortes são feitos nas mudanças de linha e nada do texto se perde
+    assert all(frase.endswith("\n") for frase in frases[:-1])
+    assert "".join(frases).split() == texto.split()
+
+
+def test_texto_sem_pontuacao_nem_linhas_e_cortado_no_limite():
+    texto = "word " * 5000
+    frases = list(fluxo.iterar_frases(_blocos(texto, 1000), max_caracteres=3000))
+    assert max(len(frase) for frase in frases) <= 3000
+    assert "".join(frases).split() == texto.split()
+
+
+def test_frases_normais_nao_mudam():
+    texto = " ".join(f"This is sentence number {i}. It ends here!" for i in range(500))
+    frases = list(fluxo.iterar_frases(_blocos(texto, 777)))
+    assert [frase.strip() for frase in frases] == [frase.strip() for frase in fluxo.iterar_frases([texto])]
+    assert len(frases) == 1000
+
+
+@pytest.fixture
+def saida(tmp_path, monkeypatch):
+    """a pasta de saída e os formatos de exportação da análise em fluxo, num sítio temporário"""
+    pasta = tmp_path / "saida"
+    monkeypatch.setitem(fluxo.ph, "output_dir", str(pasta))
+    monkeypatch.setitem(fluxo.cfg_exportacao, "formats", ["json", "jsonl", "columns"])
+    return pasta
+
+
+@pytest.fixture
+def ficheiro_grande(tmp_path):
+    caminho = tmp_path / "grande.txt"
+    caminho.write_text(" ".join(f"Sentence {i} is {'great' if i % 3 else 'awful'}." for i in range(1000)),
+                       encoding="utf-8")
+    return str(caminho)
+
+
+def test_analise_em_fluxo_escreve_todas_as_saidas(saida, ficheiro_grande):
+    html, estatisticas = fluxo.analisar_ficheiro_em_fluxo(ficheiro_grande, tamanho_bloco=2000)
+    assert estatisticas["num_frases"] == 1000
+    assert os.path.isfile(html) and os.listdir(saida / "grande_emotions_pages")
+    with open(saida / "grande_analysis.json", encoding="utf-8") as f:
+        assert len(json.load(f)) == 1000
+    assert (saida / "grande_analysis.jsonl").is_file() and (saida / "grande_analysis_columns").is_dir()
+
+
+def test_analise_em_fluxo_cancelada_nao_deixa_saidas(saida, ficheiro_grande):
+    import psytext
+    cancelar = threading.Event()
+    with pytest.raises(psytext.AnaliseCancelada):
+        # cancela depois do primeiro lote, quando já há frases escritas em todas as saídas
+        fluxo.analisar_ficheiro_em_fluxo(ficheiro_grande, tamanho_bloco=2000, cancelar=cancelar,
+                                         progresso=lambda feitas, total: cancelar.set())
+    assert list(saida.iterdir()) == []
+
+
+def test_analise_em_fluxo_com_erro_nao_deixa_saidas(saida, ficheiro_grande, monkeypatch):
+    import psytext
+    analisar_frases = psytext._analisar_frases
+    lotes = []
+
+    def falhar_no_segundo_lote(documento):
+        lotes.append(documento)
+        if len(lotes) == 2:
+            raise RuntimeError("scoring failed")
+        return analisar_frases(documento)
+
+    monkeypatch.setattr(psytext, "_analisar_frases", falhar_no_segundo_lote)
+    with pytest.raises(RuntimeError):
+        fluxo.analisar_ficheiro_em_fluxo(ficheiro_grande, tamanho_bloco=2000)
+    assert list(saida.iterdir()) == []
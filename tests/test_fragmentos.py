@@ -0,0 +1,54 @@
+# testes da análise de um texto grande em fragmentos numa pool de processos (fragmentos.py)
+import threading
+
+import pytest
+
+import fragmentos
+import psytext
+from documento import iterar_spans_frases
+
+TEXTO_GRANDE = " ".join(f"Paragraph {i}. I was happy there, but the rain never stopped! Was it worth it? Maybe not."
+                        for i in range(60))
+
+
+@pytest.fixture
+def fragmentos_pequenos(monkeypatch):
+    """obriga um texto pequeno a ser partido em vários fragmentos"""
+    monkeypatch.setitem(fragmentos.cfg_fragmentos, "min_chars", 1000)
+    monkeypatch.setitem(fragmentos.cfg_fragmentos, "margin_chars", 50)
+
+
+def _iguais(a, b):
+    """compara os dicionários das estatísticas, com tolerância nos floats (as médias são juntadas por ordem diferente)"""
+    assert a.keys() == b.keys()
+    for chave in a:
+        if isinstance(a[chave], float):
+            assert a[chave] == pytest.approx(b[chave]), chave
+        else:
+            assert a[chave] == b[chave], chave
+
+
+def test_cortes_em_inicios_de_frases():
+    inicios = {inicio for inicio, _ in iterar_spans_frases(TEXTO_GRANDE)}
+    cortes = fragmentos.dividir_em_fragmentos(TEXTO_GRANDE, 7, margem=60)
+    assert len(cortes) == 7
+    assert cortes[0][0] == 0 and cortes[-1][1] == len(TEXTO_GRANDE)
+    assert all(fim == inicio for (_, fim), (inicio, _) in zip(cortes, cortes[1:]))
+    assert all(inicio in inicios for inicio, _ in cortes)
+
+
+def test_fragmentos_iguais_a_um_so_processo(fragmentos_pequenos):
+    assert fragmentos.deve_fragmentar(TEXTO_GRANDE, 2)
+    frases, acumulador = fragmentos.analisar_em_fragmentos(TEXTO_GRANDE, processos=2)
+    frases_serie, acumulador_serie = psytext.analisar_sem_saidas(TEXTO_GRANDE, processos=1)
+    assert len(frases) == len(frases_serie) == 240
+    assert list(frases._inicios) == list(frases_serie._inicios) and list(frases._fins) == list(frases_serie._fins)
+    assert list(frases) == list(frases_serie)
+    _iguais(acumulador.para_dict(), acumulador_serie.para_dict())
+
+
+def test_cancelar_termina_a_pool(fragmentos_pequenos):
+    cancelar = threading.Event()
+    cancelar.set()
+    with pytest.raises(psytext.AnaliseCancelada):
+        fragmentos.analisar_em_fragmentos(TEXTO_GRANDE, processos=2, cancelar=cancelar)
@@ -0,0 +1,63 @@
+# testes das figuras dos gráficos (graficos.py): redução da trajetória com o LTTB e o mapa de densidade do affect grid
+import numpy as np
+import pytest
+
+import graficos
+
+
+def _frases(valencias, arousals=None):
+    arousals = np.linspace(0, 1, len(valencias)) if arousals is None else arousals
+    return [{"frase": "x", "valence": float(v), "arousal": float(a), "cor": "gray"} for v, a in zip(valencias, arousals)]
+
+
+@pytest.mark.parametrize("n, pontos", [(1000, 100), (1000, 3), (101, 100), (5000, 777)])
+def test_lttb_mantem_as_pontas_e_o_tamanho(n, pontos):
+    aleatorio = np.random.default_rng(n)
+    x = np.arange(n, dtype=float)
+    y = aleatorio.normal(size=n)
+    rx, ry = graficos.lttb(x, y, pontos)
+    assert len(rx) == len(ry) == pontos
+    assert (rx[0], ry[0], rx[-1], ry[-1]) == (x[0], y[0], x[-1], y[-1])
+    assert np.all(np.diff(rx) > 0)  # um ponto de cada grupo, pela ordem
+    np.testing.assert_array_equal(ry, y[rx.astype(int)])  # só pontos da série original
+
+
+@pytest.mark.parametrize("n, pontos", [(50, 50), (50, 80), (50, 2), (0, 10)])
+def test_lttb_devolve_series_curtas_sem_mudancas(n, pontos):
+    x, y = np.arange(n, dtype=float), np.ones(n)
+    rx, ry = graficos.lttb(x, y, pontos)
+    assert rx is x and ry is y
+
+
+def test_lttb_mantem_os_picos():
+    y = np.zeros(10_000)
+    y[1234], y[8765] = 5.0, -4.0
+    _, ry = graficos.lttb(np.arange(len(y), dtype=float), y, 50)
+    assert ry.max() == 5.0 and ry.min() == -4.0
+
+
+def test_trajetoria_reduzida_ao_orcamento():
+    valencias = np.sin(np.linspace(0, 20, 3000))
+    fig = graficos.figura_trajetoria(_frases(valencias), max_pontos=200)
+    x, y = fig.axes[0].lines[0].get_data()
+    assert len(x) == len(y) == 200
+    assert "rolling mean" in fig.axes[0].get_title()
+
+
+def test_trajetoria_curta_tem_um_ponto_por_frase():
+    valencias = [0.5, -0.2, 0.0, 0.9]
+    fig = graficos.figura_trajetoria(_frases(valencias), max_pontos=200)
+    x, y = fig.axes[0].lines[0].get_data()
+    assert list(x) == [1, 2, 3, 4] and list(y) == valencias
+
+
+@pytest.mark.parametrize("frases, norma", [
+    (_frases([-0.9, -0.2, 0.5, 0.5, 0.5], [0.1, 0.4, 0.7, 0.7, 0.7]), "LogNorm"),
+    (_frases([0.3] * 7, [0.6] * 7), "Normalize"),  # uma só célula ocupada
+    (_frases([-0.9, 0.0, 0.9], [0.1, 0.5, 0.9]), "Normalize"),  # todas as células ocupadas com 1 frase
+    ([], "Normalize"),
+])
+def test_affect_grid_densidade_desenha_sempre(frases, norma):
+    fig = graficos.figura_affect_grid(frases, modo="density")
+    assert type(fig.axes[0].collections[0].norm).__name__ == norma
+    assert graficos.figura_para_png(fig).startswith(b"\x89PNG")
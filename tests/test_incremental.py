@@ -0,0 +1,46 @@
+# testes da análise incremental (incremental.py): depois de várias edições, o resultado é o de analisar o texto do zero
+import pytest
+
+from incremental import AnaliseIncremental
+
+
+def _comparar(a, b):
+    assert a.keys() == b.keys()
+    for chave in a:
+        if isinstance(a[chave], float):
+            assert a[chave] == pytest.approx(b[chave], rel=1e-9, abs=1e-9), chave
+        else:
+            assert a[chave] == b[chave], chave
+
+
+def test_edicoes_iguais_a_analise_completa(texto):
+    edicoes = [
+        texto,
+        texto.replace("great", "awful"),  # uma frase alterada
+        texto.replace("great", "awful") + " A new sentence at the end is wonderful.",  # uma frase juntada
+        "A new first sentence. " + texto.replace("But the winters are long, dark and cold. ", ""),  # juntada e tirada
+        texto[: len(texto) // 2],  # metade do texto apagada
+        "",  # tudo apagado
+        texto,  # e escrito outra vez
+    ]
+    analise = AnaliseIncremental()
+    for versao in edicoes:
+        frases_info, estatisticas = analise.atualizar(versao)
+        frases_novas, estatisticas_novas = AnaliseIncremental().atualizar(versao)
+        assert frases_info == frases_novas
+        _comparar(estatisticas, estatisticas_novas)
+
+
+def test_so_as_frases_alteradas_sao_pontuadas(texto):
+    analise = AnaliseIncremental()
+    analise.atualizar(texto)
+    analise.atualizar(texto.replace("great", "awful"))
+    assert analise.frases_pontuadas == 1
+
+
+def test_incremental_igual_ao_psytext(texto):
+    import psytext
+    frases_info, estatisticas = AnaliseIncremental().atualizar(texto)
+    frases_completas, acumulador = psytext.analisar_sem_saidas(texto, processos=1)
+    assert frases_info == list(frases_completas)
+    _comparar(estatisticas, acumulador.para_dict())
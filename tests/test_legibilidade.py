@@ -0,0 +1,40 @@
+# testes da legibilidade a partir dos tokens (legibilidade.py)
+import pytest
+import textstat
+
+from documento import construir_documento
+from legibilidade import contar_silabas, flesch_de_contagens, flesch_em_janelas, flesch_por_frase
+
+
+def _flesch_ingenuo(tokens_por_frase):
+    """o flesch de um bloco de frases contado de raiz, sem memo nem somas acumuladas"""
+    palavras = [token for tokens in tokens_por_frase for token in tokens if token.isalnum()]
+    silabas = sum(textstat.syllable_count(palavra) for palavra in palavras)
+    return flesch_de_contagens(len(palavras), len(tokens_por_frase), silabas)
+
+
+def test_silabas_memorizadas_iguais_ao_textstat(texto):
+    for palavra in construir_documento(texto).palavras:
+        assert contar_silabas(palavra) == textstat.syllable_count(palavra), palavra
+
+
+@pytest.mark.parametrize("janela, passo", [(1, 1), (3, 1), (4, 2), (5, 3)])
+def test_janelas_iguais_ao_flesch_de_cada_janela(texto, janela, passo):
+    tokens_por_frase = construir_documento(texto).tokens_por_frase
+    assert len(tokens_por_frase) > janela
+    esperado = [(inicio, _flesch_ingenuo(tokens_por_frase[inicio:inicio + janela]))
+                for inicio in range(0, len(tokens_por_frase) - janela + 1, passo)]
+    janelas = flesch_em_janelas(tokens_por_frase, janela, passo)
+    assert [inicio for inicio, _ in janelas] == [inicio for inicio, _ in esperado]
+    assert [flesch for _, flesch in janelas] == pytest.approx([flesch for _, flesch in esperado])
+
+
+def test_janela_maior_do_que_o_texto(texto):
+    tokens_por_frase = construir_documento(texto).tokens_por_frase
+    [(inicio, flesch)] = flesch_em_janelas(tokens_por_frase, len(tokens_por_frase) + 10)
+    assert inicio == 0 and flesch == pytest.approx(_flesch_ingenuo(tokens_por_frase))
+
+
+def test_sem_frases():
+    assert flesch_em_janelas([]) == []
+    assert flesch_por_frase([["?", "!"]]) == ["N/A"]
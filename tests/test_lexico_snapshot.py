@@ -0,0 +1,58 @@
+# testes do snapshot binário do léxico do VADER (lexico_snapshot.py), sempre num ficheiro temporário
+import importlib.metadata
+
+import pytest
+
+import lexico_snapshot
+
+OVERRIDES = {"pointless": -2.5, "dead end": -3.5, "chill": 1.5}
+
+
+@pytest.fixture(scope="module")
+def vader():
+    """o VADER do nltk construído pelo caminho lento, com o léxico personalizado por cima"""
+    from nltk.sentiment import SentimentIntensityAnalyzer
+    import psytext
+    psytext.obter_analisador()  # garante os recursos do nltk
+    sia = SentimentIntensityAnalyzer()
+    sia.lexicon.update(OVERRIDES)
+    return sia
+
+
+@pytest.fixture
+def snapshot(tmp_path, vader):
+    return lexico_snapshot.gravar_snapshot(vader.lexicon, OVERRIDES, str(tmp_path / "cache" / "lexico.marshal"))
+
+
+def test_ida_e_volta(snapshot, vader):
+    assert lexico_snapshot.carregar_lexico(OVERRIDES, snapshot) == vader.lexicon
+
+
+def test_invalidado_quando_os_overrides_mudam(snapshot):
+    assert lexico_snapshot.carregar_lexico(dict(OVERRIDES, chill=2.0), snapshot) is None
+    assert lexico_snapshot.carregar_lexico({k: v for k, v in OVERRIDES.items() if k != "chill"}, snapshot) is None
+    assert lexico_snapshot.analisador_do_snapshot(dict(OVERRIDES, new=1.0), snapshot) is None
+
+
+def test_invalidado_quando_a_versao_do_nltk_muda(snapshot, monkeypatch):
+    versao = importlib.metadata.version
+    monkeypatch.setattr(importlib.metadata, "version", lambda nome: "0.0.1" if nome == "nltk" else versao(nome))
+    assert lexico_snapshot.carregar_lexico(OVERRIDES, snapshot) is None
+
+
+def test_snapshot_em_falta_ou_estragado(tmp_path):
+    assert lexico_snapshot.carregar_lexico(OVERRIDES, str(tmp_path / "nada.marshal")) is None
+    estragado = tmp_path / "estragado.marshal"
+    estragado.write_bytes(b"\x00not marshal")
+    assert lexico_snapshot.carregar_lexico(OVERRIDES, str(estragado)) is None
+
+
+def test_analisador_do_snapshot_igual_ao_vader(snapshot, vader, texto):
+    from nltk.sentiment import SentimentIntensityAnalyzer
+    from documento import construir_documento
+    analisador = lexico_snapshot.analisador_do_snapshot(OVERRIDES, snapshot)
+    assert isinstance(analisador, SentimentIntensityAnalyzer)
+    assert analisador.lexicon == vader.lexicon
+    frases = construir_documento(texto).frases + ["Such a chill, POINTLESS day!!", "not bad at all :)", ""]
+    for frase in frases:
+        assert analisador.polarity_scores(frase) == vader.polarity_scores(frase), frase
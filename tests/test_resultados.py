@@ -0,0 +1,45 @@
+# testes do contentor em colunas dos resultados das frases (resultados.py)
+import pytest
+
+from resultados import FrasesAnalisadas
+
+LINHAS = [("Good day.", 0.44, 0.5, "green"), ("Bad day.", -0.54, 0.6, "red"), ("A day.", 0.0, 0.1, "gray"),
+          ("Great day!", 0.69, 0.8, "green")]
+
+
+def _contentor(texto=None, linhas=LINHAS):
+    frases = FrasesAnalisadas(texto)
+    inicio = 0
+    for frase, valence, arousal, cor in linhas:
+        if texto is not None:
+            inicio = texto.index(frase, inicio)
+        frases.adicionar(frase, valence, arousal, cor, inicio)
+    return frases
+
+
+@pytest.mark.parametrize("texto", [None, "Good day. Bad day.  A day. Great day!"])
+def test_parece_uma_lista_de_dicionarios(texto):
+    frases = _contentor(texto)
+    esperado = [{"frase": f, "valence": v, "arousal": a, "cor": c} for f, v, a, c in LINHAS]
+    assert list(frases) == esperado
+    assert len(frases) == 4 and frases[-1] == esperado[-1] and frases[1:3] == esperado[1:3]
+    assert frases.paleta == ["green", "red", "gray"] and frases.cores == [c for *_, c in LINHAS]
+    with pytest.raises(IndexError):
+        frases[4]
+
+
+def test_estender_traduz_as_cores_e_as_posicoes():
+    texto = "Good day. Bad day.  A day. Great day!"
+    corte = texto.index("A day.")
+    primeiro = _contentor(texto[:corte], LINHAS[:2])
+    segundo = _contentor(texto[corte:], LINHAS[2:])
+    primeiro.texto = texto
+    primeiro.estender(segundo, deslocamento=corte)
+    assert list(primeiro) == list(_contentor(texto))
+    with pytest.raises(ValueError):
+        primeiro.estender(_contentor())
+
+
+def test_colunas_numpy():
+    valence, arousal = _contentor().colunas_numpy()
+    assert list(valence) == [v for _, v, _, _ in LINHAS] and list(arousal) == [a for _, _, a, _ in LINHAS]
@@ -0,0 +1,93 @@
+# testes do serviço http local (servico.py), sempre em 127.0.0.1 e numa porta escolhida pelo sistema
+import asyncio
+import json
+import os
+import threading
+import urllib.error
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from servico import ServicoAnalise, pedir
+
+
+@pytest.fixture(scope="module")
+def servico(tmp_path_factory):
+    """o serviço a correr numa thread com o seu ciclo do asyncio, com um worker e lotes que esperam 50 ms"""
+    servico = ServicoAnalise(host="127.0.0.1", port=0, workers=1, espera_ms=50, usar_cache=False,
+                             output_dir=str(tmp_path_factory.mktemp("servico")))
+    ciclo = asyncio.new_event_loop()
+    thread = threading.Thread(target=ciclo.run_forever, daemon=True)
+    thread.start()
+    asyncio.run_coroutine_threadsafe(servico.iniciar(), ciclo).result(timeout=120)
+    yield servico
+    asyncio.run_coroutine_threadsafe(servico.parar(), ciclo).result(timeout=60)
+    ciclo.call_soon_threadsafe(ciclo.stop)
+    thread.join(timeout=10)
+
+
+def _pedir(servico, caminho, dados=None):
+    return pedir(caminho, dados, host=servico.host, port=servico.port)
+
+
+def _erro(servico, caminho, corpo):
+    """faz um POST com um corpo qualquer e devolve o código http e a resposta de erro"""
+    import urllib.request
+    pedido = urllib.request.Request(f"http://{servico.host}:{servico.port}{caminho}", data=corpo)
+    with pytest.raises(urllib.error.HTTPError) as erro:
+        urllib.request.urlopen(pedido, timeout=60)
+    return erro.value.code, json.loads(erro.value.read().decode("utf-8"))
+
+
+def test_health(servico):
+    estado = _pedir(servico, "/health")
+    assert estado["status"] == "ok" and estado["workers"] == 1
+
+
+def test_analyze_igual_ao_psytext(servico, texto):
+    import psytext
+    frases_info, acumulador = psytext.analisar_sem_saidas(texto, processos=1)
+    resposta = _pedir(servico, "/analyze", {"text": texto})
+    assert resposta["statistics"] == acumulador.para_dict()
+    assert [frase["frase"] for frase in resposta["sentences"]] == [frase["frase"] for frase in frases_info]
+    assert "sentences" not in _pedir(servico, "/analyze", {"text": texto, "sentences": False})
+
+
+def test_analyze_com_base_filename_escreve_as_saidas(servico, texto):
+    resposta = _pedir(servico, "/analyze", {"text": texto, "base_filename": "teste_servico", "sentences": False})
+    assert resposta["html"].endswith(".html") and os.path.isfile(resposta["html"])
+    assert os.path.dirname(os.path.abspath(resposta["html"])) == servico._output_dir
+
+
+def test_sentences(servico):
+    resposta = _pedir(servico, "/sentences", {"sentences": ["I love it.", "  ", "I hate it."]})
+    assert [frase["frase"] for frase in resposta["sentences"]] == ["I love it.", "I hate it."]
+    assert resposta["sentences"][0]["valence"] > 0 > resposta["sentences"][1]["valence"]
+    assert len(_pedir(servico, "/sentences", {"text": "One. Two! Three?"})["sentences"]) == 3
+
+
+@pytest.mark.parametrize("caminho, corpo, mensagem", [
+    ("/analyze", b"{not json", "invalid JSON"),
+    ("/analyze", b"[1, 2]", "JSON object"),
+    ("/analyze", b'{"text": "Hi.", "base_filename": "../fora"}', "base_filename"),
+    ("/analyze", b'{"text": "Hi.", "sentences": "false"}', "true or false"),
+    ("/sentences", b'{"sentences": "not a list"}', "list of strings"),
+])
+def test_pedidos_invalidos_dao_400(servico, caminho, corpo, mensagem):
+    estado, resposta = _erro(servico, caminho, corpo)
+    assert estado == 400 and mensagem in resposta["error"]
+
+
+def test_caminho_desconhecido_da_404(servico):
+    assert _erro(servico, "/nada", b"{}")[0] == 404
+
+
+def test_pedidos_simultaneos_vao_em_lotes(servico):
+    antes = _pedir(servico, "/health")
+    frases = [f"Sentence number {i} is {'good' if i % 2 else 'bad'}." for i in range(40)]
+    with ThreadPoolExecutor(max_workers=40) as executor:
+        respostas = list(executor.map(lambda frase: _pedir(servico, "/sentences", {"sentences": [frase]}), frases))
+    assert [resposta["sentences"][0]["frase"] for resposta in respostas] == frases
+    depois = _pedir(servico, "/health")
+    pedidos, lotes = depois["requests"] - antes["requests"], depois["batches"] - antes["batches"]
+    assert pedidos == 40 and lotes < pedidos